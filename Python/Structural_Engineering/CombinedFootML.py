@@ -1,92 +1,330 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-import pandas as pd
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
-import matplotlib.pyplot as plt
+from cache_modelos import obtener_o_entrenar
+from perfilador import etapa
+from graficos import MODOS
 #
 #Autor: Oscar Calvo
 # Fecha: Junio 30/2025
 # Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
 #
-# Instrucciones para el usuario
-print("""
-=== Clasificador de Zapatas Combinadas con Machine Learning ===
-Este programa evalúa si una zapata combinada es adecuada para soportar dos columnas,
-basándose en sus cargas (P1, P2), la distancia entre ellas (d) y la capacidad portante del suelo (q).
-Usa un árbol de decisión entrenado con datos sintéticos y estima dimensiones iniciales.
-Incluye una gráfica con los datos de entrada del usuario y el conjunto de entrenamiento como contexto.
-Nota: Este es un ejercicio educativo. Valide los resultados con normativas (ej. ACI 318, Eurocódigo).
-Para datos reales, reemplace la función `generar_datos_entrenamiento` con un archivo CSV o datos de proyecto.
-""")
+# pandas, scikit-learn y matplotlib se importan dentro de las funciones que los usan,
+# de modo que importar este módulo es rápido y no tiene efectos secundarios.
+#
+# Columnas del conjunto de entrenamiento
+COLUMNAS = ['P1', 'P2', 'd', 'q']
+# Hiperparámetros del árbol de decisión
+HIPERPARAMETROS = {'max_depth': 5, 'random_state': 42}
+
+# Función para generar un bloque de datos sintéticos de forma vectorizada
+def _generar_bloque(semilla, n):
+    """
+    Genera un bloque de n muestras con un generador propio (np.random.Generator).
+    Cada bloque recibe una semilla independiente derivada de una SeedSequence,
+    por lo que el resultado no depende del orden ni del proceso que lo calcule.
+    """
+    rng = np.random.default_rng(semilla)
+    P1 = rng.uniform(100, 1000, n)
+    P2 = rng.uniform(100, 1000, n)
+    d = rng.uniform(2, 6, n)
+    q = rng.uniform(100, 300, n)
+    carga_total = P1 + P2
+    area_minima = carga_total / q
+    etiquetas = ((area_minima < d * 2) & (carga_total < q * d * 2)).astype(np.int8)
+    return np.column_stack((P1, P2, d, q)), etiquetas
+
+def _bloques(n_samples, tamano_bloque, semilla):
+    """
+    Divide n_samples en bloques de tamaño fijo y asigna a cada uno su semilla.
+    Retorna una lista de tuplas (semilla, inicio, n).
+    """
+    n_bloques = max(1, -(-n_samples // tamano_bloque))
+    semillas = np.random.SeedSequence(semilla).spawn(n_bloques)
+    return [(semillas[i], i * tamano_bloque, min(tamano_bloque, n_samples - i * tamano_bloque))
+            for i in range(n_bloques)]
+
+def _llenar_bloque(semilla, inicio, n, ruta=None):
+    """
+    Genera un bloque. Si se da una ruta, lo escribe directamente en los archivos .npy
+    (memmap) de esa carpeta y retorna solo el número de filas escritas.
+    """
+    X_bloque, y_bloque = _generar_bloque(semilla, n)
+    if ruta is None:
+        return X_bloque, y_bloque
+    for j, columna in enumerate(COLUMNAS):
+        destino = np.load(os.path.join(ruta, f'{columna}.npy'), mmap_mode='r+')
+        destino[inicio:inicio + n] = X_bloque[:, j]
+        destino.flush()
+    destino = np.load(os.path.join(ruta, 'etiqueta.npy'), mmap_mode='r+')
+    destino[inicio:inicio + n] = y_bloque
+    destino.flush()
+    return n
+
+def _ejecutar_bloques(bloques, n_procesos, ruta=None):
+    """
+    Ejecuta los bloques en serie (n_procesos=1) o en un pool de procesos, con a lo sumo
+    un proceso por bloque. Los resultados se entregan en el orden de los bloques.
+    """
+    n_procesos = min(n_procesos or os.cpu_count() or 1, len(bloques))
+    semillas, inicios, tamanos = zip(*bloques)
+    rutas = [ruta] * len(bloques)
+    if n_procesos == 1:
+        yield from map(_llenar_bloque, semillas, inicios, tamanos, rutas)
+        return
+    with ProcessPoolExecutor(max_workers=n_procesos) as pool:
+        yield from pool.map(_llenar_bloque, semillas, inicios, tamanos, rutas)
 
 # Función para generar datos sintéticos
-def generar_datos_entrenamiento(n_samples=1000):
+def generar_datos_entrenamiento(n_samples=1000, tamano_bloque=1_000_000, n_procesos=1, semilla=42):
     """
     Genera datos sintéticos para entrenar el modelo (simula datos de proyecto).
     - P1, P2: Cargas de las columnas (kN)
     - d: Distancia entre columnas (m)
     - q: Capacidad portante del suelo (kN/m^2)
     - Etiqueta: 1 (Adecuada) si el área mínima es menor que d*2 y la carga total es soportable
+    Los datos se generan por bloques de `tamano_bloque` filas con semillas independientes,
+    opcionalmente repartidos en `n_procesos` procesos. Para una misma `semilla` el resultado
+    es idéntico sin importar el número de procesos.
+    Para conjuntos que no caben en memoria use `escribir_datos_entrenamiento`.
     Para datos reales, reemplace esta función con datos de un CSV o proyecto estructural.
     Ejemplo: pd.read_csv('datos_zapatas.csv', columns=['P1', 'P2', 'd', 'q', 'etiqueta'])
     """
-    datos = []
-    etiquetas = []
-    for _ in range(n_samples):
-        P1 = np.random.uniform(100, 1000)
-        P2 = np.random.uniform(100, 1000)
-        d = np.random.uniform(2, 6)
-        q = np.random.uniform(100, 300)
-        area_minima = (P1 + P2) / q
-        if area_minima < (d * 2) and (P1 + P2) < (q * d * 2):
-            etiquetas.append(1)  # Adecuada
-        else:
-            etiquetas.append(0)  # No Adecuada
-        datos.append([P1, P2, d, q])
-    return pd.DataFrame(datos, columns=['P1', 'P2', 'd', 'q']), np.array(etiquetas)
-
-# Generar y preparar datos
-print("Generando datos sintéticos...")
-X, y = generar_datos_entrenamiento()
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
-
-# Entrenar el modelo
-print("Entrenando el modelo de árbol de decisión...")
-modelo = DecisionTreeClassifier(max_depth=5, random_state=42)
-modelo.fit(X_train, y_train)
-
-# Evaluar el modelo
-predicciones = modelo.predict(X_test)
-precision = accuracy_score(y_test, predicciones)
-print(f"\nPrecisión del modelo en datos de prueba: {precision:.2%}")
-print("Esto indica qué tan bien el modelo clasifica zapatas adecuadas vs. no adecuadas.\n")
+    import pandas as pd
+    datos = np.empty((n_samples, len(COLUMNAS)))
+    etiquetas = np.empty(n_samples, dtype=np.int64)
+    bloques = _bloques(n_samples, tamano_bloque, semilla)
+    for (_, inicio, n), (X_bloque, y_bloque) in zip(bloques, _ejecutar_bloques(bloques, n_procesos)):
+        datos[inicio:inicio + n] = X_bloque
+        etiquetas[inicio:inicio + n] = y_bloque
+    return pd.DataFrame(datos, columns=COLUMNAS), etiquetas
+
+def escribir_datos_entrenamiento(ruta, n_samples, tamano_bloque=1_000_000, n_procesos=1, semilla=42):
+    """
+    Genera los mismos datos que `generar_datos_entrenamiento` pero los escribe en disco,
+    un archivo .npy por columna (P1.npy, P2.npy, d.npy, q.npy, etiqueta.npy) dentro de `ruta`.
+    Cada proceso escribe su bloque directamente en el memmap, de modo que la memoria usada
+    depende del tamaño del bloque y no del número total de muestras.
+    Retorna la ruta de la carpeta.
+    """
+    os.makedirs(ruta, exist_ok=True)
+    for columna in COLUMNAS:
+        np.lib.format.open_memmap(os.path.join(ruta, f'{columna}.npy'), mode='w+',
+                                  dtype=np.float64, shape=(n_samples,)).flush()
+    np.lib.format.open_memmap(os.path.join(ruta, 'etiqueta.npy'), mode='w+',
+                              dtype=np.int8, shape=(n_samples,)).flush()
+    bloques = _bloques(n_samples, tamano_bloque, semilla)
+    for _ in _ejecutar_bloques(bloques, n_procesos, ruta):
+        pass
+    return ruta
+
+def cargar_datos_entrenamiento(ruta):
+    """
+    Abre en modo lectura (memmap) los datos escritos por `escribir_datos_entrenamiento`.
+    Retorna un diccionario {columna: arreglo} y el arreglo de etiquetas.
+    """
+    datos = {columna: np.load(os.path.join(ruta, f'{columna}.npy'), mmap_mode='r') for columna in COLUMNAS}
+    return datos, np.load(os.path.join(ruta, 'etiqueta.npy'), mmap_mode='r')
+
+# Función para entrenar el modelo
+def entrenar_modelo(X, y):
+    """
+    Entrena el árbol de decisión con el 70% de los datos.
+    Retorna el modelo y su precisión sobre el 30% de prueba.
+    """
+    from sklearn.tree import DecisionTreeClassifier
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import accuracy_score
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.3, random_state=42)
+    modelo = DecisionTreeClassifier(**HIPERPARAMETROS)
+    with etapa('zapatas.fit', filas=len(X_train)):
+        modelo.fit(X_train, y_train)
+    with etapa('zapatas.predict', filas=len(X_test)):
+        predicciones = modelo.predict(X_test)
+    return modelo, accuracy_score(y_test, predicciones)
+
+def obtener_modelo(n_samples=1000, semilla=42, X=None, y=None):
+    """
+    Retorna (modelo, precision, desde_cache). El modelo se carga de la caché en disco si ya se
+    entrenó con los mismos datos e hiperparámetros; si no, se entrena con X, y, que deben provenir
+    de generar_datos_entrenamiento(n_samples, semilla=semilla) y, si se omiten, se generan aquí.
+    """
+    parametros = {'n_samples': n_samples, 'semilla': semilla, 'test_size': 0.3, 'hiperparametros': HIPERPARAMETROS}
+
+    def entrenar():
+        datos = (X, y) if X is not None else generar_datos_entrenamiento(n_samples, semilla=semilla)
+        return entrenar_modelo(*datos)
+    (modelo, precision), desde_cache = obtener_o_entrenar(
+        'zapatas', parametros, entrenar, funciones=(_generar_bloque, entrenar_modelo))
+    return modelo, precision, desde_cache
+
+# Reglas de validación compartidas por la evaluación interactiva y la evaluación por lotes
+def validar_entradas(P1, P2, d, q):
+    """
+    Aplica las reglas de validación a escalares o arreglos de P1, P2, d y q.
+    Retorna un arreglo de textos: vacío si la fila es válida o el motivo del rechazo.
+    """
+    P1, P2, d, q = (np.asarray(v, dtype=float) for v in (P1, P2, d, q))
+    return np.atleast_1d(np.select(
+        [~(np.isfinite(P1) & np.isfinite(P2) & np.isfinite(d) & np.isfinite(q)),
+         (P1 <= 0) | (P2 <= 0), d < 0.5, q <= 0],
+        ["P1, P2, d y q deben ser valores numéricos.",
+         "Las cargas (P1, P2) deben ser mayores a 0 kN.",
+         "La distancia (d) debe ser al menos 0.5 m.",
+         "La capacidad portante (q) debe ser mayor a 0 kN/m^2."],
+        default=""))
+
+def dimensionar_zapata(P1, P2, d, q, margen=0.5, ancho_minimo=1.0):
+    """
+    Estima área, largo y ancho de la zapata (escalares o arreglos).
+    - margen: Margen a cada lado de las columnas (m), 50 cm por defecto
+    - ancho_minimo: Ancho mínimo de la zapata (m), 1 m por defecto
+    """
+    area_estimada = (np.asarray(P1, dtype=float) + P2) / q
+    largo = np.asarray(d, dtype=float) + 2 * margen
+    ancho = np.maximum(area_estimada / largo, ancho_minimo)
+    return area_estimada, largo, ancho
+
+def _leer_bloques(ruta, tamano_bloque):
+    """
+    Lee un archivo CSV o Parquet con columnas P1, P2, d, q por bloques de `tamano_bloque` filas.
+    La lectura de Parquet requiere pyarrow (`pip install pyarrow`).
+    """
+    if ruta.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tamano_bloque, columns=COLUMNAS):
+            yield lote.to_pandas()
+    else:
+        import pandas as pd
+        yield from pd.read_csv(ruta, usecols=COLUMNAS, chunksize=tamano_bloque)
+
+def evaluar_bloque(bloque, modelo):
+    """
+    Evalúa un bloque (DataFrame con P1, P2, d, q) de forma vectorizada:
+    validación, predicción del árbol para las filas válidas y dimensionamiento.
+    Las filas inválidas quedan con estado 'INVÁLIDA', su motivo y dimensiones vacías.
+    Las celdas no numéricas se convierten en NaN y su fila se marca como inválida.
+    """
+    import pandas as pd
+    bloque = bloque[COLUMNAS].apply(pd.to_numeric, errors='coerce').astype(float).reset_index(drop=True)
+    P1, P2, d, q = (bloque[c].to_numpy() for c in COLUMNAS)
+    motivo = validar_entradas(P1, P2, d, q)
+    validas = motivo == ""
+
+    estado = np.full(len(bloque), "INVÁLIDA", dtype=object)
+    if validas.any():
+        prediccion = modelo.predict(bloque[validas])
+        estado[validas] = np.where(prediccion == 1, "ADECUADA", "NO ADECUADA")
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        area_estimada, largo, ancho = dimensionar_zapata(P1, P2, d, q)
+    resultado = bloque.copy()
+    resultado['area'] = np.where(validas, area_estimada, np.nan)
+    resultado['largo'] = np.where(validas, largo, np.nan)
+    resultado['ancho'] = np.where(validas, ancho, np.nan)
+    resultado['estado'] = estado
+    resultado['motivo'] = motivo
+    return resultado
+
+def evaluar_lote(entrada, salida, modelo, tamano_bloque=100_000):
+    """
+    Evalúa sin interacción ni gráficas todas las zapatas de un archivo CSV o Parquet.
+    - entrada: Archivo con columnas P1, P2, d, q
+    - salida: Archivo de resultados (.csv o .parquet); '-' escribe CSV en la salida estándar
+    Los bloques se leen, evalúan y escriben uno a uno, por lo que la memoria depende
+    de `tamano_bloque` y no del tamaño del archivo.
+    Retorna un diccionario con filas, filas válidas, segundos y filas por segundo.
+    """
+    inicio = time.perf_counter()
+    filas = validas = 0
+    escritor = None
+    destino = sys.stdout if salida == '-' else salida
+    try:
+        for bloque in _leer_bloques(entrada, tamano_bloque):
+            with etapa('zapatas.evaluar_bloque', filas=len(bloque)):
+                resultado = evaluar_bloque(bloque, modelo)
+            if salida.endswith('.parquet'):
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+                tabla = pa.Table.from_pandas(resultado, preserve_index=False)
+                if escritor is None:
+                    escritor = pq.ParquetWriter(salida, tabla.schema)
+                escritor.write_table(tabla)
+            else:
+                resultado.to_csv(destino, mode='w' if filas == 0 else 'a', header=filas == 0,
+                                 index=False, lineterminator='\n')
+            filas += len(resultado)
+            validas += int((resultado['motivo'] == "").sum())
+    finally:
+        if escritor is not None:
+            escritor.close()
+    segundos = time.perf_counter() - inicio
+    return {
+        'filas': filas,
+        'validas': validas,
+        'segundos': segundos,
+        'filas_por_segundo': filas / segundos if segundos > 0 else float('inf')
+    }
+
+# Gráfica de la zapata evaluada con los datos de entrenamiento como contexto
+def graficar_zapata(X, y, P1, P2, d, adecuada, ruta='zapata_combinada.png', mostrar=False, modo='auto'):
+    """
+    Dibuja los datos de entrenamiento (fondo) y la zapata evaluada (punto grande).
+    Sin `mostrar` se usa el backend Agg y la gráfica solo se guarda en `ruta`.
+    Con muchos datos de entrenamiento el fondo se dibuja como densidad o submuestra (ver
+    `graficos.dispersion_grande`; `modo` = 'auto', 'puntos', 'densidad' o 'submuestra').
+    """
+    from graficos import pyplot, finalizar, dispersion_grande
+    plt = pyplot(mostrar)
+    estado = "ADECUADA" if adecuada else "NO ADECUADA"
+    plt.figure(figsize=(8, 6))
+    # Mostrar datos de entrenamiento como fondo
+    dispersion_grande(plt.gca(), X['P1'].to_numpy() + X['P2'].to_numpy(), X['d'].to_numpy(), y,
+                      colores={1: 'green', 0: 'red'}, modo=modo, s=10, alpha=0.2, label='Datos de entrenamiento')
+    # Mostrar punto del usuario
+    color = 'green' if adecuada else 'red'
+    plt.scatter(P1 + P2, d, c=color, s=100, edgecolors='black', label=f'Zapata: {estado}')
+    plt.xlabel('Carga Total (P1 + P2, kN)')
+    plt.ylabel('Distancia entre columnas (m)')
+    plt.title('Clasificación de Zapata Combinada: Adecuada (Verde) vs. No Adecuada (Rojo)')
+    plt.grid(True)
+    # Personalizar la leyenda: sin fondo, borde negro, texto negro, fuera del cuadro principal
+    plt.legend(facecolor='none', edgecolor='black', labelcolor='black', loc='center left', bbox_to_anchor=(1, 0.5))
+    plt.tight_layout()
+    finalizar(plt, ruta, mostrar)
 
 # Función para evaluar zapata con validación y visualización
-def evaluar_zapata():
+def evaluar_zapata(modelo, precision, X, y, valores=None, grafico='zapata_combinada.png', mostrar=False,
+                   modo_grafico='auto'):
     """
-    Solicita datos al usuario, valida entradas, realiza predicciones y muestra resultados.
-    Incluye una gráfica de dispersión con los datos de entrenamiento como contexto.
+    Valida las entradas, realiza la predicción y muestra resultados de una zapata.
+    - valores: (P1, P2, d, q); si se omite, se solicitan al usuario
+    - X, y: Datos de entrenamiento, usados como contexto en la gráfica
+    - grafico: Archivo PNG de la gráfica (None para no graficar); mostrar abre además la ventana
     Los valores deben ser realistas según el proyecto estructural.
     """
+    import pandas as pd
     try:
         print("\nEvaluación de Zapata Combinada")
-        print("Nota: Ingrese valores realistas basados en su proyecto estructural.")
-        P1 = float(input("Ingrese la carga de la primera columna (P1, kN): "))
-        P2 = float(input("Ingrese la carga de la segunda columna (P2, kN): "))
-        d = float(input("Ingrese la distancia entre columnas (d, m): "))
-        q = float(input("Ingrese la capacidad portante del suelo (q, kN/m^2): "))
+        if valores is None:
+            print("Nota: Ingrese valores realistas basados en su proyecto estructural.")
+            P1 = float(input("Ingrese la carga de la primera columna (P1, kN): "))
+            P2 = float(input("Ingrese la carga de la segunda columna (P2, kN): "))
+            d = float(input("Ingrese la distancia entre columnas (d, m): "))
+            q = float(input("Ingrese la capacidad portante del suelo (q, kN/m^2): "))
+        else:
+            P1, P2, d, q = (float(v) for v in valores)
 
         # Validación de entradas
-        if P1 <= 0 or P2 <= 0:
-            raise ValueError("Las cargas (P1, P2) deben ser mayores a 0 kN.")
-        if d < 0.5:
-            raise ValueError("La distancia (d) debe ser al menos 0.5 m.")
-        if q <= 0:
-            raise ValueError("La capacidad portante (q) debe ser mayor a 0 kN/m^2.")
+        motivo = validar_entradas(P1, P2, d, q)[0]
+        if motivo:
+            raise ValueError(motivo)
 
         # Predicción
-        entrada = pd.DataFrame([[P1, P2, d, q]], columns=['P1', 'P2', 'd', 'q'])
+        entrada = pd.DataFrame([[P1, P2, d, q]], columns=COLUMNAS)
         resultado = modelo.predict(entrada)
 
         # Resultados
@@ -94,10 +332,7 @@ def evaluar_zapata():
         print(f"\nResultado: La zapata combinada es {estado} para las condiciones dadas.")
 
         # Estimación de área y dimensiones
-        area_estimada = (P1 + P2) / q
-        margen = 0.5  # Margen de 50 cm a cada lado
-        largo = d + 2 * margen
-        ancho = max(area_estimada / largo, 1.0)  # Ancho mínimo de 1 m
+        area_estimada, largo, ancho = (float(v) for v in dimensionar_zapata(P1, P2, d, q))
 
         # Mostrar resultados en una tabla, incluyendo la precisión del modelo
         resultados = pd.DataFrame([{
@@ -124,35 +359,81 @@ def evaluar_zapata():
         }))
 
         # Visualización con datos de entrenamiento como contexto
-        print("\nGenerando gráfica de dispersión...")
-        plt.figure(figsize=(8, 6))
-        # Mostrar datos de entrenamiento como fondo
-        plt.scatter(X['P1'] + X['P2'], X['d'], c=['green' if label == 1 else 'red' for label in y], 
-                    s=10, alpha=0.2, label='Datos de entrenamiento')
-        # Mostrar punto del usuario
-        color = 'green' if resultado[0] == 1 else 'red'
-        plt.scatter(P1 + P2, d, c=color, s=100, edgecolors='black', label=f'Zapata: {estado}')
-        plt.xlabel('Carga Total (P1 + P2, kN)')
-        plt.ylabel('Distancia entre columnas (m)')
-        plt.title('Clasificación de Zapata Combinada: Adecuada (Verde) vs. No Adecuada (Rojo)')
-        plt.grid(True)
-        # Personalizar la leyenda: sin fondo, borde negro, texto negro, fuera del cuadro principal
-        plt.legend(facecolor='none', edgecolor='black', labelcolor='black', loc='center left', bbox_to_anchor=(1, 0.5))
-        plt.tight_layout()
-        plt.show()
+        if grafico or mostrar:
+            print("\nGenerando gráfica de dispersión...")
+            with etapa('zapatas.grafico', filas=len(X)):
+                graficar_zapata(X, y, P1, P2, d, resultado[0] == 1, grafico, mostrar, modo_grafico)
+            if grafico:
+                print(f"Gráfica guardada en {grafico}")
 
         print("\nNota: Las dimensiones son estimaciones iniciales. Valide con normativas de diseño estructural.")
+        return {'estado': estado, 'area': area_estimada, 'largo': largo, 'ancho': ancho}
 
     except ValueError as e:
         print(f"Error: {e}. Por favor, ingrese valores numéricos válidos.")
     except Exception as e:
         print(f"Error inesperado: {e}. Contacte al desarrollador.")
 
-# Ejecutar evaluación
-evaluar_zapata()
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clasificador de zapatas combinadas con Machine Learning.")
+    parser.add_argument('--lote', metavar='ENTRADA',
+                        help="Evalúa sin interacción ni gráficas un archivo CSV/Parquet con columnas P1, P2, d, q")
+    parser.add_argument('--salida', default='-',
+                        help="Archivo de resultados del modo por lotes (.csv o .parquet); '-' = salida estándar")
+    parser.add_argument('--tamano-bloque', type=int, default=100_000,
+                        help="Filas por bloque en el modo por lotes (por defecto 100000)")
+    parser.add_argument('--valores', nargs=4, type=float, metavar=('P1', 'P2', 'D', 'Q'),
+                        help="Evalúa una zapata sin preguntar los datos")
+    parser.add_argument('--grafico', default='zapata_combinada.png',
+                        help="Archivo PNG de la gráfica ('' para no graficar)")
+    parser.add_argument('--mostrar', action='store_true', help="Abre además la ventana de la gráfica")
+    parser.add_argument('--modo-grafico', choices=MODOS, default='auto',
+                        help="Cómo dibujar los datos de entrenamiento; 'auto' usa densidad por encima de 50000 puntos")
+    parser.add_argument('--n-muestras', type=int, default=1000,
+                        help="Tamaño del conjunto sintético de entrenamiento (por defecto 1000)")
+    args = parser.parse_args(argv)
+
+    # Modo por lotes: los mensajes van a stderr para no mezclarse con la tabla de resultados
+    if args.lote:
+        with etapa('zapatas.obtener_modelo'):
+            modelo, precision, _ = obtener_modelo()
+        print(f"Precisión del modelo en datos de prueba: {precision:.2%}", file=sys.stderr)
+        estadisticas = evaluar_lote(args.lote, args.salida, modelo, tamano_bloque=args.tamano_bloque)
+        print(f"{estadisticas['filas']} zapatas evaluadas ({estadisticas['validas']} válidas) "
+              f"en {estadisticas['segundos']:.2f} s: {estadisticas['filas_por_segundo']:,.0f} filas/s",
+              file=sys.stderr)
+        return 0
+
+    # Instrucciones para el usuario
+    print("""
+=== Clasificador de Zapatas Combinadas con Machine Learning ===
+Este programa evalúa si una zapata combinada es adecuada para soportar dos columnas,
+basándose en sus cargas (P1, P2), la distancia entre ellas (d) y la capacidad portante del suelo (q).
+Usa un árbol de decisión entrenado con datos sintéticos y estima dimensiones iniciales.
+Incluye una gráfica con los datos de entrada del usuario y el conjunto de entrenamiento como contexto.
+Nota: Este es un ejercicio educativo. Valide los resultados con normativas (ej. ACI 318, Eurocódigo).
+Para datos reales, reemplace la función `generar_datos_entrenamiento` con un archivo CSV o datos de proyecto.
+""")
+
+    # Generar y preparar datos
+    print("Generando datos sintéticos...")
+    with etapa('zapatas.generar_datos', filas=args.n_muestras):
+        X, y = generar_datos_entrenamiento(args.n_muestras, n_procesos=os.cpu_count())
 
-# Instrucciones finales
-print("""
+    # Entrenar y evaluar el modelo (o cargarlo de la caché)
+    print("Entrenando el modelo de árbol de decisión...")
+    with etapa('zapatas.obtener_modelo'):
+        modelo, precision, desde_cache = obtener_modelo(args.n_muestras, X=X, y=y)
+    if desde_cache:
+        print("Modelo cargado desde la caché.")
+    print(f"\nPrecisión del modelo en datos de prueba: {precision:.2%}")
+    print("Esto indica qué tan bien el modelo clasifica zapatas adecuadas vs. no adecuadas.\n")
+
+    # Ejecutar evaluación
+    evaluar_zapata(modelo, precision, X, y, args.valores, args.grafico or None, args.mostrar, args.modo_grafico)
+
+    # Instrucciones finales
+    print("""
 === Fin del programa ===
 Para usar datos reales, modifique `generar_datos_entrenamiento` para cargar datos de un proyecto
 (ej. un archivo CSV con columnas P1, P2, d, q, etiqueta).
@@ -160,4 +441,8 @@ Asegúrese de tener instaladas las bibliotecas: numpy, pandas, scikit-learn, mat
 Instálelas con: `pip install numpy pandas scikit-learn matplotlib`
 Guarde este archivo en su repositorio de GitHub y ejecute con Python 3.
 La gráfica muestra la zapata evaluada (punto grande) y los datos de entrenamiento (puntos pequeños).
-""")
\ No newline at end of file
+""")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
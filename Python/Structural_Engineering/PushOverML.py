@@ -1,21 +1,135 @@
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-from sklearn.model_selection import train_test_split
-from sklearn.neural_network import MLPRegressor
-from sklearn.metrics import mean_squared_error, r2_score
-from sklearn.preprocessing import StandardScaler
-import matplotlib.pyplot as plt
+from cache_modelos import obtener_o_entrenar
+from perfilador import etapa
+from graficos import MODOS
 
 # Autor: Oscar Calvo
 # Fecha: Julio 14, 2025
 # Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
 # Descripción: Simulación de análisis Pushover con un modelo estructural simplificado
 #              y predicción de desplazamiento en el colapso usando IA.
+#              scikit-learn y matplotlib se importan solo en las funciones que los usan.
 
 # Simulación de un marco estructural simplificado
+def _curva_bilineal(cargas, k_elastic, yield_force, ductility):
+    """
+    Evalúa la curva elasto-plástica con colapso para arreglos que se difunden (broadcasting)
+    entre sí. Todas las ramas se calculan como operaciones de arreglo, sin bucles.
+    """
+    delta_yield = yield_force / k_elastic
+    elastico = cargas / k_elastic  # Región elástica
+    plastico = delta_yield + (cargas - yield_force) / (k_elastic / ductility)
+    colapso = ductility * delta_yield
+    return np.where(cargas <= yield_force, elastico,
+                    np.where(cargas < yield_force * ductility, plastico, colapso))
+
 def simular_pushover(cargas, k_elastic=1000, yield_force=500, ductility=4):
     """
     Simula el comportamiento Pushover de un marco 1D con elasticidad y plasticidad.
     Retorna desplazamientos considerando un punto de rendimiento y colapso.
+    Con parámetros escalares retorna un arreglo del tamaño de `cargas`. Si k_elastic,
+    yield_force o ductility son arreglos de n_params valores, retorna una matriz
+    (n_params x n_cargas) con una curva por combinación de parámetros.
+    """
+    cargas = np.asarray(cargas, dtype=float)
+    parametros = [np.asarray(p, dtype=float) for p in (k_elastic, yield_force, ductility)]
+    if all(p.ndim == 0 for p in parametros):
+        return _curva_bilineal(cargas, *parametros)
+    k, fy, mu = np.broadcast_arrays(*(np.ravel(p) for p in parametros))
+    return _curva_bilineal(cargas[np.newaxis, :], k[:, np.newaxis], fy[:, np.newaxis], mu[:, np.newaxis])
+
+def _bloque_pushover(cargas, k_elastic, yield_force, ductility, inicio, ruta=None):
+    """
+    Calcula las filas [inicio, inicio + len(k_elastic)) del barrido. Si se da una ruta,
+    las escribe directamente en el archivo .npy (memmap) y retorna el número de filas.
+    """
+    bloque = simular_pushover(cargas, k_elastic, yield_force, ductility)
+    if ruta is None:
+        return bloque
+    destino = np.load(ruta, mmap_mode='r+')
+    destino[inicio:inicio + len(bloque)] = bloque
+    destino.flush()
+    return len(bloque)
+
+def barrido_pushover(cargas, k_elastic, yield_force, ductility, tamano_bloque=10_000, n_procesos=1, salida=None):
+    """
+    Barrido paramétrico de `simular_pushover` sobre miles de combinaciones de parámetros.
+    - cargas: Arreglo de n_cargas cargas (N)
+    - k_elastic, yield_force, ductility: Escalares o arreglos de n_params valores
+    - tamano_bloque: Combinaciones de parámetros calculadas a la vez (limita la memoria temporal)
+    - n_procesos: Procesos en paralelo; 1 calcula los bloques en serie
+    - salida: Archivo .npy opcional; si se da, los bloques se escriben directamente en disco
+    Retorna la matriz de desplazamientos (n_params x n_cargas), en memoria o como memmap.
+    """
+    cargas = np.asarray(cargas, dtype=float)
+    k, fy, mu = np.broadcast_arrays(*(np.ravel(np.asarray(p, dtype=float))
+                                      for p in (k_elastic, yield_force, ductility)))
+    n_params = len(k)
+    if salida is None:
+        desplazamientos = np.empty((n_params, len(cargas)))
+    else:
+        desplazamientos = np.lib.format.open_memmap(salida, mode='w+', dtype=np.float64,
+                                                    shape=(n_params, len(cargas)))
+        desplazamientos.flush()
+
+    inicios = range(0, n_params, tamano_bloque)
+    argumentos = ([cargas] * len(inicios),
+                  [k[i:i + tamano_bloque] for i in inicios],
+                  [fy[i:i + tamano_bloque] for i in inicios],
+                  [mu[i:i + tamano_bloque] for i in inicios],
+                  inicios,
+                  [salida] * len(inicios))
+    if n_procesos == 1:
+        resultados = map(_bloque_pushover, *argumentos)
+    else:
+        pool = ProcessPoolExecutor(max_workers=n_procesos)
+        resultados = pool.map(_bloque_pushover, *argumentos)
+    try:
+        for inicio, bloque in zip(inicios, resultados):
+            if salida is None:
+                desplazamientos[inicio:inicio + len(bloque)] = bloque
+    finally:
+        if n_procesos != 1:
+            pool.shutdown()
+    if salida is not None:
+        desplazamientos = np.load(salida, mmap_mode='r')
+    return desplazamientos
+
+def comparar_con_bucle(n_params=2000, n_cargas=200, semilla=0):
+    """
+    Benchmark: compara el barrido vectorizado con la implementación original en bucle
+    sobre n_params combinaciones aleatorias de parámetros. Verifica que ambos coincidan.
+    Retorna un diccionario con los tiempos (s) y la aceleración.
+    """
+    rng = np.random.default_rng(semilla)
+    cargas = np.linspace(0, 1000, n_cargas)
+    k = rng.uniform(500, 2000, n_params)
+    fy = rng.uniform(200, 800, n_params)
+    mu = rng.uniform(2, 6, n_params)
+
+    inicio = time.perf_counter()
+    referencia = np.array([_simular_pushover_bucle(cargas, k[i], fy[i], mu[i]) for i in range(n_params)])
+    t_bucle = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    vectorizado = barrido_pushover(cargas, k, fy, mu)
+    t_vectorizado = time.perf_counter() - inicio
+
+    if not np.allclose(referencia, vectorizado):
+        raise AssertionError("El barrido vectorizado no coincide con la implementación en bucle.")
+    return {'n_params': n_params, 'n_cargas': n_cargas, 'bucle_s': t_bucle,
+            'vectorizado_s': t_vectorizado, 'aceleracion': t_bucle / t_vectorizado}
+
+# Implementación original con un bucle por carga (se conserva como referencia para el benchmark)
+def _simular_pushover_bucle(cargas, k_elastic=1000, yield_force=500, ductility=4):
+    """
+    Simula el comportamiento Pushover de un marco 1D con elasticidad y plasticidad.
+    Retorna desplazamientos considerando un punto de rendimiento y colapso.
+    Versión escalar de `simular_pushover`, usada para verificar y comparar tiempos.
     """
     desplazamientos = np.zeros_like(cargas)
     for i, carga in enumerate(cargas):
@@ -30,47 +144,347 @@ def simular_pushover(cargas, k_elastic=1000, yield_force=500, ductility=4):
                 desplazamientos[i] = delta_ultimate  # Colapso
     return desplazamientos
 
-# Generar datos de entrenamiento
-np.random.seed(42)
-cargas = np.linspace(0, 1000, 200)
-desplazamientos = simular_pushover(cargas)
-X = np.column_stack((cargas, cargas**2 / 1000))  # Añadir término no lineal
-y = desplazamientos + np.random.normal(0, 0.01 * desplazamientos)
+# Pushover de un edificio de cortante de N pisos
+# Cada piso es un resorte bilineal (rigidez k, fuerza de fluencia fy y endurecimiento cinemático
+# alfa*k) entre dos losas; la matriz de rigidez tangente es tridiagonal y se guarda en banda.
+# La solución es incremental-iterativa con control del desplazamiento de techo (Newton-Raphson
+# con el factor de carga como incógnita adicional). La factorización de Cholesky se reutiliza mientras la
+# rigidez tangente no cambie (es decir, mientras ningún piso entre o salga de fluencia), y con
+# ella se resuelven a la vez el patrón de carga y el residuo. Varios edificios del mismo número
+# de pisos se resuelven juntos como bloques independientes de una sola matriz.
+
+def propiedades_edificio(n_pisos, n_edificios=1, fluencia_base=500.0, variacion=0.2, semilla=42):
+    """
+    Rigidez y fuerza de fluencia por piso de edificios sintéticos, arreglos (n_edificios x n_pisos).
+    La rigidez decrece linealmente hasta la mitad en el último piso y la resistencia sigue el
+    cortante de piso del patrón triangular con una sobrerresistencia aleatoria de hasta `variacion`.
+    Con 1000*n_pisos de rigidez en la base la flexibilidad global es del orden de `simular_pushover`.
+    """
+    rng = np.random.default_rng(semilla)
+    altura = np.arange(1, n_pisos + 1) / n_pisos
+    cortante_piso = np.cumsum(altura[::-1])[::-1] / altura.sum()
+    rigidez = 1000.0 * n_pisos * (1 - 0.5 * (altura - altura[0]))
+    fluencia = fluencia_base * cortante_piso * rng.uniform(1, 1 + variacion, (n_edificios, n_pisos))
+    return np.broadcast_to(rigidez, (n_edificios, n_pisos)).copy(), fluencia
+
+def _resortes_pisos(deriva, deriva_plastica, rigidez, fluencia, alfa):
+    """
+    Resorte bilineal con endurecimiento cinemático, evaluado para todos los pisos a partir de la
+    deriva plástica del último paso convergido. Retorna (cortante, rigidez tangente, deriva plástica).
+    """
+    rigidez_plastica = (1 - alfa) * rigidez
+    prueba = rigidez_plastica * (deriva - deriva_plastica)
+    limite = (1 - alfa) * fluencia
+    fluye = np.abs(prueba) > limite
+    deriva_plastica = np.where(fluye, deriva - np.sign(prueba) * limite / rigidez_plastica, deriva_plastica)
+    cortante = alfa * rigidez * deriva + rigidez_plastica * (deriva - deriva_plastica)
+    # Un resorte que quedó en el límite al final del paso anterior sigue cargando en fluencia
+    en_limite = np.abs(prueba) >= limite * (1 - 1e-9)
+    return cortante, np.where(en_limite, alfa * rigidez, rigidez), deriva_plastica
+
+def _factorizar(tangente):
+    """
+    Factorización de Cholesky de la matriz tridiagonal por bloques de (n_edificios x n_pisos)
+    resortes, guardada en forma de banda (2 x n): O(n) en tiempo y memoria.
+    """
+    from scipy.linalg import cholesky_banded
+    banda = np.zeros((2, tangente.size))
+    superior = tangente.copy()
+    superior[:, 0] = 0  # Sin acople entre el techo de un edificio y la base del siguiente
+    banda[0] = -superior.ravel()
+    banda[1] = (tangente + np.pad(tangente[:, 1:], ((0, 0), (0, 1)))).ravel()
+    return cholesky_banded(banda, lower=False)
+
+def _resolver(factor, b):
+    from scipy.linalg import cho_solve_banded
+    return cho_solve_banded((factor, False), b, check_finite=False)
+
+def pushover_cortante(rigidez, fluencia, alfa=0.05, patron='triangular', ductilidad=5.0, n_pasos=200,
+                      tolerancia=1e-8, max_iter=20, max_subdivisiones=8, reutilizar=True):
+    """
+    Pushover con control de desplazamiento de edificios de cortante de N pisos.
+    - rigidez, fluencia: Rigidez (N/m) y fuerza de fluencia (N) por piso, (n_pisos,) o (n_edificios x n_pisos)
+    - alfa: Relación entre la rigidez posterior a la fluencia y la inicial
+    - patron: 'triangular', 'uniforme' o un arreglo de fuerzas laterales por losa (se normaliza a suma 1)
+    - ductilidad: El desplazamiento de techo final es `ductilidad` veces el de la primera fluencia
+    - n_pasos: Pasos iguales de desplazamiento de techo; un paso que no converge en `max_iter`
+      iteraciones se divide en dos, hasta `max_subdivisiones` veces
+    - reutilizar: Si es False se factoriza en cada iteración (solo para comparar tiempos)
+    Retorna (cortante_basal, desplazamiento_techo, estadisticas); las curvas son arreglos
+    (n_edificios x n_pasos+1), o (n_pasos+1,) si las propiedades eran de un solo edificio.
+    """
+    if not 0 < alfa < 1:
+        raise ValueError("alfa debe estar entre 0 y 1 para que la rigidez tangente sea definida positiva.")
+    un_edificio = np.ndim(rigidez) == 1 and np.ndim(fluencia) == 1
+    rigidez, fluencia = np.broadcast_arrays(np.atleast_2d(np.asarray(rigidez, dtype=float)),
+                                            np.atleast_2d(np.asarray(fluencia, dtype=float)))
+    n_edificios, n_pisos = rigidez.shape
+    if isinstance(patron, str):
+        if patron not in ('triangular', 'uniforme'):
+            raise ValueError(f"Patrón de carga desconocido: {patron}")
+        patron = np.arange(1.0, n_pisos + 1) if patron == 'triangular' else np.ones(n_pisos)
+    patron = np.broadcast_to(np.asarray(patron, dtype=float), (n_edificios, n_pisos))
+    patron = patron / patron.sum(axis=1, keepdims=True)  # El factor de carga es el cortante basal
 
-# Escalar datos
-scaler_X = StandardScaler()
-scaler_y = StandardScaler()
-X_scaled = scaler_X.fit_transform(X)
-y_scaled = scaler_y.fit_transform(y.reshape(-1, 1)).ravel()
+    # Desplazamiento de techo en la primera fluencia, a partir de la solución elástica con carga unitaria
+    factor_k = _factorizar(rigidez)
+    techo_unitario = _resolver(factor_k, patron.ravel()).reshape(n_edificios, n_pisos)[:, -1]
+    cortante_unitario = np.cumsum(patron[:, ::-1], axis=1)[:, ::-1]
+    techo_fluencia = techo_unitario * np.min(fluencia / cortante_unitario, axis=1)
+    incremento = ductilidad * techo_fluencia / n_pasos
 
-# Dividir en entrenamiento y prueba
-X_train, X_test, y_train, y_test = train_test_split(X_scaled, y_scaled, test_size=0.2, random_state=42)
+    desplazamiento = np.zeros((n_edificios, n_pisos))
+    deriva_plastica = np.zeros((n_edificios, n_pisos))
+    factor = np.zeros(n_edificios)
+    tangente_factorizada = rigidez.copy()
+    cortante_basal = np.zeros((n_edificios, n_pasos + 1))
+    techo = np.zeros((n_edificios, n_pasos + 1))
+    tolerancia_fuerza = tolerancia * fluencia.max()
+    estadisticas = {'factorizaciones': 1, 'iteraciones': 0, 'subdivisiones': 0}
+
+    def equilibrar(objetivo):
+        """Iteraciones de Newton para avanzar el techo `objetivo`; retorna None si no convergen."""
+        nonlocal factor_k, tangente_factorizada
+        delta_u = np.zeros_like(desplazamiento)
+        delta_factor = np.zeros(n_edificios)
+        for iteracion in range(max_iter + 1):
+            deriva = np.diff(desplazamiento + delta_u, axis=1, prepend=0.0)
+            cortante, tangente, deriva_plastica_prueba = _resortes_pisos(deriva, deriva_plastica, rigidez, fluencia, alfa)
+            fuerza_interna = cortante - np.pad(cortante[:, 1:], ((0, 0), (0, 1)))
+            residuo = (factor + delta_factor)[:, np.newaxis] * patron - fuerza_interna
+            if iteracion > 0 and np.abs(residuo).max() <= tolerancia_fuerza:
+                return delta_u, delta_factor, cortante, deriva_plastica_prueba
+            if iteracion == max_iter:
+                return None
+            if not reutilizar or not np.array_equal(tangente, tangente_factorizada):
+                factor_k = _factorizar(tangente)
+                tangente_factorizada = tangente
+                estadisticas['factorizaciones'] += 1
+            a, b = _resolver(factor_k, np.column_stack((patron.ravel(), residuo.ravel()))).T
+            a, b = a.reshape(n_edificios, n_pisos), b.reshape(n_edificios, n_pisos)
+            # El primer ajuste impone el incremento de techo; los siguientes lo mantienen
+            d_factor = ((objetivo if iteracion == 0 else 0.0) - b[:, -1]) / a[:, -1]
+            delta_u += d_factor[:, np.newaxis] * a + b
+            delta_factor += d_factor
+            estadisticas['iteraciones'] += 1
+
+    for paso in range(1, n_pasos + 1):
+        # Si Newton no converge (p. ej. varios pisos cambian de rama a la vez) el paso se divide en dos
+        subpasos, hechos = 1, 0
+        while hechos < subpasos:
+            resultado = equilibrar(incremento / subpasos)
+            if resultado is None:
+                if subpasos >= 2 ** max_subdivisiones:
+                    raise RuntimeError(f"El pushover no convergió en el paso {paso} con {subpasos} subpasos.")
+                subpasos, hechos = 2 * subpasos, 2 * hechos
+                estadisticas['subdivisiones'] += 1
+                continue
+            delta_u, delta_factor, cortante, deriva_plastica = resultado
+            desplazamiento += delta_u
+            factor += delta_factor
+            hechos += 1
+        cortante_basal[:, paso] = cortante[:, 0]
+        techo[:, paso] = desplazamiento[:, -1]
+
+    estadisticas.update(n_edificios=n_edificios, n_pisos=n_pisos, n_pasos=n_pasos)
+    if un_edificio:
+        return cortante_basal[0], techo[0], estadisticas
+    return cortante_basal, techo, estadisticas
+
+def benchmark_edificio(n_pisos=2000, n_pasos=300, semilla=0):
+    """
+    Benchmark del pushover de un edificio de n_pisos: mejor tiempo de 3 reutilizando la
+    factorización frente a factorizar en cada iteración. Verifica que ambas curvas coincidan.
+    """
+    rigidez, fluencia = propiedades_edificio(n_pisos, semilla=semilla)
+    pushover_cortante(rigidez[0, :2], fluencia[0, :2], n_pasos=2)  # Importa scipy fuera de la medición
+
+    def medir(reutilizar, repeticiones=3):
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            resultado = pushover_cortante(rigidez[0], fluencia[0], n_pasos=n_pasos, reutilizar=reutilizar)
+            tiempos.append(time.perf_counter() - inicio)
+        return resultado, min(tiempos)
+
+    (cortante, techo, estadisticas), t_reutilizando = medir(True)
+    (cortante_ref, techo_ref, _), t_sin_reutilizar = medir(False)
+    if not (np.allclose(cortante, cortante_ref) and np.allclose(techo, techo_ref)):
+        raise AssertionError("Las curvas con y sin reutilizar la factorización no coinciden.")
+    return {**estadisticas, 'reutilizando_s': t_reutilizando, 'sin_reutilizar_s': t_sin_reutilizar}
+
+# Hiperparámetros de la red neuronal
+HIPERPARAMETROS = {'hidden_layer_sizes': (30, 20), 'max_iter': 2000, 'random_state': 42}
+
+# Generar datos de entrenamiento
+def generar_datos(n_cargas=200, carga_maxima=1000, ruido=0.01, semilla=42):
+    """
+    Genera la curva Pushover con ruido relativo y las características de entrada.
+    Retorna (cargas, X, y), con X = [carga, carga^2/1000].
+    """
+    np.random.seed(semilla)
+    cargas = np.linspace(0, carga_maxima, n_cargas)
+    desplazamientos = simular_pushover(cargas)
+    X = np.column_stack((cargas, cargas**2 / 1000))  # Añadir término no lineal
+    y = desplazamientos + np.random.normal(0, ruido * desplazamientos)
+    return cargas, X, y
 
 # Entrenar modelo de IA
-modelo = MLPRegressor(hidden_layer_sizes=(30, 20), max_iter=2000, random_state=42)
-modelo.fit(X_train, y_train)
-
-# Predicciones
-y_pred_scaled = modelo.predict(X_test)
-y_pred = scaler_y.inverse_transform(y_pred_scaled.reshape(-1, 1)).ravel()
-y_test_unscaled = scaler_y.inverse_transform(y_test.reshape(-1, 1)).ravel()
-X_test_unscaled = scaler_X.inverse_transform(X_test)[:, 0]  # Solo la carga como eje X
-
-# Métricas
-mse = mean_squared_error(y_test_unscaled, y_pred)
-r2 = r2_score(y_test_unscaled, y_pred)
-print(f"Error Cuadrático Medio (MSE): {mse:.4f}")
-print(f"Coeficiente de Determinación (R²): {r2:.4f}")
-
-# Visualización
-plt.figure(figsize=(10, 6))
-plt.plot(cargas, simular_pushover(cargas), 'b-', label="Curva Pushover Real", linewidth=2)
-plt.scatter(X_test_unscaled, y_pred, color='red', label="Predicción IA", s=20)
-plt.xlabel("Carga (N)")
-plt.ylabel("Desplazamiento (m)")
-plt.title("Análisis Pushover: Curva Real vs. Predicción con IA")
-plt.legend(loc='upper left', bbox_to_anchor=(1, 1))
-plt.grid(True)
-plt.tight_layout()
-plt.savefig('pushover_structural_plot.png')
-plt.show()
\ No newline at end of file
+def entrenar_modelo(X, y):
+    """
+    Ajusta los escaladores y entrena la red con el 80% de los datos.
+    Retorna (modelo, scaler_X, scaler_y).
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.neural_network import MLPRegressor
+    from sklearn.preprocessing import StandardScaler
+    with etapa('pushover.escalar', filas=len(X)):
+        scaler_X = StandardScaler().fit(X)
+        scaler_y = StandardScaler().fit(y.reshape(-1, 1))
+        X_train, _, y_train, _ = train_test_split(scaler_X.transform(X), scaler_y.transform(y.reshape(-1, 1)).ravel(),
+                                                  test_size=0.2, random_state=42)
+    modelo = MLPRegressor(**HIPERPARAMETROS)
+    with etapa('pushover.fit', filas=len(X_train)):
+        modelo.fit(X_train, y_train)
+    return modelo, scaler_X, scaler_y
+
+def curva_edificio(n_pisos, n_pasos=200, semilla=42):
+    """Curva Pushover (cortante basal, desplazamiento de techo) del edificio sintético de n_pisos."""
+    rigidez, fluencia = propiedades_edificio(n_pisos, semilla=semilla)
+    cortante, techo, _ = pushover_cortante(rigidez[0], fluencia[0], n_pasos=n_pasos)
+    return cortante, techo
+
+def generar_datos_edificio(n_pisos=10, n_pasos=200, ruido=0.01, semilla=42):
+    """
+    Igual que `generar_datos`, pero con la curva del edificio de cortante de n_pisos:
+    la carga es el cortante basal y el desplazamiento el de techo. Retorna (cortantes, X, y, techo),
+    con `techo` el desplazamiento de techo sin ruido (la curva real, para graficar sin resolver de nuevo).
+    """
+    cortantes, techo = curva_edificio(n_pisos, n_pasos, semilla)
+    rng = np.random.default_rng(semilla)
+    X = np.column_stack((cortantes, cortantes**2 / 1000))
+    y = techo + rng.normal(0, ruido * techo)
+    return cortantes, X, y, techo
+
+PARAMETROS_DATOS = {'n_cargas': 200, 'carga_maxima': 1000, 'ruido': 0.01, 'semilla': 42}
+
+def obtener_modelo(X=None, y=None, parametros_datos=PARAMETROS_DATOS):
+    """
+    Retorna ((modelo, scaler_X, scaler_y), desde_cache). El modelo y sus escaladores se cargan
+    de la caché si ya se entrenaron con los mismos datos; X, y deben provenir de
+    generar_datos(**parametros_datos) (o de generar_datos_edificio si los parámetros incluyen
+    n_pisos) y, si se omiten, se generan aquí solo cuando el modelo no está en la caché.
+    """
+    if 'n_pisos' in parametros_datos:
+        nombre, generador = 'pushover-edificio', generar_datos_edificio
+        funciones = (_resortes_pisos, _factorizar, _resolver, pushover_cortante, propiedades_edificio, curva_edificio,
+                     generar_datos_edificio, entrenar_modelo)
+    else:
+        nombre, generador = 'pushover', generar_datos
+        funciones = (_curva_bilineal, simular_pushover, generar_datos, entrenar_modelo)
+
+    def entrenar():
+        datos = (X, y) if X is not None else generador(**parametros_datos)[1:3]
+        return entrenar_modelo(*datos)
+    return obtener_o_entrenar(
+        nombre, {**parametros_datos, 'test_size': 0.2, 'hiperparametros': HIPERPARAMETROS},
+        entrenar, funciones=funciones)
+
+def graficar_pushover(cargas, X_prueba, y_pred, ruta='pushover_structural_plot.png', mostrar=False, modo='auto',
+                      desplazamientos=None):
+    """
+    Curva Pushover real frente a las predicciones de la red. Sin `mostrar` solo se guarda en `ruta` (Agg).
+    `desplazamientos` es la curva real para `cargas`; si se omite se usa `simular_pushover(cargas)`.
+    La curva se reduce a su envolvente y las predicciones se dibujan como densidad o submuestra
+    cuando son muchas (`modo`, ver `graficos.dispersion_grande`).
+    """
+    from graficos import pyplot, finalizar, dispersion_grande, decimar_curva
+    plt = pyplot(mostrar)
+    plt.figure(figsize=(10, 6))
+    if desplazamientos is None:
+        desplazamientos = simular_pushover(cargas)
+    plt.plot(*decimar_curva(cargas, desplazamientos), 'b-', label="Curva Pushover Real", linewidth=2)
+    dispersion_grande(plt.gca(), X_prueba, y_pred, modo=modo, color='red', label="Predicción IA", s=20)
+    plt.xlabel("Carga (N)")
+    plt.ylabel("Desplazamiento (m)")
+    plt.title("Análisis Pushover: Curva Real vs. Predicción con IA")
+    plt.legend(loc='upper left', bbox_to_anchor=(1, 1))
+    plt.grid(True)
+    plt.tight_layout()
+    finalizar(plt, ruta, mostrar)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Análisis Pushover simplificado con predicción por IA.")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="Compara el barrido vectorizado con la implementación en bucle y termina")
+    parser.add_argument('--n-params', type=int, default=2000,
+                        help="Combinaciones de parámetros del benchmark (por defecto 2000)")
+    parser.add_argument('--pisos', type=int, default=0,
+                        help="Usa un edificio de cortante de N pisos en lugar del marco 1D (con --benchmark, mide el solucionador)")
+    parser.add_argument('--n-pasos', type=int, default=200, help="Pasos de desplazamiento del pushover del edificio")
+    parser.add_argument('--grafico', default='pushover_structural_plot.png',
+                        help="Archivo PNG de la gráfica ('' para no graficar)")
+    parser.add_argument('--mostrar', action='store_true', help="Abre además la ventana de la gráfica")
+    parser.add_argument('--modo-grafico', choices=MODOS, default='auto',
+                        help="Cómo dibujar las predicciones; 'auto' usa densidad por encima de 50000 puntos")
+    args = parser.parse_args(argv)
+    if args.benchmark and args.pisos:
+        r = benchmark_edificio(args.pisos, args.n_pasos)
+        print(f"Edificio de {r['n_pisos']} pisos, {r['n_pasos']} pasos ({r['iteraciones']} iteraciones):")
+        print(f"  Reutilizando la factorización: {r['reutilizando_s']:.3f} s  ({r['factorizaciones']} factorizaciones)")
+        print(f"  Factorizando en cada iteración: {r['sin_reutilizar_s']:.3f} s")
+        return 0
+    if args.benchmark:
+        r = comparar_con_bucle(n_params=args.n_params)
+        print(f"Barrido de {r['n_params']} combinaciones x {r['n_cargas']} cargas:")
+        print(f"  Bucle original: {r['bucle_s']:.3f} s")
+        print(f"  Vectorizado:    {r['vectorizado_s']:.4f} s  ({r['aceleracion']:.0f}x más rápido)")
+        return 0
+
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import mean_squared_error, r2_score
+    if args.pisos:
+        parametros = {'n_pisos': args.pisos, 'n_pasos': args.n_pasos, 'ruido': 0.01, 'semilla': 42}
+        with etapa('pushover.edificio', filas=args.pisos * args.n_pasos):
+            cargas, X, y, desplazamientos = generar_datos_edificio(**parametros)
+    else:
+        parametros, desplazamientos = PARAMETROS_DATOS, None
+        with etapa('pushover.generar_datos', filas=PARAMETROS_DATOS['n_cargas']):
+            cargas, X, y = generar_datos(**PARAMETROS_DATOS)
+
+    # Entrenar (o cargar de la caché) el modelo y sus escaladores
+    with etapa('pushover.obtener_modelo'):
+        (modelo, scaler_X, scaler_y), desde_cache = obtener_modelo(X, y, parametros)
+    if desde_cache:
+        print("Modelo cargado desde la caché.")
+
+    # Escalar datos
+    with etapa('pushover.escalar', filas=len(X)):
+        X_scaled = scaler_X.transform(X)
+        y_scaled = scaler_y.transform(y.reshape(-1, 1)).ravel()
+
+    # Dividir en entrenamiento y prueba
+    X_train, X_test, y_train, y_test = train_test_split(X_scaled, y_scaled, test_size=0.2, random_state=42)
+
+    # Predicciones
+    with etapa('pushover.predict', filas=len(X_test)):
+        y_pred_scaled = modelo.predict(X_test)
+    y_pred = scaler_y.inverse_transform(y_pred_scaled.reshape(-1, 1)).ravel()
+    y_test_unscaled = scaler_y.inverse_transform(y_test.reshape(-1, 1)).ravel()
+    X_test_unscaled = scaler_X.inverse_transform(X_test)[:, 0]  # Solo la carga como eje X
+
+    # Métricas
+    mse = mean_squared_error(y_test_unscaled, y_pred)
+    r2 = r2_score(y_test_unscaled, y_pred)
+    print(f"Error Cuadrático Medio (MSE): {mse:.4f}")
+    print(f"Coeficiente de Determinación (R²): {r2:.4f}")
+
+    # Visualización
+    if args.grafico or args.mostrar:
+        with etapa('pushover.grafico', filas=len(cargas)):
+            graficar_pushover(cargas, X_test_unscaled, y_pred, args.grafico or None, args.mostrar, args.modo_grafico,
+                              desplazamientos)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
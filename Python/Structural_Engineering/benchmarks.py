@@ -0,0 +1,309 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+#
+#Autor: Oscar Calvo
+# Fecha: Octubre 18/2026
+# Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
+#
+# Benchmarks de generación de datos, entrenamiento, predicción y gráficas de los scripts de
+# ingeniería estructural, para varios tamaños (1e3 a 1e7 filas). Cada caso mide el mejor
+# tiempo de varias repeticiones y, en una ejecución aparte, el pico de memoria con tracemalloc
+# (incluye los arreglos de NumPy; no incluye memoria reservada directamente por extensiones en C).
+# Los resultados se guardan en JSON para compararlos entre commits:
+#   python benchmarks.py --salida base.json
+#   python benchmarks.py --salida nuevo.json --comparar base.json --umbral 0.2
+# La comparación termina con código 1 si algún caso es más lento (o usa más memoria) que la
+# referencia en más del umbral relativo.
+
+TAMANOS = [1_000, 10_000, 100_000, 1_000_000, 10_000_000]
+
+# Cada preparador recibe n y retorna la función a medir; lo que hace antes de retornarla
+# (datos, modelos ya entrenados) queda fuera de la medición.
+
+def _zapatas_generar(n):
+    from CombinedFootML import generar_datos_entrenamiento
+    return lambda: generar_datos_entrenamiento(n)
+
+def _vigas_generar(n):
+    from structural_damage_classifier_with_plot2 import generate_synthetic_data
+    return lambda: generate_synthetic_data(n)
+
+def _pushover_simular(n):
+    import numpy as np
+    from PushOverML import simular_pushover
+    cargas = np.linspace(0, 1000, n)
+    return lambda: simular_pushover(cargas)
+
+def _pushover_edificio(n):
+    from PushOverML import propiedades_edificio, pushover_cortante
+    rigidez, fluencia = propiedades_edificio(n)
+    return lambda: pushover_cortante(rigidez[0], fluencia[0], n_pasos=200)
+
+def _ciclo_realista_area(n):
+    from histeresisNL import generar_ciclo_realista, calcular_area
+
+    def ejecutar():
+        for _ in range(n):
+            calcular_area(*generar_ciclo_realista(2.0, 4.0, 5.0))
+    return ejecutar
+
+def _ciclos_vectorizados(n):
+    from histeresisNL import generar_datos_masivos
+    return lambda: generar_datos_masivos(max(n // 3, 1))
+
+def _zapatas_entrenar(n):
+    from CombinedFootML import entrenar_modelo, generar_datos_entrenamiento
+    X, y = generar_datos_entrenamiento(n)
+    return lambda: entrenar_modelo(X, y)
+
+def _zapatas_predecir(n):
+    from CombinedFootML import entrenar_modelo, generar_datos_entrenamiento
+    modelo, _ = entrenar_modelo(*generar_datos_entrenamiento(10_000))
+    X, _ = generar_datos_entrenamiento(n, semilla=1)
+    return lambda: modelo.predict(X)
+
+def _vigas_datos(n, seed=42):
+    from structural_damage_classifier_with_plot2 import FEATURES, generate_synthetic_data
+    data = generate_synthetic_data(n, seed=seed)
+    return data[FEATURES], data['is_damaged']
+
+def _vigas_entrenar(n):
+    from structural_damage_classifier_with_plot2 import train_model
+    X, y = _vigas_datos(n)
+    return lambda: train_model(X, y)
+
+def _vigas_predecir(n):
+    from structural_damage_classifier_with_plot2 import train_model
+    modelo = train_model(*_vigas_datos(10_000))
+    X, _ = _vigas_datos(n, seed=1)
+    return lambda: modelo.predict(X)
+
+def _pushover_entrenar(n):
+    from PushOverML import entrenar_modelo, generar_datos
+    _, X, y = generar_datos(n_cargas=n)
+    return lambda: entrenar_modelo(X, y)
+
+def _pushover_predecir(n):
+    from PushOverML import entrenar_modelo, generar_datos
+    _, X, y = generar_datos()
+    modelo, scaler_X, scaler_y = entrenar_modelo(X, y)
+    _, X, _ = generar_datos(n_cargas=n)
+    return lambda: scaler_y.inverse_transform(modelo.predict(scaler_X.transform(X)).reshape(-1, 1))
+
+def _bouc_wen(n):
+    import numpy as np
+    from bouc_wen import armonica, integrar, parametros_aleatorios
+
+    def ejecutar():
+        p = parametros_aleatorios(n, np.random.default_rng(0))
+        frecuencia = p['omega'] / (2 * np.pi)
+        for _ in integrar(p, armonica(p['omega']**2 * p['uy'], frecuencia), 200, 1 / (150 * frecuencia)):
+            pass
+    return ejecutar
+
+def _histeresis_entrenar(n):
+    from histeresisNL import entrenar_modelo, generar_datos_masivos
+    X, y = generar_datos_masivos(max(n // 3, 1))
+    return lambda: entrenar_modelo(X, y)
+
+def _histeresis_predecir(n):
+    from histeresisNL import entrenar_modelo, generar_datos_masivos
+    ia_clasificador, scaler = entrenar_modelo(*generar_datos_masivos(50))
+    X, _ = generar_datos_masivos(max(n // 3, 1), semilla=1)
+    return lambda: ia_clasificador.predict(scaler.transform(X))
+
+def _grafico_dispersion(n):
+    import numpy as np
+    from graficos import pyplot, finalizar
+    rng = np.random.default_rng(0)
+    x, y = rng.random(n), rng.random(n)
+    colores = np.where(rng.random(n) > 0.5, 'green', 'red')
+    plt = pyplot()
+
+    def ejecutar():
+        plt.figure(figsize=(8, 6))
+        plt.scatter(x, y, c=colores, s=10, alpha=0.2)
+        finalizar(plt, io.BytesIO())
+    return ejecutar
+
+def _grafico_densidad(n):
+    import numpy as np
+    from graficos import pyplot, finalizar, dispersion_grande
+    rng = np.random.default_rng(0)
+    x, y = rng.random(n), rng.random(n)
+    etiquetas = (rng.random(n) > 0.5).astype(np.int8)
+    plt = pyplot()
+
+    def ejecutar():
+        plt.figure(figsize=(8, 6))
+        dispersion_grande(plt.gca(), x, y, etiquetas, colores={1: 'green', 0: 'red'}, modo='densidad')
+        finalizar(plt, io.BytesIO())
+    return ejecutar
+
+# (nombre, tamaño máximo, preparador). El tamaño máximo evita casos que tardarían horas
+# (redes con max_iter=2000) o que no caben en memoria (activaciones de la red para 1e7 filas).
+CASOS = [
+    ('zapatas.generar_datos_entrenamiento', 10_000_000, _zapatas_generar),
+    ('vigas.generate_synthetic_data', 10_000_000, _vigas_generar),
+    ('pushover.simular_pushover', 10_000_000, _pushover_simular),
+    ('pushover.edificio_cortante', 100_000, _pushover_edificio),
+    ('histeresis.generar_ciclo_realista+calcular_area', 100_000, _ciclo_realista_area),
+    ('histeresis.generar_datos_masivos', 1_000_000, _ciclos_vectorizados),
+    ('histeresis.bouc_wen_200_pasos', 100_000, _bouc_wen),
+    ('zapatas.entrenar', 1_000_000, _zapatas_entrenar),
+    ('zapatas.predecir', 10_000_000, _zapatas_predecir),
+    ('vigas.entrenar', 1_000_000, _vigas_entrenar),
+    ('vigas.predecir', 10_000_000, _vigas_predecir),
+    ('pushover.entrenar', 10_000, _pushover_entrenar),
+    ('pushover.predecir', 1_000_000, _pushover_predecir),
+    ('histeresis.entrenar', 10_000, _histeresis_entrenar),
+    ('histeresis.predecir', 1_000_000, _histeresis_predecir),
+    ('grafico.dispersion', 1_000_000, _grafico_dispersion),
+    ('grafico.densidad', 10_000_000, _grafico_densidad),
+]
+
+def medir(funcion, tiempo_min=0.5, max_repeticiones=5):
+    """
+    Mejor tiempo (s) de hasta `max_repeticiones` ejecuciones (se detiene al acumular `tiempo_min`)
+    y pico de memoria (MB) de una ejecución adicional bajo tracemalloc.
+    Retorna (segundos, memoria_pico_mb, repeticiones).
+    """
+    tiempos = []
+    while len(tiempos) < max_repeticiones and (not tiempos or sum(tiempos) < tiempo_min):
+        gc.collect()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        funcion()
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return min(tiempos), pico / 1024 ** 2, len(tiempos)
+
+def _metadatos():
+    import numpy as np
+    import sklearn
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'sklearn': sklearn.__version__,
+        'plataforma': platform.platform(),
+        'procesador': platform.processor() or platform.machine(),
+        'nucleos': os.cpu_count(),
+    }
+
+def _precargar():
+    """Importa de antemano las bibliotecas que los scripts cargan al usarlas, para no medir su importación."""
+    import pandas, sklearn.tree, sklearn.neural_network, sklearn.model_selection, sklearn.metrics, sklearn.preprocessing
+    import scipy.linalg
+    from graficos import pyplot
+    pyplot()
+
+def ejecutar_benchmarks(tamanos=TAMANOS, casos=None, informe=None):
+    """
+    Ejecuta los casos (todos o los que contengan alguno de los textos de `casos`) para cada
+    tamaño que no supere su máximo. `informe` recibe cada resultado a medida que se obtiene.
+    Retorna el diccionario {'metadatos': ..., 'resultados': [...]} que se guarda como JSON.
+    """
+    _precargar()
+    resultados = []
+    for nombre, n_max, preparar in CASOS:
+        if casos and not any(c in nombre for c in casos):
+            continue
+        for n in tamanos:
+            if n > n_max:
+                continue
+            with contextlib.redirect_stdout(io.StringIO()):  # Los scripts imprimen su progreso
+                funcion = preparar(n)
+                segundos, memoria, repeticiones = medir(funcion)
+            del funcion
+            resultado = {'caso': nombre, 'n': n, 'segundos': segundos, 'memoria_pico_mb': memoria,
+                         'repeticiones': repeticiones}
+            resultados.append(resultado)
+            if informe:
+                informe(resultado)
+    return {'metadatos': _metadatos(), 'resultados': resultados}
+
+def comparar(actual, referencia, umbral=0.2, umbral_memoria=None, minimo_s=0.001):
+    """
+    Compara dos resultados (diccionarios de `ejecutar_benchmarks` o JSON cargados) por (caso, n).
+    Un caso es regresión si su tiempo supera al de referencia en más de `umbral` (relativo) o
+    su memoria en más de `umbral_memoria` (por defecto el mismo umbral). Los tiempos de
+    referencia menores a `minimo_s` se ignoran por ser ruido.
+    Retorna la lista de comparaciones, cada una con 'regresion' True/False.
+    """
+    umbral_memoria = umbral if umbral_memoria is None else umbral_memoria
+    base = {(r['caso'], r['n']): r for r in referencia['resultados']}
+    comparaciones = []
+    for r in actual['resultados']:
+        b = base.get((r['caso'], r['n']))
+        if b is None:
+            continue
+        razon_tiempo = r['segundos'] / b['segundos'] if b['segundos'] > 0 else 1.0
+        razon_memoria = r['memoria_pico_mb'] / b['memoria_pico_mb'] if b['memoria_pico_mb'] > 0.01 else 1.0
+        regresion = ((b['segundos'] >= minimo_s and razon_tiempo > 1 + umbral)
+                     or razon_memoria > 1 + umbral_memoria)
+        comparaciones.append({'caso': r['caso'], 'n': r['n'], 'razon_tiempo': razon_tiempo,
+                              'razon_memoria': razon_memoria, 'regresion': regresion})
+    return comparaciones
+
+def _imprimir(r):
+    print(f"{r['caso']:<50}{r['n']:>12,}{r['segundos']:>12.4f}{r['memoria_pico_mb']:>12.1f}{r['repeticiones']:>6}",
+          flush=True)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de tiempo y memoria de los scripts de ingeniería estructural.")
+    parser.add_argument('--tamanos', nargs='+', type=float, default=TAMANOS, help="Tamaños (filas), ej. 1e3 1e5")
+    parser.add_argument('--casos', nargs='+', help="Solo los casos cuyo nombre contenga alguno de estos textos")
+    parser.add_argument('--salida', default='benchmarks.json', help="Archivo JSON de resultados")
+    parser.add_argument('--comparar', metavar='REFERENCIA', help="JSON de referencia (ej. del commit anterior)")
+    parser.add_argument('--umbral', type=float, default=0.2, help="Aumento relativo de tiempo tolerado (0.2 = 20%%)")
+    parser.add_argument('--umbral-memoria', type=float, help="Aumento relativo de memoria tolerado (por defecto --umbral)")
+    parser.add_argument('--listar', action='store_true', help="Muestra los casos y sus tamaños máximos")
+    args = parser.parse_args(argv)
+
+    if args.listar:
+        for nombre, n_max, _ in CASOS:
+            print(f"{nombre:<50}hasta {n_max:,}")
+        return 0
+
+    print(f"{'Caso':<50}{'n':>12}{'Tiempo (s)':>12}{'Pico (MB)':>12}{'Rep.':>6}")
+    actual = ejecutar_benchmarks([int(n) for n in args.tamanos], args.casos, informe=_imprimir)
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(actual, archivo, indent=2, ensure_ascii=False)
+    print(f"\nResultados guardados en {args.salida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            referencia = json.load(archivo)
+        comparaciones = comparar(actual, referencia, args.umbral, args.umbral_memoria)
+        print(f"\nComparación con {args.comparar} (commit {referencia['metadatos'].get('commit')}):")
+        for c in comparaciones:
+            marca = "REGRESIÓN" if c['regresion'] else ""
+            print(f"{c['caso']:<50}{c['n']:>12,}  tiempo x{c['razon_tiempo']:.2f}  memoria x{c['razon_memoria']:.2f}  {marca}")
+        regresiones = sum(c['regresion'] for c in comparaciones)
+        print(f"\n{regresiones} regresiones de {len(comparaciones)} casos comparados.")
+        return 1 if regresiones else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,273 @@
+import argparse
+import sys
+import time
+import numpy as np
+from histeresisNL import NIVELES, calcular_areas
+from perfilador import etapa
+#
+#Autor: Oscar Calvo
+# Fecha: Octubre 18/2026
+# Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
+#
+# Integrador de Bouc-Wen con degradación y pellizco (modelo de Baber-Noori) para miles de
+# osciladores de un grado de libertad a la vez, como fuente de ciclos de histéresis con
+# dinámica no lineal para el clasificador de histeresisNL.py.
+# Los N osciladores forman un solo estado vectorizado (u, v, w, e) que avanza con Runge-Kutta 4;
+# cada paso es una serie de operaciones de arreglo sobre los N osciladores, sin bucles por
+# oscilador. `integrar` es un generador que entrega los resultados por tramos, de modo que la
+# memoria depende del tamaño del tramo y no de la duración del registro.
+#
+# Ecuaciones por unidad de masa, con w = z / u_y adimensional y e la energía histerética normalizada:
+#   ü = -a_g - 2ξω u̇ - ω² (α u + (1 - α) u_y w)
+#   ẇ = h(w) [ẋ - ν (β |ẋ| |w|^(n-1) w + γ ẋ |w|^n)] / η,   ẋ = u̇ / u_y,   β + γ = 1
+#   ė = w ẋ,   ν = 1 + δν e,   η = 1 + δη e
+#   h(w) = 1 - ζ1 exp(-((w sgn(ẋ) - q w_u) / ζ2)²),   ζ1 = ζs (1 - exp(-p e)),   ζ2 = (ψ + δψ e)(λ + ζ1)
+
+G = 9.81  # m/s^2
+
+# Parámetros comunes a todos los osciladores (los demás se sortean en `parametros_aleatorios`)
+PARAMETROS_BASE = {'xi': 0.05, 'n': 2.0, 'beta': 0.5, 'gamma': 0.5,
+                   'p': 0.5, 'q': 0.1, 'psi': 0.2, 'delta_psi': 0.01, 'lam': 0.5}
+
+# Ductilidad máxima (max |u| / u_y) que separa los niveles de daño de histeresisNL.NIVELES
+UMBRALES_DUCTILIDAD = (1.5, 4.0)
+
+def parametros_aleatorios(n, rng):
+    """
+    Parámetros de n osciladores: periodo entre 0.2 y 2 s, coeficiente de fluencia entre 0.05 y 0.3,
+    rigidez post-fluencia del 2 al 20%, degradación de resistencia y rigidez y pellizco aleatorios.
+    Retorna un diccionario de arreglos (n,) y escalares que se difunden entre sí.
+    """
+    omega = 2 * np.pi / rng.uniform(0.2, 2.0, n)
+    return {
+        **PARAMETROS_BASE,
+        'omega': omega,
+        'alfa': rng.uniform(0.02, 0.2, n),
+        'uy': rng.uniform(0.05, 0.3, n) * G / omega**2,
+        'delta_nu': rng.uniform(0, 0.02, n),
+        'delta_eta': rng.uniform(0, 0.02, n),
+        'zeta_s': rng.uniform(0, 0.9, n),
+    }
+
+def armonica(amplitud, frecuencia):
+    """Aceleración del terreno a_g = amplitud sen(2π f t), con amplitud y frecuencia por oscilador."""
+    return lambda t: amplitud * np.sin(2 * np.pi * frecuencia * t)
+
+def registro(aceleraciones, dt_registro, escala=1.0):
+    """Registro de aceleraciones (m/s^2) cada dt_registro s, interpolado linealmente y escalado por oscilador."""
+    tiempos = np.arange(len(aceleraciones)) * dt_registro
+    return lambda t: escala * np.interp(t, tiempos, aceleraciones, right=0.0)
+
+def _derivadas(p, u, v, w, e, ag):
+    x_punto = v / p['uy']
+    e = np.maximum(e, 0)
+    nu = 1 + p['delta_nu'] * e
+    eta = 1 + p['delta_eta'] * e
+    zeta_1 = p['zeta_s'] * (1 - np.exp(-p['p'] * e))
+    zeta_2 = (p['psi'] + p['delta_psi'] * e) * (p['lam'] + zeta_1)
+    if p['n'] == 2:  # Caso usual: evita las potencias de arreglos, que son lo más costoso del paso
+        w_u, w_n1 = 1 / np.sqrt(nu), np.abs(w)
+    else:
+        w_u, w_n1 = nu ** (-1 / p['n']), np.abs(w) ** (p['n'] - 1)
+    h = 1 - zeta_1 * np.exp(-((w * np.sign(x_punto) - p['q'] * w_u) / zeta_2) ** 2)
+    dw = h * (x_punto - nu * w_n1 * (p['beta'] * np.abs(x_punto) * w + p['gamma'] * x_punto * np.abs(w))) / eta
+    dv = -ag - p['c'] * v - p['k_elastica'] * u - p['k_histeretica'] * w
+    return v, dv, dw, w * x_punto
+
+def _paso_rk4(p, estado, t, h, excitacion):
+    """Un paso de Runge-Kutta 4 de tamaño h (escalar o por oscilador) desde el tiempo t."""
+    ag_inicio, ag_medio, ag_fin = excitacion(t), excitacion(t + h / 2), excitacion(t + h)
+    k1 = _derivadas(p, *estado, ag_inicio)
+    k2 = _derivadas(p, *(s + h / 2 * k for s, k in zip(estado, k1)), ag_medio)
+    k3 = _derivadas(p, *(s + h / 2 * k for s, k in zip(estado, k2)), ag_medio)
+    k4 = _derivadas(p, *(s + h * k for s, k in zip(estado, k3)), ag_fin)
+    return tuple(s + h / 6 * (a + 2 * b + 2 * c + d) for s, a, b, c, d in zip(estado, k1, k2, k3, k4))
+
+def fuerza_restitutiva(p, u, w):
+    """Fuerza restitutiva por unidad de masa (N/kg) a partir del desplazamiento y de w."""
+    return p['omega']**2 * (p['alfa'] * u + (1 - p['alfa']) * p['uy'] * w)
+
+def subpasos_estables(p, dt, pasos_por_periodo=50):
+    """Subpasos por muestra para que el paso de integración no supere 1/pasos_por_periodo del periodo natural."""
+    return max(1, int(np.ceil(np.max(dt * p['omega'] / (2 * np.pi)) * pasos_por_periodo)))
+
+def integrar(p, excitacion, n_muestras, dt, subpasos=None, tamano_tramo=1000):
+    """
+    Integra los osciladores de `p` durante n_muestras intervalos dt (escalar o arreglo por oscilador).
+    - excitacion: Función t -> aceleración del terreno en los tiempos t (ver `armonica` y `registro`)
+    - subpasos: Pasos mínimos de RK4 por muestra; por defecto `subpasos_estables`. Cuando la ecuación
+      de w se vuelve rígida (velocidades grandes frente a u_y) se usan más, según su tasa actual
+    Generador: produce (inicio, u, fuerza, e, pasos) por tramos, con u y fuerza de forma (N x m),
+    m <= tamano_tramo, para las muestras [inicio, inicio + m) en los tiempos (k + 1) dt, e la energía
+    normalizada al final del tramo y `pasos` los pasos de RK4 acumulados.
+    """
+    n = len(p['omega'])
+    subpasos = subpasos or subpasos_estables(p, dt)
+    # Coeficientes constantes de la ecuación de movimiento, calculados una vez y no en cada etapa de RK4
+    p = {**p, 'c': 2 * p['xi'] * p['omega'], 'k_elastica': p['alfa'] * p['omega']**2,
+         'k_histeretica': (1 - p['alfa']) * p['uy'] * p['omega']**2}
+    dt = np.asarray(dt, dtype=float)
+    estado = (np.zeros(n), np.zeros(n), np.zeros(n), np.zeros(n))
+    t = np.zeros_like(dt)
+    pasos = 0
+    for inicio in range(0, n_muestras, tamano_tramo):
+        m = min(tamano_tramo, n_muestras - inicio)
+        u = np.empty((m, n))
+        w = np.empty((m, n))
+        for k in range(m):
+            tasa_w = p['n'] * np.abs(estado[1]) / p['uy'] * np.maximum(np.abs(estado[2]), 1) ** (p['n'] - 1)
+            n_sub = max(subpasos, int(np.ceil(np.max(dt * tasa_w))))
+            h = dt / n_sub
+            for _ in range(n_sub):
+                estado = _paso_rk4(p, estado, t, h, excitacion)
+                t = t + h
+            pasos += n_sub
+            u[k], w[k] = estado[0], estado[2]
+        yield inicio, u.T, fuerza_restitutiva(p, u, w).T, estado[3], pasos
+
+def clasificar_ductilidad(ductilidad):
+    """Nivel de daño (nombres de histeresisNL.NIVELES) según la ductilidad máxima alcanzada."""
+    nombres = [nivel[0] for nivel in NIVELES]
+    return np.select([ductilidad < UMBRALES_DUCTILIDAD[0], ductilidad < UMBRALES_DUCTILIDAD[1]],
+                     nombres[:2], nombres[2])
+
+def simular_armonico(p, frecuencia, amplitud, n_ciclos=5, n_puntos=150):
+    """
+    Carga armónica de n_ciclos ciclos con n_puntos muestras por ciclo de cada oscilador (el paso
+    de tiempo es distinto para cada uno, de modo que los ciclos quedan alineados). Los tramos son
+    de un ciclo: solo se conserva el último y el máximo desplazamiento de toda la historia.
+    Retorna (x, y, ductilidad): desplazamiento y fuerza del último ciclo (N x n_puntos) y max |u| / u_y.
+    """
+    maximo = np.zeros(len(p['omega']))
+    for _, u, fuerza, _, _ in integrar(p, armonica(amplitud, frecuencia), n_ciclos * n_puntos,
+                                       1 / (frecuencia * n_puntos), tamano_tramo=n_puntos):
+        maximo = np.maximum(maximo, np.abs(u).max(axis=1))
+    return u, fuerza, maximo / p['uy']
+
+def _carga_aleatoria(p, rng):
+    """Frecuencia (0.5 a 1.5 veces la natural) y amplitud (0.2 a 2 veces la aceleración de fluencia) de a_g."""
+    n = len(p['omega'])
+    frecuencia = rng.uniform(0.5, 1.5, n) * p['omega'] / (2 * np.pi)
+    amplitud = rng.uniform(0.2, 2.0, n) * p['omega']**2 * p['uy']
+    return frecuencia, amplitud
+
+def generar_datos_bouc_wen(n_osciladores, n_ciclos=5, n_puntos=150, semilla=42, tamano_bloque=5000):
+    """
+    Conjunto de entrenamiento para histeresisNL.py a partir de osciladores de Bouc-Wen con carga
+    armónica: características [amplitud máxima, área] del último ciclo (`calcular_areas`) y
+    etiqueta según la ductilidad máxima. Los osciladores se integran por bloques de `tamano_bloque`.
+    Retorna (X, etiquetas).
+    """
+    rng = np.random.default_rng(semilla)
+    X = np.empty((n_osciladores, 2))
+    etiquetas = np.empty(n_osciladores, dtype=f'<U{max(len(n[0]) for n in NIVELES)}')
+    for inicio in range(0, n_osciladores, tamano_bloque):
+        p = parametros_aleatorios(min(tamano_bloque, n_osciladores - inicio), rng)
+        x, y, ductilidad = simular_armonico(p, *_carga_aleatoria(p, rng), n_ciclos, n_puntos)
+        fin = inicio + len(x)
+        X[inicio:fin, 0] = x.max(axis=1)
+        X[inicio:fin, 1] = calcular_areas(x, y)
+        etiquetas[inicio:fin] = clasificar_ductilidad(ductilidad)
+    return X, etiquetas
+
+# Funciones de las que dependen los datos de generar_datos_bouc_wen (clave de la caché de histeresisNL.py)
+FUNCIONES_DATOS = (parametros_aleatorios, armonica, _derivadas, _paso_rk4, fuerza_restitutiva, subpasos_estables,
+                   integrar, clasificar_ductilidad, simular_armonico, _carga_aleatoria, calcular_areas,
+                   generar_datos_bouc_wen)
+# Constantes de las que dependen los datos (los umbrales deciden las etiquetas); también forman parte de la clave
+CONSTANTES_DATOS = {'parametros_base': PARAMETROS_BASE, 'umbrales_ductilidad': UMBRALES_DUCTILIDAD}
+
+def ciclo_aleatorio(semilla=None, n_ciclos=5, n_puntos=150):
+    """Último ciclo (x, y) de un oscilador aleatorio con carga armónica y su nivel de daño real."""
+    rng = np.random.default_rng(semilla)
+    p = parametros_aleatorios(1, rng)
+    x, y, ductilidad = simular_armonico(p, *_carga_aleatoria(p, rng), n_ciclos, n_puntos)
+    return x[0], y[0], clasificar_ductilidad(ductilidad)[0]
+
+def simular_registro(p, aceleraciones, dt_registro, escala=1.0, salida=None, tamano_tramo=1000):
+    """
+    Respuesta de los osciladores a un registro sísmico escalado por oscilador.
+    - salida: Archivo .npy opcional (2 x N x n_muestras: desplazamiento y fuerza); los tramos se
+      escriben directamente en disco, de modo que la memoria no depende de la duración
+    Retorna un diccionario con la ductilidad máxima y la energía histerética disipada por unidad
+    de masa (J/kg), (1 - α) ω² u_y² (e - w²/2): el trabajo del resorte histerético menos la energía
+    que queda almacenada en él al final del registro.
+    """
+    n, n_muestras = len(p['omega']), len(aceleraciones)
+    destino = None
+    if salida is not None:
+        destino = np.lib.format.open_memmap(salida, mode='w+', dtype=np.float64, shape=(2, n, n_muestras))
+    maximo = np.zeros(n)
+    for inicio, u, fuerza, e, _ in integrar(p, registro(aceleraciones, dt_registro, escala), n_muestras,
+                                            dt_registro, tamano_tramo=tamano_tramo):
+        maximo = np.maximum(maximo, np.abs(u).max(axis=1))
+        if destino is not None:
+            destino[0, :, inicio:inicio + u.shape[1]] = u
+            destino[1, :, inicio:inicio + u.shape[1]] = fuerza
+    if destino is not None:
+        destino.flush()
+    w = (fuerza[:, -1] / p['omega']**2 - p['alfa'] * u[:, -1]) / ((1 - p['alfa']) * p['uy'])
+    energia = (1 - p['alfa']) * p['omega']**2 * p['uy']**2 * (e - 0.5 * w**2)
+    return {'ductilidad': maximo / p['uy'], 'energia': energia}
+
+def benchmark(n_osciladores=10_000, n_muestras=1000, semilla=0):
+    """Mide osciladores-paso por segundo del integrador con carga armónica. Retorna un diccionario."""
+    rng = np.random.default_rng(semilla)
+    p = parametros_aleatorios(n_osciladores, rng)
+    frecuencia, amplitud = _carga_aleatoria(p, rng)
+    dt = 1 / (frecuencia * 150)
+    inicio = time.perf_counter()
+    for *_, pasos in integrar(p, armonica(amplitud, frecuencia), n_muestras, dt):
+        pass
+    segundos = time.perf_counter() - inicio
+    return {'n_osciladores': n_osciladores, 'n_muestras': n_muestras, 'pasos_rk4': pasos,
+            'segundos': segundos, 'osciladores_paso_por_s': n_osciladores * pasos / segundos}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Osciladores de Bouc-Wen con degradación y pellizco integrados por lotes.")
+    parser.add_argument('--n-osciladores', type=int, default=3000, help="Número de osciladores (por defecto 3000)")
+    parser.add_argument('--ciclos', type=int, default=5, help="Ciclos de la carga armónica (por defecto 5)")
+    parser.add_argument('--registro', metavar='ARCHIVO',
+                        help="Registro sísmico (una aceleración en m/s^2 por línea) en lugar de la carga armónica")
+    parser.add_argument('--dt-registro', type=float, default=0.01, help="Intervalo del registro (s)")
+    parser.add_argument('--escala-max', type=float, default=3.0,
+                        help="Cada oscilador recibe el registro escalado por un factor entre 0.1 y este valor")
+    parser.add_argument('--salida', metavar='RUTA.npy',
+                        help="Con --registro, guarda las historias (2 x N x muestras: desplazamiento y fuerza) por tramos")
+    parser.add_argument('--benchmark', action='store_true', help="Mide osciladores-paso por segundo y termina")
+    parser.add_argument('--n-muestras', type=int, default=1000, help="Muestras por oscilador del benchmark")
+    args = parser.parse_args(argv)
+
+    if args.benchmark:
+        r = benchmark(args.n_osciladores, args.n_muestras)
+        print(f"{r['n_osciladores']:,} osciladores x {r['n_muestras']:,} muestras ({r['pasos_rk4']:,} pasos de RK4): "
+              f"{r['segundos']:.2f} s -> {r['osciladores_paso_por_s']:,.0f} osciladores-paso/s")
+        return 0
+
+    if args.registro:
+        aceleraciones = np.loadtxt(args.registro, ndmin=1)
+        rng = np.random.default_rng(42)
+        p = parametros_aleatorios(args.n_osciladores, rng)
+        with etapa('bouc_wen.registro', filas=args.n_osciladores * len(aceleraciones)):
+            r = simular_registro(p, aceleraciones, args.dt_registro, rng.uniform(0.1, args.escala_max, args.n_osciladores),
+                                 args.salida)
+        niveles, conteos = np.unique(clasificar_ductilidad(r['ductilidad']), return_counts=True)
+        print(f"{args.n_osciladores:,} osciladores, {len(aceleraciones):,} muestras del registro")
+        print(f"Ductilidad máxima: mediana {np.median(r['ductilidad']):.2f}, máxima {r['ductilidad'].max():.2f}")
+        print(f"Energía histerética disipada: mediana {np.median(r['energia']):.4g} J/kg")
+        print(', '.join(f"{nivel}: {conteo:,}" for nivel, conteo in zip(niveles, conteos)))
+        return 0
+
+    inicio = time.perf_counter()
+    with etapa('bouc_wen.generar_datos', filas=args.n_osciladores):
+        X, etiquetas = generar_datos_bouc_wen(args.n_osciladores, args.ciclos)
+    segundos = time.perf_counter() - inicio
+    niveles, conteos = np.unique(etiquetas, return_counts=True)
+    print(f"{args.n_osciladores:,} ciclos de Bouc-Wen en {segundos:.2f} s "
+          f"({args.n_osciladores * args.ciclos * 150 / segundos:,.0f} osciladores-muestra/s)")
+    print(', '.join(f"{nivel}: {conteo:,}" for nivel, conteo in zip(niveles, conteos)))
+    print(f"Amplitud: {X[:, 0].min():.4g} a {X[:, 0].max():.4g} m; área: {X[:, 1].min():.4g} a {X[:, 1].max():.4g} J/kg")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
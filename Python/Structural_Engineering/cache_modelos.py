@@ -0,0 +1,152 @@
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import tempfile
+import time
+#
+#Autor: Oscar Calvo
+# Fecha: Octubre 18/2026
+# Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
+#
+# Caché en disco de modelos entrenados (árboles, redes MLP y sus StandardScaler).
+# Cada entrada se identifica con un hash de los parámetros del generador de datos,
+# la semilla, el número de muestras, los hiperparámetros del estimador y el código
+# fuente de las funciones que producen los datos, de modo que un cambio en cualquiera
+# de ellos genera una entrada nueva en lugar de reutilizar un modelo desactualizado.
+#
+# Variables de entorno:
+# - RUTINAS_CACHE: Carpeta de la caché (por defecto ~/.cache/rutinas_estructurales)
+# - RUTINAS_CACHE_MB: Tamaño máximo de la caché en MB (por defecto 200)
+# - RUTINAS_SIN_CACHE: Si vale 1, siempre se entrena y no se lee ni escribe la caché
+
+EXTENSION = '.pkl'
+
+def directorio_cache():
+    """Retorna la carpeta de la caché, definida por RUTINAS_CACHE o la carpeta por defecto."""
+    return os.environ.get('RUTINAS_CACHE',
+                          os.path.join(os.path.expanduser('~'), '.cache', 'rutinas_estructurales'))
+
+def tamano_maximo_cache():
+    """Retorna el tamaño máximo de la caché en bytes (RUTINAS_CACHE_MB, 200 MB por defecto)."""
+    return int(float(os.environ.get('RUTINAS_CACHE_MB', 200)) * 1024 * 1024)
+
+def cache_activa():
+    """Indica si la caché está habilitada (RUTINAS_SIN_CACHE distinto de 1)."""
+    return os.environ.get('RUTINAS_SIN_CACHE', '0') != '1'
+
+def clave_cache(nombre, parametros, funciones=()):
+    """
+    Calcula la clave de una entrada.
+    - nombre: Prefijo legible del modelo (ej. 'zapatas', 'pushover')
+    - parametros: Diccionario con parámetros del generador, semilla, muestras e hiperparámetros
+    - funciones: Funciones cuyo código fuente también forma parte de la clave
+    Retorna un texto '<nombre>-<hash>'.
+    """
+    try:
+        import sklearn
+        version = sklearn.__version__
+    except ImportError:
+        version = None
+    contenido = {
+        'parametros': parametros,
+        'codigo': [inspect.getsource(f) for f in funciones],
+        'sklearn': version
+    }
+    texto = json.dumps(contenido, sort_keys=True, default=repr)
+    return f"{nombre}-{hashlib.sha256(texto.encode('utf-8')).hexdigest()[:20]}"
+
+def obtener_o_entrenar(nombre, parametros, entrenar, funciones=(), directorio=None, tamano_maximo=None):
+    """
+    Retorna el objeto guardado en la caché para (nombre, parametros, funciones) o, si no existe,
+    llama a `entrenar()` y guarda su resultado (ej. una tupla (modelo, scaler)).
+    Retorna una tupla (objeto, desde_cache).
+    """
+    if not cache_activa():
+        return entrenar(), False
+    directorio = directorio or directorio_cache()
+    ruta = os.path.join(directorio, clave_cache(nombre, parametros, funciones) + EXTENSION)
+    try:
+        with open(ruta, 'rb') as archivo:
+            objeto = pickle.load(archivo)
+        os.utime(ruta)  # Marca la entrada como usada recientemente
+        return objeto, True
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+        pass
+
+    objeto = entrenar()
+    guardar(ruta, objeto)
+    desalojar(directorio, tamano_maximo if tamano_maximo is not None else tamano_maximo_cache())
+    return objeto, False
+
+def guardar(ruta, objeto):
+    """Escribe el objeto en un archivo temporal y lo renombra, para no dejar entradas a medias."""
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    descriptor, temporal = tempfile.mkstemp(dir=os.path.dirname(ruta), suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as archivo:
+            pickle.dump(objeto, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+    except BaseException:
+        os.remove(temporal)
+        raise
+
+def entradas(directorio=None):
+    """Lista las entradas de la caché como tuplas (ruta, bytes, última modificación), de la más antigua a la más reciente."""
+    directorio = directorio or directorio_cache()
+    if not os.path.isdir(directorio):
+        return []
+    lista = []
+    for archivo in os.listdir(directorio):
+        if archivo.endswith(EXTENSION):
+            ruta = os.path.join(directorio, archivo)
+            info = os.stat(ruta)
+            lista.append((ruta, info.st_size, info.st_mtime))
+    return sorted(lista, key=lambda entrada: entrada[2])
+
+def desalojar(directorio=None, tamano_maximo=None):
+    """
+    Elimina las entradas usadas hace más tiempo hasta que la caché ocupe a lo sumo `tamano_maximo` bytes.
+    Retorna el número de entradas eliminadas.
+    """
+    tamano_maximo = tamano_maximo if tamano_maximo is not None else tamano_maximo_cache()
+    lista = entradas(directorio)
+    total = sum(tamano for _, tamano, _ in lista)
+    eliminadas = 0
+    for ruta, tamano, _ in lista:
+        if total <= tamano_maximo:
+            break
+        os.remove(ruta)
+        total -= tamano
+        eliminadas += 1
+    return eliminadas
+
+def invalidar(nombre=None, directorio=None):
+    """
+    Elimina las entradas del modelo `nombre` (ej. 'pushover') o todas si nombre es None.
+    Retorna el número de entradas eliminadas.
+    """
+    eliminadas = 0
+    for ruta, _, _ in entradas(directorio):
+        if nombre is None or os.path.basename(ruta).startswith(f'{nombre}-'):
+            os.remove(ruta)
+            eliminadas += 1
+    return eliminadas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Administra la caché de modelos entrenados.")
+    parser.add_argument('--listar', action='store_true', help="Muestra las entradas de la caché")
+    parser.add_argument('--invalidar', nargs='?', const='', metavar='NOMBRE',
+                        help="Elimina las entradas de un modelo (zapatas, pushover, histeresis, vigas) o todas")
+    args = parser.parse_args()
+
+    if args.invalidar is not None:
+        n = invalidar(args.invalidar or None)
+        print(f"Entradas eliminadas: {n}")
+    lista = entradas()
+    print(f"Caché: {directorio_cache()} ({sum(t for _, t, _ in lista) / 1024:.1f} kB en {len(lista)} entradas)")
+    if args.listar:
+        for ruta, tamano, modificacion in lista:
+            print(f"  {os.path.basename(ruta)}  {tamano / 1024:8.1f} kB  {time.strftime('%Y-%m-%d %H:%M', time.localtime(modificacion))}")
\ No newline at end of file
@@ -0,0 +1,165 @@
+import numpy as np
+#
+#Autor: Oscar Calvo
+# Fecha: Octubre 18/2026
+# Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
+#
+# Utilidades de gráficas compartidas por los scripts de ingeniería estructural.
+# matplotlib se importa solo al graficar y, salvo que se pida mostrar la ventana,
+# con el backend Agg, que dibuja directamente a archivo y funciona sin pantalla
+# (servidores, trabajos por lotes, contenedores).
+#
+# Para conjuntos grandes, `dispersion_grande` reemplaza a `plt.scatter`: por encima de
+# `limite` puntos dibuja un ráster de densidad por clase (histogramas 2D acumulados por
+# bloques) o una submuestra estratificada, de modo que el tiempo de dibujo y la memoria
+# no crecen con el número de puntos. `decimar_curva` reduce curvas largas a su envolvente.
+
+BLOQUE = 1_000_000        # Puntos procesados a la vez al acumular histogramas o submuestras
+LIMITE_PUNTOS = 50_000    # Por encima de este número, el modo 'auto' usa el ráster de densidad
+MODOS = ('auto', 'puntos', 'densidad', 'submuestra')
+
+def pyplot(mostrar=False):
+    """Importa y retorna matplotlib.pyplot; sin `mostrar` selecciona antes el backend Agg."""
+    import matplotlib
+    if not mostrar:
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+def finalizar(plt, ruta=None, mostrar=False, dpi=100):
+    """Guarda la figura actual en `ruta` (si se da), la muestra si `mostrar` y libera su memoria."""
+    if ruta:
+        plt.savefig(ruta, dpi=dpi)
+    if mostrar:
+        plt.show()
+    plt.close()
+
+def _bloques(n):
+    return ((i, min(i + BLOQUE, n)) for i in range(0, n, BLOQUE))
+
+def _clases(etiquetas):
+    """Clases presentes en `etiquetas`, calculadas por bloques."""
+    clases = set()
+    for i, j in _bloques(len(etiquetas)):
+        clases.update(np.unique(etiquetas[i:j]).tolist())
+    return np.array(sorted(clases))
+
+def _codigos(etiquetas, clases, i, j):
+    """Índice de clase (0..k-1) de las etiquetas del bloque [i, j)."""
+    if etiquetas is None:
+        return np.zeros(j - i, dtype=np.int64)
+    return np.searchsorted(clases, np.asarray(etiquetas[i:j]))
+
+def histogramas_por_clase(x, y, etiquetas=None, clases=None, bins=(400, 300), extension=None):
+    """
+    Conteos (n_clases x ny x nx) de los puntos (x, y) por clase sobre una rejilla regular.
+    `extension` = (x0, x1, y0, y1); si se omite se usa el rango de los datos. Los puntos se
+    procesan por bloques con un solo np.bincount por bloque para todas las clases.
+    Retorna (conteos, extension).
+    """
+    nx, ny = bins
+    if extension is None:
+        extension = (np.nanmin(x), np.nanmax(x), np.nanmin(y), np.nanmax(y))
+    x0, x1, y0, y1 = (float(v) for v in extension)
+    escala_x = nx / (x1 - x0) if x1 > x0 else 0.0
+    escala_y = ny / (y1 - y0) if y1 > y0 else 0.0
+    n_clases = 1 if clases is None else len(clases)
+    conteos = np.zeros(n_clases * ny * nx, dtype=np.int64)
+    for i, j in _bloques(len(x)):
+        xb = np.asarray(x[i:j], dtype=np.float64)
+        yb = np.asarray(y[i:j], dtype=np.float64)
+        validos = np.isfinite(xb) & np.isfinite(yb)
+        ix = np.clip(((xb - x0) * escala_x).astype(np.int64), 0, nx - 1)
+        iy = np.clip(((yb - y0) * escala_y).astype(np.int64), 0, ny - 1)
+        indice = (_codigos(etiquetas, clases, i, j) * ny + iy) * nx + ix
+        conteos += np.bincount(indice[validos], minlength=len(conteos))
+    return conteos.reshape(n_clases, ny, nx), (x0, x1, y0, y1)
+
+def imagen_densidad(conteos, colores):
+    """
+    Imagen RGBA (ny x nx x 4) a partir de conteos por clase: cada clase aporta su color con
+    intensidad logarítmica; los colores se mezclan en proporción a la intensidad y la
+    opacidad crece con la densidad total.
+    """
+    from matplotlib.colors import to_rgb
+    rgb_clases = np.array([to_rgb(c) for c in colores])
+    intensidad = np.log1p(conteos) / max(np.log1p(conteos.max()), 1e-12)
+    total = intensidad.sum(axis=0)
+    rgb = np.einsum('kyx,kc->yxc', intensidad, rgb_clases) / np.where(total > 0, total, 1)[..., np.newaxis]
+    alfa = 1 - np.prod(1 - 0.9 * intensidad, axis=0)
+    return np.dstack((rgb, alfa))
+
+def submuestra_estratificada(etiquetas, n, limite=LIMITE_PUNTOS, clases=None, semilla=0):
+    """
+    Índices de una submuestra de unos `limite` puntos que conserva las proporciones de las
+    clases, con al menos limite / (2 * n_clases) puntos por clase (si los hay), para que las
+    clases minoritarias sigan siendo visibles. Se selecciona por bloques.
+    """
+    rng = np.random.default_rng(semilla)
+    if etiquetas is None:
+        probabilidad = np.array([min(1.0, limite / max(n, 1))])
+    else:
+        clases = _clases(etiquetas) if clases is None else clases
+        totales = np.zeros(len(clases), dtype=np.int64)
+        for i, j in _bloques(n):
+            totales += np.bincount(_codigos(etiquetas, clases, i, j), minlength=len(clases))
+        cuota = np.maximum(limite * totales / n, limite / (2 * len(clases)))
+        probabilidad = np.minimum(1.0, cuota / np.maximum(totales, 1))
+    indices = []
+    for i, j in _bloques(n):
+        elegidos = rng.random(j - i) < probabilidad[_codigos(etiquetas, clases, i, j)]
+        indices.append(i + np.flatnonzero(elegidos))
+    return np.concatenate(indices) if indices else np.empty(0, dtype=np.int64)
+
+def dispersion_grande(ax, x, y, etiquetas=None, colores=None, modo='auto', limite=LIMITE_PUNTOS,
+                      bins=(400, 300), semilla=0, **kwargs):
+    """
+    Gráfica de dispersión apta para millones de puntos.
+    - etiquetas: Clase de cada punto (opcional); colores: {clase: color} (o `color=` sin etiquetas)
+    - modo: 'puntos' (todos), 'densidad' (ráster por clase), 'submuestra' (estratificada)
+      o 'auto' ('puntos' hasta `limite` puntos y 'densidad' por encima)
+    Los demás argumentos (s, alpha, label, edgecolors...) se pasan a `ax.scatter`; en modo
+    densidad, `label` se conserva en la leyenda con un marcador del color de cada clase.
+    """
+    n = len(x)
+    if modo == 'auto':
+        modo = 'puntos' if n <= limite else 'densidad'
+    color_unico = kwargs.pop('color', 'C0')
+    clases = _clases(etiquetas) if etiquetas is not None else None
+    if clases is None:
+        paleta = [color_unico]
+    else:
+        paleta = [colores[c.item() if hasattr(c, 'item') else c] for c in clases]
+
+    if modo == 'densidad':
+        conteos, extension = histogramas_por_clase(x, y, etiquetas, clases, bins)
+        ax.imshow(imagen_densidad(conteos, paleta), extent=extension, origin='lower', aspect='auto',
+                  interpolation='nearest')
+        if kwargs.get('label'):  # Marcador vacío para conservar la entrada de la leyenda
+            ax.scatter([], [], c=[paleta[0]], s=kwargs.get('s', 10), label=kwargs['label'])
+        return
+
+    if modo == 'submuestra':
+        indices = submuestra_estratificada(etiquetas, n, limite, clases, semilla)
+        x, y = np.asarray(x)[indices], np.asarray(y)[indices]
+        etiquetas = None if etiquetas is None else np.asarray(etiquetas)[indices]
+        n = len(indices)
+    if clases is None:
+        ax.scatter(x, y, c=color_unico, **kwargs)
+    else:
+        ax.scatter(x, y, c=np.asarray(paleta)[_codigos(etiquetas, clases, 0, n)], **kwargs)
+
+def decimar_curva(x, y, n_max=4000):
+    """
+    Reduce una curva de muchos puntos a lo sumo unos `n_max` conservando el mínimo y el máximo
+    de y en cada tramo, de modo que la envolvente visible no cambia. Retorna (x, y).
+    """
+    n = len(x)
+    if n <= n_max:
+        return np.asarray(x), np.asarray(y)
+    tramos = n_max // 2
+    m = n // tramos
+    y_tramos = np.asarray(y[:tramos * m]).reshape(tramos, m)
+    base = np.arange(tramos) * m
+    indices = np.sort(np.concatenate((base + y_tramos.argmin(axis=1), base + y_tramos.argmax(axis=1), [n - 1])))
+    return np.asarray(x)[indices], np.asarray(y)[indices]
@@ -1,15 +1,17 @@
-import numpy as np
+import argparse
 import random
-from sklearn.neural_network import MLPClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score, confusion_matrix
-import matplotlib.pyplot as plt
+import sys
+import numpy as np
+from cache_modelos import obtener_o_entrenar
+from perfilador import etapa
+from graficos import MODOS
 #
 #Autor: Oscar Calvo
 # Fecha: Agosto 03/2025
 # Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
 #
+# scikit-learn y matplotlib se importan solo en las funciones que los usan.
+#
 # 1. Generar datos sintéticos de un ciclo de histéresis realista
 def generar_ciclo_realista(amplitud, rigidez, gordura, pellizco=0.8):
     t = np.linspace(0, 2 * np.pi, 150)
@@ -20,102 +22,278 @@ def generar_ciclo_realista(amplitud, rigidez, gordura, pellizco=0.8):
     return x, y
 
 def calcular_area(x, y):
-    return 0.5 * np.abs(np.dot(x, np.roll(y, 1)) - np.dot(y, np.roll(x, 1)))
+    return calcular_areas(x, y)
+
+def calcular_areas(x, y, axis=-1):
+    """
+    Área encerrada (fórmula del cordón de zapato) de uno o muchos ciclos a lo largo de `axis`.
+    Usa vistas desplazadas x[1:], y[:-1] en lugar de np.roll, por lo que no copia x ni y,
+    y einsum acumula los productos sin crear arreglos temporales del tamaño de los ciclos.
+    """
+    x = np.moveaxis(np.asarray(x), axis, -1)
+    y = np.moveaxis(np.asarray(y), axis, -1)
+    doble_area = (np.einsum('...i,...i->...', x[..., 1:], y[..., :-1])
+                  - np.einsum('...i,...i->...', y[..., 1:], x[..., :-1])
+                  + x[..., 0] * y[..., -1] - y[..., 0] * x[..., -1])
+    return 0.5 * np.abs(doble_area)
+
+def generar_ciclos(amplitud, rigidez, gordura, pellizco=0.8, n_puntos=150, rng=None):
+    """
+    Versión por lotes de `generar_ciclo_realista`: genera un ciclo por cada fila de parámetros.
+    amplitud, rigidez, gordura y pellizco son escalares o arreglos de N valores.
+    Retorna (x, y), ambos de forma (N x n_puntos).
+    """
+    rng = np.random.default_rng() if rng is None else rng
+    amplitud, rigidez, gordura, pellizco = (np.asarray(p, dtype=float).reshape(-1, 1)
+                                            for p in (amplitud, rigidez, gordura, pellizco))
+    n_ciclos = np.broadcast_shapes(amplitud.shape, rigidez.shape, gordura.shape, pellizco.shape)[0]
+    t = np.linspace(0, 2 * np.pi, n_puntos)
+    seno, coseno = np.sin(t), np.cos(t)
+
+    x = amplitud * seno
+    y = rng.standard_normal((n_ciclos, n_puntos))  # Ruido, escalado en el mismo arreglo
+    y *= 0.05
+    y += rigidez * x  # Parte elástica
+    y += (gordura * amplitud) * (coseno * (1 - pellizco * np.abs(seno)))  # Parte histerética
+    return x, y
+
+# Niveles de daño: (etiqueta, rango de amplitud, rango de rigidez, rango de gordura, pellizco)
+NIVELES = [
+    ("Seguro", (0.3, 0.7), (8, 12), (1.0, 2.5), 0.5),         # Nivel 1: Elástico/Seguro
+    ("Daño Dúctil", (1.5, 2.5), (3, 6), (4.0, 6.0), 0.8),     # Nivel 2: Daño Dúctil
+    ("Daño Severo", (3.0, 4.5), (1, 3), (3.0, 5.0), 0.95),    # Nivel 3: Daño Severo
+]
 
 # Generamos datos de entrenamiento con más muestras y ruido
-datos_entrenamiento = []
-etiquetas = []
-
-np.random.seed(42)
-# Nivel 1: Elástico/Seguro
-for _ in range(50):
-    amp = np.random.uniform(0.3, 0.7)
-    rig = np.random.uniform(8, 12)
-    gord = np.random.uniform(1.0, 2.5)
-    x, y = generar_ciclo_realista(amp, rig, gord, pellizco=0.5)
-    datos_entrenamiento.append([np.max(x), calcular_area(x, y)])
-    etiquetas.append("Seguro")
-
-# Nivel 2: Daño Dúctil
-for _ in range(50):
-    amp = np.random.uniform(1.5, 2.5)
-    rig = np.random.uniform(3, 6)
-    gord = np.random.uniform(4.0, 6.0)
-    x, y = generar_ciclo_realista(amp, rig, gord, pellizco=0.8)
-    datos_entrenamiento.append([np.max(x), calcular_area(x, y)])
-    etiquetas.append("Daño Dúctil")
-
-# Nivel 3: Daño Severo
-for _ in range(50):
-    amp = np.random.uniform(3.0, 4.5)
-    rig = np.random.uniform(1, 3)
-    gord = np.random.uniform(3.0, 5.0)
-    x, y = generar_ciclo_realista(amp, rig, gord, pellizco=0.95)
-    datos_entrenamiento.append([np.max(x), calcular_area(x, y)])
-    etiquetas.append("Daño Severo")
-
-X_entrenamiento = np.array(datos_entrenamiento)
-y_entrenamiento = np.array(etiquetas)
+def generar_datos_entrenamiento(n_por_nivel=50, semilla=42):
+    """
+    Genera ciclos sintéticos de los tres niveles de daño y extrae sus características
+    [amplitud máxima, área del ciclo]. Retorna (X, etiquetas).
+    """
+    datos_entrenamiento = []
+    etiquetas = []
+
+    np.random.seed(semilla)
+    for etiqueta, rango_amp, rango_rig, rango_gord, pellizco in NIVELES:
+        for _ in range(n_por_nivel):
+            amp = np.random.uniform(*rango_amp)
+            rig = np.random.uniform(*rango_rig)
+            gord = np.random.uniform(*rango_gord)
+            x, y = generar_ciclo_realista(amp, rig, gord, pellizco=pellizco)
+            datos_entrenamiento.append([np.max(x), calcular_area(x, y)])
+            etiquetas.append(etiqueta)
+
+    return np.array(datos_entrenamiento), np.array(etiquetas)
+
+def generar_datos_masivos(n_por_nivel, semilla=42, tamano_bloque=20_000, n_puntos=150):
+    """
+    Genera el mismo tipo de conjunto que `generar_datos_entrenamiento` para millones de ciclos.
+    Los ciclos se generan por bloques de `tamano_bloque` con `generar_ciclos` y de cada bloque
+    solo se conservan las características [amplitud máxima, área], de modo que la memoria
+    depende del tamaño del bloque y no del número de ciclos.
+    Retorna (X, etiquetas) con 3 * n_por_nivel filas.
+    """
+    rng = np.random.default_rng(semilla)
+    X = np.empty((len(NIVELES) * n_por_nivel, 2))
+    etiquetas = np.empty(len(NIVELES) * n_por_nivel, dtype=f'<U{max(len(n[0]) for n in NIVELES)}')
+    fila = 0
+    for etiqueta, rango_amp, rango_rig, rango_gord, pellizco in NIVELES:
+        for inicio in range(0, n_por_nivel, tamano_bloque):
+            n = min(tamano_bloque, n_por_nivel - inicio)
+            x, y = generar_ciclos(rng.uniform(*rango_amp, n), rng.uniform(*rango_rig, n),
+                                  rng.uniform(*rango_gord, n), pellizco, n_puntos=n_puntos, rng=rng)
+            X[fila:fila + n, 0] = x.max(axis=1)
+            X[fila:fila + n, 1] = calcular_areas(x, y)
+            etiquetas[fila:fila + n] = etiqueta
+            fila += n
+    return X, etiquetas
 
 # 2. Preparar los datos y entrenar
-X_train, X_test, y_train, y_test = train_test_split(X_entrenamiento, y_entrenamiento, test_size=0.2, random_state=42)
-scaler = StandardScaler()
-X_train_scaled = scaler.fit_transform(X_train)
-X_test_scaled = scaler.transform(X_test)
-
-ia_clasificador = MLPClassifier(hidden_layer_sizes=(12, 6), max_iter=2000, alpha=0.01, random_state=42)
-print("🧠 Entrenando la Red Neuronal con datos realistas...")
-ia_clasificador.fit(X_train_scaled, y_train)
-print("✅ ¡Entrenamiento completo!")
-
-# 3. Evaluar el modelo
-y_pred = ia_clasificador.predict(X_test_scaled)
-accuracy = accuracy_score(y_test, y_pred)
-cm = confusion_matrix(y_test, y_pred, labels=["Seguro", "Daño Dúctil", "Daño Severo"])
-print(f"\n📊 Precisión en el conjunto de prueba: {accuracy:.2f}")
-print("Matriz de confusión:")
-print(cm)
-
-# 4. Probar con un nuevo ciclo aleatorio
-print("\n--------------------------------------------------")
-print("🎲 Generando un nuevo ciclo de prueba aleatorio y realista...")
-tipos_posibles = ["Seguro", "Daño Dúctil", "Daño Severo"]
-tipo_real = random.choice(tipos_posibles)
-
-if tipo_real == "Seguro":
-    params = {'amplitud': random.uniform(0.4, 0.9), 'rigidez': random.uniform(9, 12), 'gordura': random.uniform(1.5, 2.5), 'pellizco': 0.6}
-elif tipo_real == "Daño Dúctil":
-    params = {'amplitud': random.uniform(1.8, 2.6), 'rigidez': random.uniform(3, 5), 'gordura': random.uniform(4.5, 5.5), 'pellizco': 0.8}
-else:  # Daño Severo
-    params = {'amplitud': random.uniform(3.0, 4.0), 'rigidez': random.uniform(1, 2), 'gordura': random.uniform(4.5, 5.5), 'pellizco': 0.95}
-
-x_nuevo, y_nuevo = generar_ciclo_realista(**params)
-amplitud_nueva = np.max(x_nuevo)
-area_nueva = calcular_area(x_nuevo, y_nuevo)
-
-print(f"  > El ciclo generado es de tipo real: '{tipo_real}'")
-print(f"  > Características: Amplitud={amplitud_nueva:.2f}, Área={area_nueva:.2f}")
-
-dato_nuevo_escalado = scaler.transform([[amplitud_nueva, area_nueva]])
-prediccion = ia_clasificador.predict(dato_nuevo_escalado)
-
-print(f"\n🤖 La IA predice que el nivel de daño es: *** {prediccion[0]} ***")
-if prediccion[0] == tipo_real:
-    print("🎯 ¡La predicción es CORRECTA!")
-else:
-    print("❌ ¡La predicción es INCORRECTA!")
-print("--------------------------------------------------")
-
-# 5. Visualizar el ciclo de prueba
-plt.figure(figsize=(8, 6))
-plt.plot(x_nuevo, y_nuevo, 'b-', linewidth=2, label=f'Tipo Real: {tipo_real}\nPredicción: {prediccion[0]}')
-plt.title('Ciclo de Histéresis Realista y Predicción de la IA')
-plt.xlabel('Deformación (Desplazamiento)')
-plt.ylabel('Fuerza')
-plt.grid(True)
-plt.axhline(0, color='black', linewidth=0.5)
-plt.axvline(0, color='black', linewidth=0.5)
-plt.legend()
-plt.axis('equal')
-plt.savefig('hysteresis_realistic_prediction.png')
-plt.show()
\ No newline at end of file
+HIPERPARAMETROS = {'hidden_layer_sizes': (12, 6), 'max_iter': 2000, 'alpha': 0.01, 'random_state': 42}
+PARAMETROS_DATOS = {'n_por_nivel': 50, 'semilla': 42}
+
+def entrenar_modelo(X_train, y_train):
+    """Ajusta el escalador y entrena la red neuronal. Retorna (ia_clasificador, scaler)."""
+    from sklearn.neural_network import MLPClassifier
+    from sklearn.preprocessing import StandardScaler
+    with etapa('histeresis.escalar', filas=len(X_train)):
+        scaler = StandardScaler().fit(X_train)
+        X_escalado = scaler.transform(X_train)
+    ia_clasificador = MLPClassifier(**HIPERPARAMETROS)
+    print("🧠 Entrenando la Red Neuronal con datos realistas...")
+    with etapa('histeresis.fit', filas=len(X_train)):
+        ia_clasificador.fit(X_escalado, y_train)
+    print("✅ ¡Entrenamiento completo!")
+    return ia_clasificador, scaler
+
+def obtener_modelo(X_train=None, y_train=None, parametros_datos=PARAMETROS_DATOS):
+    """
+    Retorna ((ia_clasificador, scaler), desde_cache). El modelo y su escalador se cargan de la
+    caché si ya se entrenaron con los mismos datos. X_train, y_train deben ser el 80% de
+    entrenamiento de generar_datos_entrenamiento(**parametros_datos) (random_state=42), o de
+    bouc_wen.generar_datos_bouc_wen si los parámetros incluyen n_osciladores; si se omiten,
+    se generan aquí y solo cuando el modelo no está en la caché.
+    """
+    if 'n_osciladores' in parametros_datos:  # Ciclos de osciladores de Bouc-Wen (bouc_wen.py)
+        import bouc_wen
+        nombre, generador = 'histeresis-bouc-wen', bouc_wen.generar_datos_bouc_wen
+        funciones = bouc_wen.FUNCIONES_DATOS + (entrenar_modelo,)
+        constantes = bouc_wen.CONSTANTES_DATOS
+    else:
+        nombre, generador = 'histeresis', generar_datos_entrenamiento
+        funciones = (generar_ciclo_realista, calcular_area, calcular_areas, generar_datos_entrenamiento, entrenar_modelo)
+        constantes = {}
+
+    def entrenar():
+        if X_train is not None:
+            return entrenar_modelo(X_train, y_train)
+        from sklearn.model_selection import train_test_split
+        X_entrenamiento, y_entrenamiento = generador(**parametros_datos)
+        X, _, y, _ = train_test_split(X_entrenamiento, y_entrenamiento, test_size=0.2, random_state=42)
+        return entrenar_modelo(X, y)
+    return obtener_o_entrenar(
+        nombre, {**parametros_datos, **constantes, 'niveles': NIVELES, 'test_size': 0.2,
+                 'hiperparametros': HIPERPARAMETROS},
+        entrenar, funciones=funciones)
+
+def graficar_ciclo(x, y, tipo_real, prediccion, ruta='hysteresis_realistic_prediction.png', mostrar=False,
+                   ejes_iguales=True):
+    """
+    Ciclo de histéresis con su tipo real y la predicción. Sin `mostrar` solo se guarda en `ruta` (Agg).
+    `ejes_iguales=False` deja una escala por eje (ciclos de Bouc-Wen, con x en m y fuerza en N/kg).
+    """
+    from graficos import pyplot, finalizar
+    plt = pyplot(mostrar)
+    plt.figure(figsize=(8, 6))
+    plt.plot(x, y, 'b-', linewidth=2, label=f'Tipo Real: {tipo_real}\nPredicción: {prediccion}')
+    plt.title('Ciclo de Histéresis Realista y Predicción de la IA')
+    plt.xlabel('Deformación (Desplazamiento)')
+    plt.ylabel('Fuerza')
+    plt.grid(True)
+    plt.axhline(0, color='black', linewidth=0.5)
+    plt.axvline(0, color='black', linewidth=0.5)
+    plt.legend()
+    if ejes_iguales:
+        plt.axis('equal')
+    finalizar(plt, ruta, mostrar)
+
+COLORES_NIVELES = {'Seguro': 'green', 'Daño Dúctil': 'orange', 'Daño Severo': 'red'}
+
+def graficar_conjunto(X, etiquetas, ruta='hysteresis_dataset.png', mostrar=False, modo='auto'):
+    """
+    Amplitud frente a área de los ciclos de un conjunto (p. ej. de `generar_datos_masivos`),
+    coloreados por nivel de daño. Con muchos ciclos se dibuja como densidad o submuestra
+    (`modo`, ver `graficos.dispersion_grande`).
+    """
+    from graficos import pyplot, finalizar, dispersion_grande
+    plt = pyplot(mostrar)
+    plt.figure(figsize=(8, 6))
+    ax = plt.gca()
+    dispersion_grande(ax, X[:, 0], X[:, 1], etiquetas, colores=COLORES_NIVELES, modo=modo, s=10, alpha=0.3)
+    for nivel, color in COLORES_NIVELES.items():
+        ax.scatter([], [], c=color, s=30, label=nivel)
+    plt.title(f'Características de {len(X):,} ciclos de histéresis')
+    plt.xlabel('Amplitud máxima')
+    plt.ylabel('Área del ciclo (energía disipada)')
+    plt.grid(True)
+    plt.legend()
+    finalizar(plt, ruta, mostrar)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clasificación del daño a partir de ciclos de histéresis con una red neuronal.")
+    parser.add_argument('--grafico', default='hysteresis_realistic_prediction.png',
+                        help="Archivo PNG de la gráfica ('' para no graficar)")
+    parser.add_argument('--mostrar', action='store_true', help="Abre además la ventana de la gráfica")
+    parser.add_argument('--datos', choices=('sintetico', 'bouc-wen'), default='sintetico',
+                        help="Fuente de los ciclos: fórmula sintética o osciladores de Bouc-Wen (bouc_wen.py)")
+    parser.add_argument('--n-osciladores', type=int, default=3000,
+                        help="Con --datos bouc-wen, número de osciladores del conjunto (por defecto 3000)")
+    parser.add_argument('--grafico-datos', metavar='RUTA',
+                        help="Guarda además la gráfica amplitud-área del conjunto de entrenamiento")
+    parser.add_argument('--n-grafico', type=int, metavar='N_POR_NIVEL',
+                        help="Con --grafico-datos, grafica N_POR_NIVEL ciclos por nivel de generar_datos_masivos")
+    parser.add_argument('--modo-grafico', choices=MODOS, default='auto',
+                        help="Cómo dibujar el conjunto; 'auto' usa densidad por encima de 50000 puntos")
+    args = parser.parse_args(argv)
+
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import accuracy_score, confusion_matrix
+    if args.datos == 'bouc-wen':
+        import bouc_wen
+        parametros = {'n_osciladores': args.n_osciladores, 'semilla': 42}
+        with etapa('histeresis.generar_datos', filas=args.n_osciladores):
+            X_entrenamiento, y_entrenamiento = bouc_wen.generar_datos_bouc_wen(**parametros)
+    else:
+        parametros = PARAMETROS_DATOS
+        with etapa('histeresis.generar_datos', filas=3 * PARAMETROS_DATOS['n_por_nivel']):
+            X_entrenamiento, y_entrenamiento = generar_datos_entrenamiento(**PARAMETROS_DATOS)
+    X_train, X_test, y_train, y_test = train_test_split(X_entrenamiento, y_entrenamiento, test_size=0.2, random_state=42)
+
+    with etapa('histeresis.obtener_modelo'):
+        (ia_clasificador, scaler), desde_cache = obtener_modelo(X_train, y_train, parametros)
+    if desde_cache:
+        print("✅ Modelo cargado desde la caché.")
+    with etapa('histeresis.escalar', filas=len(X_entrenamiento)):
+        X_train_scaled = scaler.transform(X_train)
+        X_test_scaled = scaler.transform(X_test)
+
+    # 3. Evaluar el modelo
+    with etapa('histeresis.predict', filas=len(X_test)):
+        y_pred = ia_clasificador.predict(X_test_scaled)
+    accuracy = accuracy_score(y_test, y_pred)
+    cm = confusion_matrix(y_test, y_pred, labels=["Seguro", "Daño Dúctil", "Daño Severo"])
+    print(f"\n📊 Precisión en el conjunto de prueba: {accuracy:.2f}")
+    print("Matriz de confusión:")
+    print(cm)
+
+    # 4. Probar con un nuevo ciclo aleatorio
+    print("\n--------------------------------------------------")
+    print("🎲 Generando un nuevo ciclo de prueba aleatorio y realista...")
+    if args.datos == 'bouc-wen':
+        x_nuevo, y_nuevo, tipo_real = bouc_wen.ciclo_aleatorio()
+    else:
+        tipos_posibles = ["Seguro", "Daño Dúctil", "Daño Severo"]
+        tipo_real = random.choice(tipos_posibles)
+
+        if tipo_real == "Seguro":
+            params = {'amplitud': random.uniform(0.4, 0.9), 'rigidez': random.uniform(9, 12), 'gordura': random.uniform(1.5, 2.5), 'pellizco': 0.6}
+        elif tipo_real == "Daño Dúctil":
+            params = {'amplitud': random.uniform(1.8, 2.6), 'rigidez': random.uniform(3, 5), 'gordura': random.uniform(4.5, 5.5), 'pellizco': 0.8}
+        else:  # Daño Severo
+            params = {'amplitud': random.uniform(3.0, 4.0), 'rigidez': random.uniform(1, 2), 'gordura': random.uniform(4.5, 5.5), 'pellizco': 0.95}
+
+        x_nuevo, y_nuevo = generar_ciclo_realista(**params)
+    amplitud_nueva = np.max(x_nuevo)
+    area_nueva = calcular_area(x_nuevo, y_nuevo)
+
+    print(f"  > El ciclo generado es de tipo real: '{tipo_real}'")
+    print(f"  > Características: Amplitud={amplitud_nueva:.2f}, Área={area_nueva:.2f}")
+
+    dato_nuevo_escalado = scaler.transform([[amplitud_nueva, area_nueva]])
+    prediccion = ia_clasificador.predict(dato_nuevo_escalado)
+
+    print(f"\n🤖 La IA predice que el nivel de daño es: *** {prediccion[0]} ***")
+    if prediccion[0] == tipo_real:
+        print("🎯 ¡La predicción es CORRECTA!")
+    else:
+        print("❌ ¡La predicción es INCORRECTA!")
+    print("--------------------------------------------------")
+
+    # 5. Visualizar el ciclo de prueba
+    if args.grafico or args.mostrar:
+        with etapa('histeresis.grafico', filas=len(x_nuevo)):
+            graficar_ciclo(x_nuevo, y_nuevo, tipo_real, prediccion[0], args.grafico or None, args.mostrar,
+                           ejes_iguales=args.datos != 'bouc-wen')
+
+    if args.grafico_datos:
+        if args.n_grafico:
+            with etapa('histeresis.generar_datos', filas=3 * args.n_grafico):
+                X_grafico, etiquetas_grafico = generar_datos_masivos(args.n_grafico)
+        else:
+            X_grafico, etiquetas_grafico = X_entrenamiento, y_entrenamiento
+        with etapa('histeresis.grafico', filas=len(X_grafico)):
+            graficar_conjunto(X_grafico, etiquetas_grafico, args.grafico_datos, args.mostrar, args.modo_grafico)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
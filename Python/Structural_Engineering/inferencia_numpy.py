@@ -0,0 +1,180 @@
+import argparse
+import time
+import numpy as np
+#
+#Autor: Oscar Calvo
+# Fecha: Octubre 18/2026
+# Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
+#
+# Inferencia de las redes MLP (PushOverML.py e histeresisNL.py) solo con NumPy.
+# La exportación incorpora el StandardScaler de entrada en la primera capa
+# (W' = W / escala, b' = b - (media / escala) @ W) y, en el regresor, el escalador
+# de salida en la última capa, de modo que la predicción es una secuencia de
+# productos matriz-vector sin validaciones ni conversiones de scikit-learn.
+# El archivo .npz resultante se carga sin importar scikit-learn.
+
+ACTIVACIONES = {
+    'identity': lambda z: z,
+    'relu': lambda z: np.maximum(z, 0, out=z),
+    'tanh': np.tanh,
+    'logistic': lambda z: 1 / (1 + np.exp(-z)),
+}
+
+def exportar_mlp(ruta, modelo, scaler_X, scaler_y=None):
+    """
+    Guarda un MLPRegressor o MLPClassifier entrenado y sus escaladores en un único archivo .npz.
+    - modelo: Red ya entrenada (usa coefs_, intercepts_, activation y out_activation_)
+    - scaler_X: StandardScaler aplicado a las entradas
+    - scaler_y: StandardScaler aplicado a la salida del regresor (opcional)
+    """
+    pesos = [np.array(W, dtype=np.float64) for W in modelo.coefs_]
+    sesgos = [np.array(b, dtype=np.float64) for b in modelo.intercepts_]
+
+    # Escalador de entrada: (x - media) / escala @ W + b = x @ (W / escala) + (b - (media / escala) @ W)
+    media, escala = scaler_X.mean_, scaler_X.scale_
+    sesgos[0] = sesgos[0] - (media / escala) @ pesos[0]
+    pesos[0] = pesos[0] / escala[:, np.newaxis]
+
+    # Escalador de salida del regresor: y = y_escalada * escala + media
+    if scaler_y is not None:
+        pesos[-1] = pesos[-1] * scaler_y.scale_
+        sesgos[-1] = sesgos[-1] * scaler_y.scale_ + scaler_y.mean_
+
+    contenido = {f'W{i}': W for i, W in enumerate(pesos)}
+    contenido.update({f'b{i}': b for i, b in enumerate(sesgos)})
+    contenido['activacion'] = np.array(modelo.activation)
+    contenido['activacion_salida'] = np.array(modelo.out_activation_)
+    if hasattr(modelo, 'classes_'):
+        contenido['clases'] = np.asarray(modelo.classes_)
+    np.savez(ruta, n_capas=len(pesos), **contenido)
+    return ruta
+
+class ModeloNumpy:
+    """
+    Red MLP exportada con `exportar_mlp`. Recibe entradas sin escalar y retorna
+    desplazamientos (regresor) o etiquetas de clase (clasificador).
+    """
+
+    def __init__(self, ruta):
+        with np.load(ruta) as datos:
+            n_capas = int(datos['n_capas'])
+            self.pesos = [np.ascontiguousarray(datos[f'W{i}']) for i in range(n_capas)]
+            self.sesgos = [datos[f'b{i}'] for i in range(n_capas)]
+            self.activacion = ACTIVACIONES[str(datos['activacion'])]
+            self.activacion_salida = str(datos['activacion_salida'])
+            self.clases = datos['clases'] if 'clases' in datos.files else None
+
+    def _salida(self, X):
+        """Propagación hacia adelante para un lote (n_muestras x n_entradas); retorna la capa de salida lineal."""
+        z = np.asarray(X, dtype=np.float64)
+        for W, b in zip(self.pesos[:-1], self.sesgos[:-1]):
+            z = z @ W
+            z += b
+            z = self.activacion(z)
+        z = z @ self.pesos[-1]
+        z += self.sesgos[-1]
+        return z
+
+    def _etiquetas(self, z):
+        """Convierte la salida lineal en predicción (la función de salida es monótona, no hace falta aplicarla)."""
+        if self.clases is None:
+            return z.ravel() if z.shape[1] == 1 else z
+        if z.shape[1] == 1:
+            return self.clases[(z[:, 0] > 0).astype(int)]
+        return self.clases[np.argmax(z, axis=1)]
+
+    def predecir(self, X):
+        """Predicción vectorizada para un lote grande (n_muestras x n_entradas)."""
+        return self._etiquetas(self._salida(np.atleast_2d(X)))
+
+    def predecir_uno(self, x):
+        """
+        Predicción de baja latencia para una sola muestra (secuencia de n_entradas valores).
+        Trabaja con vectores 1D, sin validaciones ni copias adicionales.
+        """
+        z = np.array(x, dtype=np.float64)
+        for W, b in zip(self.pesos[:-1], self.sesgos[:-1]):
+            z = self.activacion(z @ W + b)
+        z = z @ self.pesos[-1] + self.sesgos[-1]
+        if self.clases is None:
+            return float(z[0]) if len(z) == 1 else z
+        if len(z) == 1:
+            return self.clases[int(z[0] > 0)]
+        return self.clases[int(np.argmax(z))]
+
+def _tiempo_por_llamada(funcion, repeticiones):
+    """Tiempo medio (s) por llamada de `funcion()`."""
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        funcion()
+    return (time.perf_counter() - inicio) / repeticiones
+
+def comparar_con_sklearn(modelo_np, prediccion_sklearn, X, repeticiones=2000, tolerancia=1e-9):
+    """
+    Verifica que ModeloNumpy reproduzca la predicción de scikit-learn y mide la latencia.
+    - prediccion_sklearn: Función X -> predicción usando scaler + modelo de scikit-learn
+    - X: Lote de entradas sin escalar
+    Retorna un diccionario con el error máximo y los tiempos de una muestra y del lote.
+    """
+    esperado = np.asarray(prediccion_sklearn(X))
+    obtenido = modelo_np.predecir(X)
+    uno = np.array([modelo_np.predecir_uno(x) for x in X[:100]])
+    if esperado.dtype.kind in 'fc':
+        error = max(np.max(np.abs(esperado - obtenido)), np.max(np.abs(esperado[:100] - uno)))
+        if error > tolerancia * max(1.0, np.max(np.abs(esperado))):
+            raise AssertionError(f"La inferencia NumPy difiere de scikit-learn (error máximo {error:.3g}).")
+    else:
+        error = int(np.sum(esperado != obtenido) + np.sum(esperado[:100] != uno))
+        if error:
+            raise AssertionError(f"La inferencia NumPy difiere de scikit-learn en {error} predicciones.")
+
+    muestra = X[:1]
+    fila = X[0].tolist()
+    return {
+        'error_maximo': error,
+        'sklearn_uno_us': _tiempo_por_llamada(lambda: prediccion_sklearn(muestra), repeticiones) * 1e6,
+        'numpy_uno_us': _tiempo_por_llamada(lambda: modelo_np.predecir_uno(fila), repeticiones) * 1e6,
+        'sklearn_lote_s': _tiempo_por_llamada(lambda: prediccion_sklearn(X), 3),
+        'numpy_lote_s': _tiempo_por_llamada(lambda: modelo_np.predecir(X), 3),
+        'n_lote': len(X),
+    }
+
+def _imprimir_comparacion(titulo, r):
+    print(f"\n{titulo}")
+    print(f"  Error máximo frente a scikit-learn: {r['error_maximo']:.3g}")
+    print(f"  Una muestra: scikit-learn {r['sklearn_uno_us']:.1f} µs | NumPy {r['numpy_uno_us']:.1f} µs "
+          f"({r['sklearn_uno_us'] / r['numpy_uno_us']:.0f}x)")
+    print(f"  Lote de {r['n_lote']}: scikit-learn {r['sklearn_lote_s'] * 1e3:.1f} ms | NumPy {r['numpy_lote_s'] * 1e3:.1f} ms")
+
+if __name__ == "__main__":
+    # Estas importaciones solo se necesitan para exportar y verificar, no para usar ModeloNumpy
+    import PushOverML
+    import histeresisNL
+
+    parser = argparse.ArgumentParser(description="Exporta las redes MLP a .npz y verifica la inferencia NumPy.")
+    parser.add_argument('--pushover', default='pushover_mlp.npz', help="Archivo de salida del regresor Pushover")
+    parser.add_argument('--histeresis', default='histeresis_mlp.npz', help="Archivo de salida del clasificador de histéresis")
+    parser.add_argument('--n-lote', type=int, default=100_000, help="Tamaño del lote del microbenchmark")
+    args = parser.parse_args()
+    rng = np.random.default_rng(0)
+
+    # Regresor Pushover: entradas [carga, carga^2/1000], salida desplazamiento (m)
+    (modelo, scaler_X, scaler_y), _ = PushOverML.obtener_modelo()
+    exportar_mlp(args.pushover, modelo, scaler_X, scaler_y)
+    cargas = rng.uniform(0, 1000, args.n_lote)
+    X_lote = np.column_stack((cargas, cargas**2 / 1000))
+    r = comparar_con_sklearn(
+        ModeloNumpy(args.pushover),
+        lambda X: scaler_y.inverse_transform(modelo.predict(scaler_X.transform(X)).reshape(-1, 1)).ravel(),
+        X_lote)
+    _imprimir_comparacion(f"Regresor Pushover -> {args.pushover}", r)
+
+    # Clasificador de histéresis: entradas [amplitud, área], salida nivel de daño
+    (ia_clasificador, scaler), _ = histeresisNL.obtener_modelo()
+    exportar_mlp(args.histeresis, ia_clasificador, scaler)
+    X_lote = np.column_stack((rng.uniform(0.3, 4.5, args.n_lote), rng.uniform(0, 200, args.n_lote)))
+    r = comparar_con_sklearn(
+        ModeloNumpy(args.histeresis),
+        lambda X: ia_clasificador.predict(scaler.transform(X)),
+        X_lote)
+    _imprimir_comparacion(f"Clasificador de histéresis -> {args.histeresis}", r)
\ No newline at end of file
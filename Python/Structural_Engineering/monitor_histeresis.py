@@ -0,0 +1,263 @@
+import argparse
+import asyncio
+import io
+import json
+import struct
+import sys
+import time
+from collections import deque
+import numpy as np
+from registros_histeresis import SegmentadorCiclos
+from inferencia_numpy import ModeloNumpy, exportar_mlp
+#
+#Autor: Oscar Calvo
+# Fecha: Octubre 18/2026
+# Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
+#
+# Monitor en tiempo real (asyncio) del daño por ciclo de histéresis durante un ensayo.
+# Recibe tramas binarias de muestras fuerza-desplazamiento de muchos canales por TCP,
+# socket Unix o una tubería (stdin), mantiene por canal un SegmentadorCiclos con estado
+# constante (suma del cordón de zapato y amplitud máxima en curso) y, en cuanto un ciclo
+# se cierra, emite una línea JSON con su clasificación: Seguro / Daño Dúctil / Daño Severo.
+#
+# Formato de trama (little endian):
+#   cabecera: canal (uint32), n muestras (uint32), instante de envío time.time() (float64, 0 si no se conoce)
+#   datos: n pares (desplazamiento, fuerza) en float64
+
+CABECERA = struct.Struct('<IId')
+MAX_MUESTRAS_TRAMA = 1 << 20  # 16 MB por trama; una cabecera mayor se considera corrupta o maliciosa
+
+def trama(canal, muestras, t_envio=None):
+    """Codifica una trama con las muestras (n x 2) de un canal."""
+    muestras = np.ascontiguousarray(muestras, dtype='<f8')
+    t_envio = time.time() if t_envio is None else t_envio
+    return CABECERA.pack(canal, len(muestras), t_envio) + muestras.tobytes()
+
+def cargar_modelo(ruta=None):
+    """
+    Retorna un ModeloNumpy: desde un .npz de `inferencia_numpy.py` o, si no se da la ruta,
+    exportando en memoria el modelo de histeresisNL.py (de la caché o entrenándolo).
+    """
+    if ruta is not None:
+        return ModeloNumpy(ruta)
+    from histeresisNL import obtener_modelo
+    (ia_clasificador, scaler), _ = obtener_modelo()
+    archivo = io.BytesIO()
+    exportar_mlp(archivo, ia_clasificador, scaler)
+    archivo.seek(0)
+    return ModeloNumpy(archivo)
+
+class MonitorCiclos:
+    """
+    Estado del monitor: un SegmentadorCiclos por canal, el modelo y los contadores.
+    Guarda las latencias de los últimos `max_latencias` ciclos para calcular percentiles.
+    """
+
+    def __init__(self, modelo, umbral=0.0, max_latencias=100_000):
+        self.modelo = modelo
+        self.umbral = umbral
+        self.canales = {}
+        self.latencias = deque(maxlen=max_latencias)
+        self.n_muestras = 0
+        self.n_tramas = 0
+        self.n_ciclos = 0
+        self.inicio = time.perf_counter()
+
+    def procesar(self, canal, muestras, t_envio=0.0):
+        """
+        Procesa las muestras (n x 2) de un canal. Retorna la lista de eventos (diccionarios)
+        de los ciclos que se cerraron, ya clasificados.
+        """
+        t_llegada = time.time()
+        segmentador = self.canales.get(canal)
+        if segmentador is None:
+            segmentador = self.canales[canal] = SegmentadorCiclos(self.umbral)
+        ciclos = segmentador.procesar(muestras[:, 0], muestras[:, 1])
+        self.n_muestras += len(muestras)
+        self.n_tramas += 1
+        if not len(ciclos['inicio']):
+            return []
+
+        niveles = self.modelo.predecir(np.column_stack((ciclos['amplitud'], ciclos['area'])))
+        ahora = time.time()
+        latencia = ahora - (t_envio or t_llegada)
+        self.latencias.extend([latencia] * len(niveles))
+        self.n_ciclos += len(niveles)
+        return [{'canal': canal, 'inicio': int(i), 'n_muestras': int(n), 'amplitud': float(a),
+                 'area': float(e), 'nivel': str(nivel), 'latencia_ms': latencia * 1e3}
+                for i, n, a, e, nivel in zip(ciclos['inicio'], ciclos['n_muestras'],
+                                             ciclos['amplitud'], ciclos['area'], niveles)]
+
+    def estadisticas(self):
+        """Muestras por segundo, ciclos y percentiles de latencia por ciclo (ms)."""
+        segundos = time.perf_counter() - self.inicio
+        resultado = {'canales': len(self.canales), 'muestras': self.n_muestras, 'tramas': self.n_tramas,
+                     'ciclos': self.n_ciclos, 'segundos': segundos,
+                     'muestras_por_segundo': self.n_muestras / segundos if segundos > 0 else 0.0}
+        if self.latencias:
+            p50, p90, p99, pmax = np.percentile(np.array(self.latencias) * 1e3, [50, 90, 99, 100])
+            resultado.update({'latencia_p50_ms': p50, 'latencia_p90_ms': p90,
+                              'latencia_p99_ms': p99, 'latencia_max_ms': pmax})
+        return resultado
+
+    async def atender(self, reader, writer=None):
+        """
+        Lee tramas de una conexión hasta que se cierre y escribe un evento JSON por ciclo
+        en `writer` (o en la salida estándar si writer es None). Una trama con más de
+        MAX_MUESTRAS_TRAMA muestras cierra la conexión.
+        """
+        try:
+            while True:
+                cabecera = await reader.readexactly(CABECERA.size)
+                canal, n, t_envio = CABECERA.unpack(cabecera)
+                if n > MAX_MUESTRAS_TRAMA:
+                    print(f"Trama del canal {canal} con {n} muestras (máximo {MAX_MUESTRAS_TRAMA}); "
+                          f"se cierra la conexión.", file=sys.stderr)
+                    return
+                datos = await reader.readexactly(16 * n)
+                eventos = self.procesar(canal, np.frombuffer(datos, dtype='<f8').reshape(n, 2), t_envio)
+                if eventos:
+                    texto = ''.join(json.dumps(e, ensure_ascii=False) + '\n' for e in eventos)
+                    if writer is None:
+                        sys.stdout.write(texto)
+                    else:
+                        writer.write(texto.encode('utf-8'))
+                        await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            if writer is not None:
+                writer.close()
+
+def _imprimir_estadisticas(e):
+    texto = (f"{e['canales']} canales | {e['muestras_por_segundo'] / 1e3:,.1f} kHz | "
+             f"{e['ciclos']} ciclos")
+    if 'latencia_p50_ms' in e:
+        texto += (f" | latencia p50 {e['latencia_p50_ms']:.2f} ms, p90 {e['latencia_p90_ms']:.2f} ms, "
+                  f"p99 {e['latencia_p99_ms']:.2f} ms, máx {e['latencia_max_ms']:.2f} ms")
+    print(texto, file=sys.stderr)
+
+async def _reportar(monitor, intervalo):
+    while True:
+        await asyncio.sleep(intervalo)
+        _imprimir_estadisticas(monitor.estadisticas())
+
+async def servir(monitor, host='127.0.0.1', puerto=8765, unix=None, stdin=False, intervalo=5.0):
+    """Atiende conexiones TCP (o un socket Unix, o la entrada estándar) y reporta estadísticas cada `intervalo` s."""
+    reporte = asyncio.create_task(_reportar(monitor, intervalo)) if intervalo else None
+    try:
+        if stdin:
+            loop = asyncio.get_running_loop()
+            reader = asyncio.StreamReader(limit=2**20)
+            await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin.buffer)
+            await monitor.atender(reader)
+            return
+        if unix:
+            servidor = await asyncio.start_unix_server(monitor.atender, path=unix)
+        else:
+            servidor = await asyncio.start_server(monitor.atender, host, puerto)
+        print(f"Monitor escuchando en {unix or f'{host}:{puerto}'}", file=sys.stderr)
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        if reporte is not None:
+            reporte.cancel()
+
+def _senal_canal(rng, n_ciclos=40):
+    """Señal sintética de un canal: n_ciclos ciclos consecutivos de niveles de daño aleatorios."""
+    from histeresisNL import NIVELES, generar_ciclos
+    rangos = [NIVELES[i] for i in rng.integers(0, len(NIVELES), n_ciclos)]
+    x, y = generar_ciclos([rng.uniform(*r[1]) for r in rangos], [rng.uniform(*r[2]) for r in rangos],
+                          [rng.uniform(*r[3]) for r in rangos], [r[4] for r in rangos], rng=rng)
+    return np.stack((x.ravel(), y.ravel()), axis=1)
+
+async def _enviar_canal(host, puerto, canal, senal, frecuencia, duracion, muestras_por_trama):
+    """Envía `senal` por un canal a `frecuencia` muestras/s durante `duracion` s; retorna los eventos recibidos."""
+    reader, writer = await asyncio.open_connection(host, puerto)
+    eventos = 0
+
+    async def recibir():
+        nonlocal eventos
+        while await reader.readline():
+            eventos += 1
+
+    receptor = asyncio.create_task(recibir())
+    periodo = muestras_por_trama / frecuencia
+    inicio = time.perf_counter()
+    posicion = enviadas = 0
+    while time.perf_counter() - inicio < duracion:
+        fin = posicion + muestras_por_trama
+        bloque = senal[posicion:fin] if fin <= len(senal) else np.concatenate((senal[posicion:], senal[:fin - len(senal)]))
+        posicion = fin % len(senal)
+        writer.write(trama(canal, bloque))
+        await writer.drain()
+        enviadas += 1
+        # Ritmo constante sin acumular deriva
+        espera = inicio + enviadas * periodo - time.perf_counter()
+        await asyncio.sleep(max(espera, 0))
+    writer.write_eof()
+    await receptor
+    writer.close()
+    return eventos
+
+async def generar_carga(monitor, n_canales=100, frecuencia=1000.0, duracion=10.0, muestras_por_trama=100,
+                        host='127.0.0.1', puerto=0):
+    """
+    Generador de carga local: levanta el monitor en un puerto libre y conecta `n_canales`
+    clientes que envían señales sintéticas a `frecuencia` muestras/s cada uno.
+    Retorna las estadísticas del monitor (frecuencia agregada = n_canales * frecuencia).
+    Las señales se generan antes de iniciar el reloj para no descontarlas de la frecuencia medida.
+    """
+    senales = [_senal_canal(np.random.default_rng(canal)) for canal in range(n_canales)]
+    servidor = await asyncio.start_server(monitor.atender, host, puerto)
+    puerto = servidor.sockets[0].getsockname()[1]
+    async with servidor:
+        monitor.inicio = time.perf_counter()
+        await asyncio.gather(*(_enviar_canal(host, puerto, canal, senales[canal], frecuencia, duracion,
+                                             muestras_por_trama) for canal in range(n_canales)))
+    return monitor.estadisticas()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monitor en tiempo real del daño por ciclo de histéresis.")
+    parser.add_argument('--modelo', help="Red exportada con inferencia_numpy.py (.npz); por defecto usa histeresisNL.py")
+    parser.add_argument('--umbral', type=float, default=0.0, help="Banda muerta para los cruces por cero")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    p_servir = subparsers.add_parser('servir', help="Atiende tramas por TCP, socket Unix o stdin")
+    p_servir.add_argument('--host', default='127.0.0.1')
+    p_servir.add_argument('--puerto', type=int, default=8765)
+    p_servir.add_argument('--unix', help="Ruta de un socket Unix en lugar de TCP")
+    p_servir.add_argument('--stdin', action='store_true', help="Lee las tramas de la entrada estándar (tubería)")
+    p_servir.add_argument('--intervalo', type=float, default=5.0, help="Segundos entre reportes de estadísticas")
+
+    p_carga = subparsers.add_parser('carga', help="Prueba de carga local con canales sintéticos")
+    p_carga.add_argument('--canales', type=int, default=100)
+    p_carga.add_argument('--frecuencia', type=float, default=1000.0, help="Muestras por segundo por canal")
+    p_carga.add_argument('--duracion', type=float, default=10.0, help="Segundos de envío")
+    p_carga.add_argument('--muestras-por-trama', type=int, default=100)
+    p_carga.add_argument('--tolerancia', type=float, default=0.01,
+                         help="Fracción por debajo de canales x frecuencia que aún cuenta como sostenida "
+                              "(por defecto 0.01). Los clientes envían al ritmo exacto, así que la conexión "
+                              "y el cierre siempre restan algo; con 0 se exige la frecuencia completa")
+    args = parser.parse_args()
+
+    monitor = MonitorCiclos(cargar_modelo(args.modelo), umbral=args.umbral)
+    if args.comando == 'servir':
+        try:
+            asyncio.run(servir(monitor, args.host, args.puerto, args.unix, args.stdin, args.intervalo))
+        except KeyboardInterrupt:
+            pass
+        _imprimir_estadisticas(monitor.estadisticas())
+    else:
+        objetivo = args.canales * args.frecuencia
+        print(f"Enviando {args.canales} canales x {args.frecuencia:,.0f} Hz = {objetivo / 1e3:,.1f} kHz "
+              f"durante {args.duracion:.0f} s...", file=sys.stderr)
+        estadisticas = asyncio.run(generar_carga(monitor, args.canales, args.frecuencia, args.duracion,
+                                                 args.muestras_por_trama))
+        _imprimir_estadisticas(estadisticas)
+        minimo = (1 - args.tolerancia) * objetivo
+        alcanzado = estadisticas['muestras_por_segundo'] >= minimo
+        print(f"El monitor {'mantiene' if alcanzado else 'NO mantiene'} la frecuencia objetivo "
+              f"({estadisticas['muestras_por_segundo'] / 1e3:,.1f} kHz; mínimo {minimo / 1e3:,.1f} kHz "
+              f"con tolerancia {args.tolerancia:.0%}).", file=sys.stderr)
+        sys.exit(0 if alcanzado else 1)
\ No newline at end of file
@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+#
+#Autor: Oscar Calvo
+# Fecha: Octubre 18/2026
+# Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
+#
+# Instrumentación opcional por etapas (generación de datos, escalado, fit, predict, gráficas).
+# Los scripts envuelven cada etapa en `with etapa('zapatas.fit', filas=n):`. Si el perfilador
+# no está activo, `etapa` retorna un contexto vacío compartido y el costo es una llamada a función.
+# Activación:
+#   - Variable de entorno RUTINAS_PERFIL=traza.ndjson ('-' = salida de error)
+#   - o `python rutinas.py --perfil traza.ndjson <comando> ...`
+# Cada etapa agrega una línea JSON con tiempo de pared, tiempo de CPU, pico de memoria de
+# tracemalloc sobre la memoria al entrar (RUTINAS_PERFIL_MEMORIA=0 lo desactiva, porque
+# tracemalloc hace más lento el código Python) y filas procesadas. Con
+# RUTINAS_PERFIL_CPROFILE=<etapa> se guarda además <etapa>.prof (cProfile) de esa etapa.
+# `python perfilador.py traza.ndjson` resume la traza por etapa.
+
+MB = 1024 ** 2
+
+class _EtapaNula:
+    """Contexto vacío que se usa cuando el perfilador está inactivo."""
+    filas = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULA = _EtapaNula()
+_TRAZA = None
+
+class _Traza:
+    def __init__(self, ruta, cprofile=None, memoria=True):
+        self.ruta = ruta
+        self.cprofile = cprofile
+        self.memoria = memoria
+        self.pila = []
+        self.ejecucion = f"{os.getpid()}-{int(time.time() * 1000)}"
+        self._iniciar_tracemalloc = memoria and not tracemalloc.is_tracing()
+        if self._iniciar_tracemalloc:
+            tracemalloc.start()
+        self.archivo = sys.stderr if ruta == '-' else open(ruta, 'a', encoding='utf-8')
+        self.escribir({'evento': 'inicio', 'script': os.path.basename(sys.argv[0]), 'argv': sys.argv[1:],
+                       'pid': os.getpid(), 'fecha': time.strftime('%Y-%m-%dT%H:%M:%S')})
+
+    def escribir(self, evento):
+        evento['ejecucion'] = self.ejecucion
+        self.archivo.write(json.dumps(evento, ensure_ascii=False) + '\n')
+        self.archivo.flush()
+
+    def cerrar(self):
+        if self.archivo is not sys.stderr:
+            self.archivo.close()
+        if self._iniciar_tracemalloc:
+            tracemalloc.stop()
+
+class _Etapa:
+    def __init__(self, traza, nombre, filas):
+        self.traza = traza
+        self.nombre = nombre
+        self.filas = filas
+        self.perfil = None
+
+    def __enter__(self):
+        traza = self.traza
+        self.padre = traza.pila[-1].nombre if traza.pila else None
+        if traza.memoria:
+            actual, pico = tracemalloc.get_traced_memory()
+            if traza.pila:  # El pico acumulado hasta aquí pertenece a la etapa que contiene a esta
+                traza.pila[-1].pico = max(traza.pila[-1].pico, pico)
+            tracemalloc.reset_peak()
+            self.base = self.pico = actual
+        traza.pila.append(self)
+        if traza.cprofile == self.nombre:
+            import cProfile
+            self.perfil = cProfile.Profile()
+            self.perfil.enable()
+        self.cpu0 = time.process_time()
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, rastro):
+        pared = time.perf_counter() - self.t0
+        cpu = time.process_time() - self.cpu0
+        traza = self.traza
+        evento = {'evento': 'etapa', 'etapa': self.nombre, 'padre': self.padre,
+                  'pared_s': pared, 'cpu_s': cpu, 'filas': self.filas}
+        if self.perfil is not None:
+            self.perfil.disable()
+            evento['cprofile'] = f"{self.nombre}.prof"
+            self.perfil.dump_stats(evento['cprofile'])
+        if traza.memoria:
+            self.pico = max(self.pico, tracemalloc.get_traced_memory()[1])
+            evento['memoria_pico_mb'] = (self.pico - self.base) / MB
+        traza.pila.pop()
+        if traza.memoria and traza.pila:
+            traza.pila[-1].pico = max(traza.pila[-1].pico, self.pico)
+        if self.filas and pared > 0:
+            evento['filas_por_s'] = self.filas / pared
+        if tipo is not None:
+            evento['error'] = tipo.__name__
+        traza.escribir(evento)
+        return False
+
+def etapa(nombre, filas=None):
+    """
+    Contexto que mide una etapa del flujo. `filas` (opcional) es el número de filas procesadas;
+    también se puede asignar dentro del bloque (`with etapa('x') as e: ... e.filas = n`).
+    """
+    if _TRAZA is None:
+        return _NULA
+    return _Etapa(_TRAZA, nombre, filas)
+
+def activar(ruta, cprofile=None, memoria=True):
+    """Activa el perfilador escribiendo la traza NDJSON en `ruta` ('-' = salida de error)."""
+    global _TRAZA
+    desactivar()
+    _TRAZA = _Traza(ruta, cprofile, memoria)
+
+def desactivar():
+    global _TRAZA
+    if _TRAZA is not None:
+        _TRAZA.cerrar()
+        _TRAZA = None
+
+def activo():
+    return _TRAZA is not None
+
+def resumir(ruta):
+    """Lee una traza y retorna {etapa: {'llamadas', 'pared_s', 'cpu_s', 'memoria_pico_mb', 'filas'}}."""
+    resumen = {}
+    with open(ruta, encoding='utf-8') as archivo:
+        for linea in archivo:
+            evento = json.loads(linea)
+            if evento.get('evento') != 'etapa':
+                continue
+            r = resumen.setdefault(evento['etapa'], {'llamadas': 0, 'pared_s': 0.0, 'cpu_s': 0.0,
+                                                     'memoria_pico_mb': None, 'filas': 0})
+            r['llamadas'] += 1
+            r['pared_s'] += evento['pared_s']
+            r['cpu_s'] += evento['cpu_s']
+            r['filas'] += evento.get('filas') or 0
+            if 'memoria_pico_mb' in evento:
+                r['memoria_pico_mb'] = max(r['memoria_pico_mb'] or 0.0, evento['memoria_pico_mb'])
+    return resumen
+
+if os.environ.get('RUTINAS_PERFIL'):
+    activar(os.environ['RUTINAS_PERFIL'], os.environ.get('RUTINAS_PERFIL_CPROFILE') or None,
+            os.environ.get('RUTINAS_PERFIL_MEMORIA', '1') != '0')
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resume una traza NDJSON del perfilador por etapa.")
+    parser.add_argument('traza')
+    args = parser.parse_args()
+    resumen = resumir(args.traza)
+    print(f"{'Etapa':<32}{'Llamadas':>9}{'Pared (s)':>11}{'CPU (s)':>10}{'Pico (MB)':>11}{'Filas':>12}")
+    for nombre, r in sorted(resumen.items(), key=lambda e: -e[1]['pared_s']):
+        pico = f"{r['memoria_pico_mb']:.1f}" if r['memoria_pico_mb'] is not None else '-'
+        print(f"{nombre:<32}{r['llamadas']:>9}{r['pared_s']:>11.3f}{r['cpu_s']:>10.3f}{pico:>11}{r['filas']:>12,}")
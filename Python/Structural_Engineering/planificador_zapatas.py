@@ -0,0 +1,214 @@
+import argparse
+import math
+import sys
+import time
+import numpy as np
+from CombinedFootML import evaluar_bloque, obtener_modelo
+from perfilador import etapa
+#
+#Autor: Oscar Calvo
+# Fecha: Octubre 18/2026
+# Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
+#
+# Planificador de zapatas combinadas para la planta completa de un edificio.
+# A partir de las coordenadas (x, y) y cargas P de las columnas:
+#   1. Un KD-tree (scipy.spatial.cKDTree) lista los pares de columnas a menos de `d_max`,
+#      sin comparar todos los pares (O(n log n) en lugar de O(n²)).
+#   2. Todos los pares candidatos se validan, clasifican y dimensionan por bloques con
+#      `evaluar_bloque` de CombinedFootML.py (mismo árbol y mismas fórmulas de área/largo/ancho).
+#   3. Entre los pares ADECUADOS se elige, de forma voraz y empezando por las columnas más
+#      cercanas, un conjunto en el que cada columna pertenece a una sola zapata y las zapatas
+#      (rectángulos orientados según el eje de sus columnas) no se traslapan. Los traslapos se
+#      buscan solo entre zapatas de celdas vecinas de una rejilla.
+
+COLUMNAS_ENTRADA = ['x', 'y', 'P']
+
+def generar_columnas(n, separacion=5.0, dispersion=0.5, q=200.0, semilla=0):
+    """
+    Planta sintética de n columnas en una retícula de `separacion` m con perturbación aleatoria
+    de hasta `dispersion` m, cargas entre 100 y 1000 kN y capacidad portante q (kN/m^2).
+    """
+    import pandas as pd
+    rng = np.random.default_rng(semilla)
+    lado = int(np.ceil(np.sqrt(n)))
+    fila, columna = np.divmod(np.arange(n), lado)
+    return pd.DataFrame({
+        'id': np.arange(n),
+        'x': columna * separacion + rng.uniform(-dispersion, dispersion, n),
+        'y': fila * separacion + rng.uniform(-dispersion, dispersion, n),
+        'P': rng.uniform(100, 1000, n),
+        'q': np.full(n, q),
+    })
+
+def leer_columnas(ruta):
+    """Lee un CSV o Parquet con columnas x, y, P (y opcionalmente id y q)."""
+    import pandas as pd
+    columnas = pd.read_parquet(ruta) if ruta.endswith('.parquet') else pd.read_csv(ruta)
+    faltantes = [c for c in COLUMNAS_ENTRADA if c not in columnas]
+    if faltantes:
+        raise ValueError(f"Faltan las columnas {faltantes} en {ruta}.")
+    if 'id' not in columnas:
+        columnas['id'] = np.arange(len(columnas))
+    return columnas.reset_index(drop=True)
+
+def pares_candidatos(x, y, d_max):
+    """Pares (i, j) con i < j de columnas a distancia <= d_max y su distancia, usando un KD-tree."""
+    from scipy.spatial import cKDTree
+    puntos = np.column_stack((x, y))
+    pares = cKDTree(puntos).query_pairs(r=d_max, output_type='ndarray')
+    i, j = pares[:, 0], pares[:, 1]
+    return i, j, np.hypot(*(puntos[j] - puntos[i]).T)
+
+def evaluar_pares(P, q, i, j, d, modelo, tamano_bloque=500_000):
+    """
+    Clasifica y dimensiona los pares candidatos por bloques con `evaluar_bloque`.
+    La capacidad portante de cada par es la menor de sus dos columnas.
+    Retorna un DataFrame con P1, P2, d, q, area, largo, ancho, estado y motivo.
+    """
+    import pandas as pd
+    bloques = []
+    for inicio in range(0, len(i), tamano_bloque):
+        a, b = i[inicio:inicio + tamano_bloque], j[inicio:inicio + tamano_bloque]
+        bloque = pd.DataFrame({'P1': P[a], 'P2': P[b], 'd': d[inicio:inicio + tamano_bloque],
+                               'q': np.minimum(q[a], q[b])})
+        bloques.append(evaluar_bloque(bloque, modelo))
+    if not bloques:
+        return evaluar_bloque(pd.DataFrame(columns=['P1', 'P2', 'd', 'q']), modelo)
+    return pd.concat(bloques, ignore_index=True)
+
+def _se_traslapan(c1, u1, a1, b1, c2, u2, a2, b2):
+    """Prueba de ejes separadores entre dos rectángulos orientados (centro, eje unitario, semilargo, semiancho)."""
+    delta = (c2[0] - c1[0], c2[1] - c1[1])
+    for ex, ey in (u1, (-u1[1], u1[0]), u2, (-u2[1], u2[0])):
+        proyeccion_1 = a1 * abs(u1[0] * ex + u1[1] * ey) + b1 * abs(u1[0] * ey - u1[1] * ex)
+        proyeccion_2 = a2 * abs(u2[0] * ex + u2[1] * ey) + b2 * abs(u2[0] * ey - u2[1] * ex)
+        if abs(delta[0] * ex + delta[1] * ey) >= proyeccion_1 + proyeccion_2:
+            return False
+    return True
+
+def seleccionar_zapatas(i, j, centro_x, centro_y, eje_x, eje_y, largo, ancho, n_columnas, orden):
+    """
+    Selección voraz en el `orden` dado: un par se acepta si ninguna de sus columnas está ya
+    en otra zapata y su rectángulo no traslapa los ya aceptados. Los rectángulos aceptados se
+    guardan en una rejilla de celdas del tamaño del mayor diámetro, de modo que cada prueba
+    solo revisa las 9 celdas vecinas. Retorna los índices aceptados.
+    """
+    usada = bytearray(n_columnas)
+    radio = 0.5 * np.hypot(largo, ancho)
+    celda = 2 * float(radio.max()) if len(radio) else 1.0
+    rejilla = {}
+    elegidos = []
+    i, j = i.tolist(), j.tolist()
+    centro_x, centro_y, eje_x, eje_y = centro_x.tolist(), centro_y.tolist(), eje_x.tolist(), eje_y.tolist()
+    medio_largo, medio_ancho, radio = (0.5 * largo).tolist(), (0.5 * ancho).tolist(), radio.tolist()
+    for k in orden.tolist():
+        if usada[i[k]] or usada[j[k]]:
+            continue
+        c, u = (centro_x[k], centro_y[k]), (eje_x[k], eje_y[k])
+        cx, cy = int(c[0] // celda), int(c[1] // celda)
+        traslapo = False
+        for vecina in ((cx + dx, cy + dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1)):
+            for m in rejilla.get(vecina, ()):
+                if (math.hypot(c[0] - centro_x[m], c[1] - centro_y[m]) < radio[k] + radio[m]
+                        and _se_traslapan(c, u, medio_largo[k], medio_ancho[k],
+                                          (centro_x[m], centro_y[m]), (eje_x[m], eje_y[m]),
+                                          medio_largo[m], medio_ancho[m])):
+                    traslapo = True
+                    break
+            if traslapo:
+                break
+        if traslapo:
+            continue
+        usada[i[k]] = usada[j[k]] = 1
+        rejilla.setdefault((cx, cy), []).append(k)
+        elegidos.append(k)
+    return np.array(elegidos, dtype=np.int64)
+
+def planificar(columnas, modelo, d_max=6.0, q=None):
+    """
+    Planifica las zapatas combinadas de una planta.
+    - columnas: DataFrame con x, y, P (kN), id y, si no se da `q`, la capacidad portante q por columna
+    - d_max: Separación máxima entre columnas de una misma zapata (m)
+    Retorna (zapatas, estadisticas): un DataFrame con una fila por zapata elegida (columnas,
+    cargas, dimensiones, centro y ángulo del eje) y un diccionario de conteos y tiempos.
+    """
+    tiempos = {}
+    x, y, P = (columnas[c].to_numpy(dtype=float) for c in COLUMNAS_ENTRADA)
+    q = np.full(len(columnas), float(q)) if q is not None else columnas['q'].to_numpy(dtype=float)
+
+    inicio = time.perf_counter()
+    with etapa('planificador.pares', filas=len(columnas)):
+        i, j, d = pares_candidatos(x, y, d_max)
+    tiempos['pares_s'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with etapa('planificador.clasificar', filas=len(i)):
+        evaluacion = evaluar_pares(P, q, i, j, d, modelo)
+    tiempos['clasificar_s'] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    with etapa('planificador.seleccionar') as e:
+        adecuados = np.flatnonzero(evaluacion['estado'].to_numpy() == "ADECUADA")
+        e.filas = len(adecuados)
+        ia, ja = i[adecuados], j[adecuados]
+        eje_x, eje_y = (x[ja] - x[ia]) / d[adecuados], (y[ja] - y[ia]) / d[adecuados]
+        centro_x, centro_y = 0.5 * (x[ia] + x[ja]), 0.5 * (y[ia] + y[ja])
+        largo = evaluacion['largo'].to_numpy()[adecuados]
+        ancho = evaluacion['ancho'].to_numpy()[adecuados]
+        # Prioridad: columnas más cercanas primero y, a igual distancia, la zapata de menor área
+        orden = np.lexsort((evaluacion['area'].to_numpy()[adecuados], d[adecuados]))
+        elegidos = seleccionar_zapatas(ia, ja, centro_x, centro_y, eje_x, eje_y, largo, ancho,
+                                       len(columnas), orden)
+    tiempos['seleccionar_s'] = time.perf_counter() - inicio
+
+    filas = adecuados[elegidos]
+    ids = columnas['id'].to_numpy()
+    zapatas = evaluacion.iloc[filas][['P1', 'P2', 'd', 'q', 'area', 'largo', 'ancho']].reset_index(drop=True)
+    zapatas.insert(0, 'columna_a', ids[i[filas]])
+    zapatas.insert(1, 'columna_b', ids[j[filas]])
+    zapatas['centro_x'] = centro_x[elegidos]
+    zapatas['centro_y'] = centro_y[elegidos]
+    zapatas['angulo_grados'] = np.degrees(np.arctan2(eje_y[elegidos], eje_x[elegidos]))
+
+    estadisticas = {
+        'columnas': len(columnas),
+        'pares_candidatos': len(i),
+        'pares_adecuados': len(adecuados),
+        'zapatas': len(zapatas),
+        'columnas_sin_zapata_combinada': len(columnas) - 2 * len(zapatas),
+        **tiempos,
+    }
+    return zapatas, estadisticas
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Planifica zapatas combinadas para todas las columnas de una planta.")
+    parser.add_argument('columnas', nargs='?', help="CSV o Parquet con columnas x, y, P (y opcionalmente id, q)")
+    parser.add_argument('--generar', type=int, metavar='N', help="Usa una planta sintética de N columnas")
+    parser.add_argument('--d-max', type=float, default=6.0, help="Separación máxima entre columnas de una zapata (m)")
+    parser.add_argument('--q', type=float, help="Capacidad portante (kN/m^2) para todas las columnas")
+    parser.add_argument('--salida', default='-', help="CSV de zapatas elegidas; '-' = salida estándar")
+    args = parser.parse_args(argv)
+    if not args.columnas and not args.generar:
+        parser.error("indique un archivo de columnas o --generar N")
+
+    with etapa('planificador.columnas') as e:
+        columnas = generar_columnas(args.generar) if args.generar else leer_columnas(args.columnas)
+        e.filas = len(columnas)
+    if args.q is None and 'q' not in columnas:
+        parser.error("el archivo no tiene la columna q; indique --q")
+    modelo, precision, _ = obtener_modelo()
+    inicio = time.perf_counter()
+    zapatas, estadisticas = planificar(columnas, modelo, args.d_max, args.q)
+    total = time.perf_counter() - inicio
+    zapatas.to_csv(sys.stdout if args.salida == '-' else args.salida, index=False, lineterminator='\n',
+                   float_format='%.3f')  # Milímetros: los centros deben coincidir con las columnas
+    print(f"{estadisticas['columnas']:,} columnas -> {estadisticas['pares_candidatos']:,} pares a menos de "
+          f"{args.d_max} m, {estadisticas['pares_adecuados']:,} adecuados, {estadisticas['zapatas']:,} zapatas "
+          f"elegidas ({estadisticas['columnas_sin_zapata_combinada']:,} columnas sin zapata combinada)", file=sys.stderr)
+    print(f"Tiempo: {total:.2f} s (pares {estadisticas['pares_s']:.2f} s, clasificación "
+          f"{estadisticas['clasificar_s']:.2f} s, selección {estadisticas['seleccionar_s']:.2f} s); "
+          f"precisión del árbol {precision:.2%}", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+import argparse
+import contextlib
+import sys
+import time
+import numpy as np
+#
+#Autor: Oscar Calvo
+# Fecha: Octubre 18/2026
+# Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
+#
+# Lectura por bloques de registros largos de ensayos fuerza-desplazamiento,
+# segmentación en ciclos por cruces ascendentes del desplazamiento por cero y
+# clasificación del daño de cada ciclo con el modelo de histeresisNL.py.
+# Las características de cada ciclo (amplitud máxima y área, como en `calcular_area`)
+# se acumulan en una sola pasada con estado constante entre bloques, de modo que
+# la memoria no depende de la longitud del registro.
+
+class SegmentadorCiclos:
+    """
+    Divide una señal (desplazamiento x, fuerza y) que llega por bloques en ciclos.
+    Un ciclo empieza cuando x pasa de negativo a >= 0. Con `umbral` > 0, x debe haber
+    bajado de -umbral antes de aceptar el siguiente cruce, lo que evita cortes falsos
+    por ruido alrededor de cero.
+    Por cada ciclo completo acumula la suma del cordón de zapato (misma fórmula que
+    `calcular_area`, cerrando el ciclo entre su última y su primera muestra) y el máximo de x.
+    Las muestras anteriores al primer cruce y las del último ciclo sin cerrar se descartan.
+    """
+
+    def __init__(self, umbral=0.0):
+        self.umbral = umbral
+        self.zona = 0            # Última zona conocida: -1 (x < -umbral), 1 (x >= 0), 0 sin definir
+        self.en_ciclo = False    # Si ya se detectó el inicio de un ciclo
+        self.x_ant = self.y_ant = None
+        self.x0 = self.y0 = 0.0  # Primera muestra del ciclo en curso
+        self.suma = 0.0          # Suma parcial del cordón de zapato del ciclo en curso
+        self.maximo = -np.inf    # Máximo parcial de x del ciclo en curso
+        self.inicio = 0          # Índice global de la primera muestra del ciclo en curso
+        self.n_muestras = 0      # Muestras procesadas
+
+    def procesar(self, x, y):
+        """
+        Procesa un bloque de muestras. Retorna un diccionario de arreglos con los ciclos
+        completados en este bloque: 'inicio', 'n_muestras', 'amplitud' y 'area'.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        n = len(x)
+        if n == 0:
+            return _ciclos_vacios()
+
+        # Zonas con la última zona conocida propagada hacia adelante sobre la banda muerta
+        zona = np.where(x >= 0, 1, np.where(x < -self.umbral, -1, 0)).astype(np.int8)
+        posiciones = np.where(zona != 0, np.arange(1, n + 1), 0)
+        np.maximum.accumulate(posiciones, out=posiciones)
+        zona_llena = np.concatenate(([self.zona], zona))[posiciones]
+        zona_previa = np.concatenate(([self.zona], zona_llena[:-1]))
+        inicios = np.flatnonzero((zona_previa == -1) & (zona_llena == 1))
+
+        # Término del cordón de zapato entre cada muestra y la anterior: x_i * y_(i-1) - y_i * x_(i-1)
+        x_prev = np.empty(n)
+        y_prev = np.empty(n)
+        x_prev[1:], y_prev[1:] = x[:-1], y[:-1]
+        if self.x_ant is None:
+            x_prev[0], y_prev[0] = x[0], y[0]  # Sin muestra anterior el término es cero
+        else:
+            x_prev[0], y_prev[0] = self.x_ant, self.y_ant
+        termino = x * y_prev - y * x_prev
+        termino[inicios] = 0.0  # El par que cruza hacia un ciclo nuevo no pertenece a ninguno
+        acumulado = np.concatenate(([0.0], np.cumsum(termino)))
+
+        partes = []
+        if len(inicios):
+            primero = inicios[0]
+            # Ciclo que venía de bloques anteriores y se completa en este
+            if self.en_ciclo:
+                x_fin = x[primero - 1] if primero > 0 else self.x_ant
+                y_fin = y[primero - 1] if primero > 0 else self.y_ant
+                suma = self.suma + acumulado[primero] + self.x0 * y_fin - self.y0 * x_fin
+                maximo = max(self.maximo, x[:primero].max()) if primero > 0 else self.maximo
+                partes.append((np.array([self.inicio]), np.array([self.n_muestras + primero - self.inicio]),
+                               np.array([maximo]), np.array([suma])))
+            # Ciclos que empiezan y terminan dentro del bloque
+            if len(inicios) > 1:
+                a, b = inicios[:-1], inicios[1:]
+                suma = (acumulado[b] - acumulado[a]) + x[a] * y[b - 1] - y[a] * x[b - 1]
+                maximo = np.maximum.reduceat(x, inicios)[:-1]
+                partes.append((self.n_muestras + a, b - a, maximo, suma))
+            # Ciclo que queda abierto al final del bloque
+            ultimo = inicios[-1]
+            self.en_ciclo = True
+            self.inicio = self.n_muestras + ultimo
+            self.x0, self.y0 = x[ultimo], y[ultimo]
+            self.suma = acumulado[n] - acumulado[ultimo]
+            self.maximo = x[ultimo:].max()
+        elif self.en_ciclo:
+            self.suma += acumulado[n]
+            self.maximo = max(self.maximo, x.max())
+
+        self.zona = int(zona_llena[-1])
+        self.x_ant, self.y_ant = x[-1], y[-1]
+        self.n_muestras += n
+
+        if not partes:
+            return _ciclos_vacios()
+        inicio, n_ciclo, amplitud, suma = (np.concatenate(c) for c in zip(*partes))
+        return {'inicio': inicio.astype(np.int64), 'n_muestras': n_ciclo.astype(np.int64),
+                'amplitud': amplitud, 'area': 0.5 * np.abs(suma)}
+
+def _ciclos_vacios():
+    return {'inicio': np.empty(0, dtype=np.int64), 'n_muestras': np.empty(0, dtype=np.int64),
+            'amplitud': np.empty(0), 'area': np.empty(0)}
+
+def leer_registro(ruta, tamano_bloque=1_000_000, dtype='float64', columnas=(0, 1)):
+    """
+    Lee un registro fuerza-desplazamiento por bloques y produce tuplas (x, y).
+    - .npy: arreglo (n x 2 o más columnas), abierto como memmap
+    - .csv: texto con encabezado; `columnas` indica las columnas de desplazamiento y fuerza
+    - otro: binario sin encabezado con pares intercalados (x, y) del tipo `dtype`, abierto como memmap
+    Los bloques de los memmap son vistas: el sistema operativo carga solo las páginas leídas.
+    """
+    col_x, col_y = columnas
+    if ruta.endswith('.csv'):
+        import pandas as pd
+        for bloque in pd.read_csv(ruta, usecols=[col_x, col_y] if isinstance(col_x, str) else None,
+                                  chunksize=tamano_bloque):
+            datos = bloque[[col_x, col_y]] if isinstance(col_x, str) else bloque.iloc[:, [col_x, col_y]]
+            yield datos.iloc[:, 0].to_numpy(np.float64), datos.iloc[:, 1].to_numpy(np.float64)
+        return
+    if ruta.endswith('.npy'):
+        datos = np.load(ruta, mmap_mode='r')
+    else:
+        datos = np.memmap(ruta, dtype=dtype, mode='r').reshape(-1, 2)
+    for inicio in range(0, len(datos), tamano_bloque):
+        bloque = datos[inicio:inicio + tamano_bloque]
+        yield bloque[:, col_x], bloque[:, col_y]
+
+def clasificar_registro(bloques, ia_clasificador, scaler, umbral=0.0, tamano_lote=10_000):
+    """
+    Segmenta los bloques (x, y) en ciclos y clasifica sus características en lotes de
+    hasta `tamano_lote` ciclos. Produce un diccionario de arreglos por lote, con la
+    columna adicional 'nivel' (Seguro / Daño Dúctil / Daño Severo).
+    """
+    segmentador = SegmentadorCiclos(umbral)
+    pendientes = []
+    n_pendientes = 0
+    for x, y in bloques:
+        ciclos = segmentador.procesar(x, y)
+        if len(ciclos['inicio']):
+            pendientes.append(ciclos)
+            n_pendientes += len(ciclos['inicio'])
+        if n_pendientes >= tamano_lote:
+            yield _clasificar(pendientes, ia_clasificador, scaler)
+            pendientes, n_pendientes = [], 0
+    if pendientes:
+        yield _clasificar(pendientes, ia_clasificador, scaler)
+
+def _clasificar(pendientes, ia_clasificador, scaler):
+    lote = {c: np.concatenate([p[c] for p in pendientes]) for c in pendientes[0]}
+    caracteristicas = np.column_stack((lote['amplitud'], lote['area']))
+    lote['nivel'] = ia_clasificador.predict(scaler.transform(caracteristicas))
+    return lote
+
+def generar_registro_prueba(ruta, n_ciclos, tamano_bloque=10_000, semilla=0):
+    """
+    Escribe un registro binario float64 (x, y intercalados) con ciclos sintéticos de los tres
+    niveles de `histeresisNL.NIVELES`, en el orden de los niveles. Sirve para probar la lectura.
+    Retorna las etiquetas reales de cada ciclo.
+    """
+    from histeresisNL import NIVELES, generar_ciclos
+    rng = np.random.default_rng(semilla)
+    niveles = rng.integers(0, len(NIVELES), n_ciclos)
+    with open(ruta, 'wb') as archivo:
+        for inicio in range(0, n_ciclos, tamano_bloque):
+            bloque = niveles[inicio:inicio + tamano_bloque]
+            rangos = [NIVELES[i] for i in bloque]
+            x, y = generar_ciclos([rng.uniform(*r[1]) for r in rangos], [rng.uniform(*r[2]) for r in rangos],
+                                  [rng.uniform(*r[3]) for r in rangos], [r[4] for r in rangos], rng=rng)
+            np.stack((x.ravel(), y.ravel()), axis=1).tofile(archivo)
+    return np.array([NIVELES[i][0] for i in niveles])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Segmenta y clasifica los ciclos de un registro fuerza-desplazamiento.")
+    parser.add_argument('registro', help="Archivo .npy, .csv o binario con pares (desplazamiento, fuerza)")
+    parser.add_argument('--salida', default='-', help="CSV de ciclos clasificados; '-' = salida estándar")
+    parser.add_argument('--dtype', default='float64', help="Tipo de dato del binario (float64 o float32)")
+    parser.add_argument('--columnas', nargs=2, default=['0', '1'], metavar=('X', 'Y'),
+                        help="Columnas de desplazamiento y fuerza (índices o nombres en CSV)")
+    parser.add_argument('--umbral', type=float, default=0.0, help="Banda muerta para los cruces por cero")
+    parser.add_argument('--tamano-bloque', type=int, default=1_000_000, help="Muestras por bloque de lectura")
+    parser.add_argument('--generar-prueba', type=int, metavar='N_CICLOS',
+                        help="Escribe primero un registro binario sintético de N_CICLOS ciclos en REGISTRO")
+    args = parser.parse_args()
+
+    from histeresisNL import obtener_modelo
+    # Si el CSV va a la salida estándar, los mensajes del entrenamiento van a stderr para no corromperlo
+    with contextlib.redirect_stdout(sys.stderr if args.salida == '-' else sys.stdout):
+        (ia_clasificador, scaler), _ = obtener_modelo()
+    if args.generar_prueba:
+        generar_registro_prueba(args.registro, args.generar_prueba)
+
+    columnas = tuple(int(c) if c.isdigit() else c for c in args.columnas)
+    salida = sys.stdout if args.salida == '-' else open(args.salida, 'w', encoding='utf-8')
+    inicio = time.perf_counter()
+    n_ciclos = 0
+    conteo = {}
+    try:
+        salida.write("inicio,n_muestras,amplitud,area,nivel\n")
+        bloques = leer_registro(args.registro, args.tamano_bloque, args.dtype, columnas)
+        for lote in clasificar_registro(bloques, ia_clasificador, scaler, umbral=args.umbral):
+            for fila in zip(lote['inicio'], lote['n_muestras'], lote['amplitud'], lote['area'], lote['nivel']):
+                salida.write("%d,%d,%.6g,%.6g,%s\n" % fila)
+            for nivel, cantidad in zip(*np.unique(lote['nivel'], return_counts=True)):
+                conteo[str(nivel)] = conteo.get(str(nivel), 0) + int(cantidad)
+            n_ciclos += len(lote['inicio'])
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+    segundos = time.perf_counter() - inicio
+    print(f"{n_ciclos} ciclos clasificados en {segundos:.2f} s: {conteo}", file=sys.stderr)
\ No newline at end of file
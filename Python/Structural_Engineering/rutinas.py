@@ -0,0 +1,91 @@
+import argparse
+import importlib
+import os
+import subprocess
+import sys
+import time
+#
+#Autor: Oscar Calvo
+# Fecha: Octubre 18/2026
+# Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
+#
+# Punto de entrada único para los scripts de ingeniería estructural:
+#   python rutinas.py footing [opciones]       -> CombinedFootML.py
+#   python rutinas.py footing-plan [opciones]  -> planificador_zapatas.py
+#   python rutinas.py pushover [opciones]      -> PushOverML.py
+#   python rutinas.py hysteresis [opciones]    -> histeresisNL.py
+#   python rutinas.py bouc-wen [opciones]      -> bouc_wen.py
+#   python rutinas.py beam-damage [opciones]   -> structural_damage_classifier_with_plot2.py
+#   python rutinas.py benchmark [opciones]     -> benchmarks.py
+# Las opciones después del subcomando se pasan al `main` del script (`rutinas.py footing --help`
+# muestra las suyas). Este archivo solo importa la biblioteca estándar y el script elegido se
+# importa después de leer los argumentos, así que `--help` no carga numpy, pandas, scikit-learn
+# ni matplotlib. `python rutinas.py arranque` mide el tiempo de arranque frente al presupuesto.
+# `--perfil traza.ndjson` activa el perfilador por etapas (ver perfilador.py) para el comando.
+
+SUBCOMANDOS = {
+    'footing': ('CombinedFootML', "Clasificador y dimensionamiento de zapatas combinadas"),
+    'footing-plan': ('planificador_zapatas', "Planificación de zapatas combinadas para toda una planta"),
+    'pushover': ('PushOverML', "Análisis Pushover con predicción por red neuronal"),
+    'hysteresis': ('histeresisNL', "Clasificación del daño a partir de ciclos de histéresis"),
+    'bouc-wen': ('bouc_wen', "Osciladores de Bouc-Wen por lotes (ciclos, registros sísmicos, benchmark)"),
+    'beam-damage': ('structural_damage_classifier_with_plot2', "Clasificador de daños en vigas de concreto"),
+    'benchmark': ('benchmarks', "Benchmarks de tiempo y memoria, con comparación entre commits"),
+}
+
+# Presupuesto de arranque (ms) de `rutinas.py --help`, medido como proceso nuevo
+PRESUPUESTO_MS = 100
+
+def _tiempo_proceso(argumentos, repeticiones):
+    """Mediana (ms) del tiempo de pared de `python argumentos...` en un proceso nuevo."""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, *argumentos], stdout=subprocess.DEVNULL, check=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+        tiempos.append((time.perf_counter() - inicio) * 1e3)
+    return sorted(tiempos)[len(tiempos) // 2]
+
+def medir_arranque(repeticiones=11, presupuesto_ms=PRESUPUESTO_MS):
+    """
+    Mide la mediana del arranque de `rutinas.py --help`, del intérprete vacío (referencia) y de
+    la importación de cada script. Retorna (resultados {nombre: ms}, cumple_presupuesto).
+    """
+    resultados = {
+        'python -c pass': _tiempo_proceso(['-c', 'pass'], repeticiones),
+        'rutinas.py --help': _tiempo_proceso([os.path.basename(__file__), '--help'], repeticiones),
+    }
+    for modulo, _ in SUBCOMANDOS.values():
+        resultados[f'import {modulo}'] = _tiempo_proceso(['-c', f'import {modulo}'], repeticiones)
+    return resultados, resultados['rutinas.py --help'] <= presupuesto_ms
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='rutinas', description="Rutinas de ingeniería estructural con Machine Learning.")
+    parser.add_argument('--perfil', metavar='TRAZA', help="Escribe una traza NDJSON por etapa ('-' = salida de error)")
+    parser.add_argument('--perfil-cprofile', metavar='ETAPA', help="Guarda además ETAPA.prof con cProfile")
+    parser.add_argument('--perfil-sin-memoria', action='store_true', help="No mide memoria (evita el costo de tracemalloc)")
+    subparsers = parser.add_subparsers(dest='comando', required=True, metavar='COMANDO')
+    for nombre, (_, ayuda) in SUBCOMANDOS.items():
+        subparsers.add_parser(nombre, help=ayuda, add_help=False)
+    p_arranque = subparsers.add_parser('arranque', help=f"Mide el tiempo de arranque (presupuesto {PRESUPUESTO_MS} ms)")
+    p_arranque.add_argument('--repeticiones', type=int, default=11)
+    p_arranque.add_argument('--presupuesto-ms', type=float, default=PRESUPUESTO_MS)
+    args, resto = parser.parse_known_args(argv)
+
+    if args.comando == 'arranque':
+        if resto:
+            parser.error(f"argumentos no reconocidos: {' '.join(resto)}")
+        resultados, cumple = medir_arranque(args.repeticiones, args.presupuesto_ms)
+        for nombre, ms in resultados.items():
+            print(f"{nombre:<55}{ms:8.1f} ms")
+        print(f"\nPresupuesto de `rutinas.py --help`: {args.presupuesto_ms:.0f} ms -> {'CUMPLE' if cumple else 'EXCEDIDO'}")
+        return 0 if cumple else 1
+
+    if args.perfil:
+        import perfilador
+        perfilador.activar(args.perfil, args.perfil_cprofile, memoria=not args.perfil_sin_memoria)
+    modulo = importlib.import_module(SUBCOMANDOS[args.comando][0])
+    return modulo.main(resto)
+
+if __name__ == "__main__":
+    sys.exit(main())
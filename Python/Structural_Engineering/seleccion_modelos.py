@@ -0,0 +1,184 @@
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+#
+#Autor: Oscar Calvo
+# Fecha: Octubre 18/2026
+# Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
+#
+# Selección de hiperparámetros por validación cruzada k-fold para los árboles de decisión
+# de CombinedFootML.py (zapatas) y structural_damage_classifier_with_plot2.py (vigas).
+# Cada tarea del pool es un par (combinación de la rejilla, pliegue). Las características
+# (float32, el tipo con que scikit-learn entrena los árboles), las etiquetas y el pliegue de
+# cada fila se calculan una sola vez y se publican en memoria compartida; los procesos solo
+# reciben sus nombres, no copias de los datos, de modo que el costo por tarea es el ajuste.
+
+REJILLA = {
+    'max_depth': [3, 5, 8, 12, None],
+    'min_samples_leaf': [1, 10, 100],
+    'class_weight': [None, 'balanced'],
+}
+
+def asignar_pliegues(y, k=5, semilla=42):
+    """Pliegue (0..k-1) de cada fila, estratificado por clase: filas barajadas, ordenadas por clase y repartidas en turno."""
+    orden = np.random.default_rng(semilla).permutation(len(y))
+    orden = orden[np.argsort(y[orden], kind='stable')]
+    pliegues = np.empty(len(y), dtype=np.int8)
+    pliegues[orden] = np.arange(len(y)) % k
+    return pliegues
+
+def combinaciones(rejilla=REJILLA):
+    """Lista de diccionarios con todas las combinaciones de la rejilla."""
+    return [dict(zip(rejilla, valores)) for valores in itertools.product(*rejilla.values())]
+
+class DatosCompartidos:
+    """
+    Publica arreglos NumPy en bloques de memoria compartida. `descripcion` (nombres, formas
+    y tipos) es lo único que se envía a los procesos, que los abren con `abrir`.
+    """
+
+    def __init__(self, **arreglos):
+        self.bloques = {}
+        self.descripcion = {}
+        for nombre, arreglo in arreglos.items():
+            bloque = shared_memory.SharedMemory(create=True, size=max(arreglo.nbytes, 1))
+            np.ndarray(arreglo.shape, arreglo.dtype, buffer=bloque.buf)[...] = arreglo
+            self.bloques[nombre] = bloque
+            self.descripcion[nombre] = (bloque.name, arreglo.shape, arreglo.dtype.str)
+
+    def cerrar(self):
+        for bloque in self.bloques.values():
+            bloque.close()
+            bloque.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+_DATOS = {}
+_BLOQUES = []
+
+def abrir(descripcion):
+    """Inicializador de cada proceso: vistas NumPy sobre la memoria compartida (sin copiar)."""
+    for nombre, (nombre_bloque, forma, tipo) in descripcion.items():
+        bloque = shared_memory.SharedMemory(name=nombre_bloque)
+        _BLOQUES.append(bloque)  # Mantiene el bloque abierto mientras viva el proceso
+        _DATOS[nombre] = np.ndarray(forma, np.dtype(tipo), buffer=bloque.buf)
+
+def _evaluar(tarea):
+    """Ajusta un árbol con los parámetros en los pliegues != pliegue y retorna (índice, pliegue, precisión, segundos)."""
+    from sklearn.tree import DecisionTreeClassifier
+    indice, parametros, pliegue = tarea
+    X, y, pliegues = _DATOS['X'], _DATOS['y'], _DATOS['pliegues']
+    prueba = pliegues == pliegue
+    inicio = time.perf_counter()
+    modelo = DecisionTreeClassifier(random_state=42, **parametros).fit(X[~prueba], y[~prueba])
+    precision = float(np.mean(modelo.predict(X[prueba]) == y[prueba]))
+    return indice, pliegue, precision, time.perf_counter() - inicio
+
+def validacion_cruzada(X, y, rejilla=REJILLA, k=5, n_procesos=None, semilla=42):
+    """
+    Evalúa todas las combinaciones de `rejilla` con validación cruzada estratificada de k pliegues.
+    Retorna una lista de diccionarios (parámetros, precisión media y desviación, tiempo de ajuste)
+    ordenada de mejor a peor. Con n_procesos=1 se ejecuta en el proceso actual.
+    """
+    n_procesos = n_procesos or os.cpu_count()
+    X = np.ascontiguousarray(X, dtype=np.float32)
+    y = np.asarray(y)
+    candidatos = combinaciones(rejilla)
+    tareas = [(i, parametros, f) for i, parametros in enumerate(candidatos) for f in range(k)]
+    precisiones = np.zeros((len(candidatos), k))
+    segundos = np.zeros((len(candidatos), k))
+
+    with DatosCompartidos(X=X, y=y, pliegues=asignar_pliegues(y, k, semilla)) as compartidos:
+        if n_procesos == 1:
+            abrir(compartidos.descripcion)
+            resultados = map(_evaluar, tareas)
+        else:
+            pool = ProcessPoolExecutor(n_procesos, initializer=abrir, initargs=(compartidos.descripcion,))
+            # Las tareas más costosas (árboles profundos, hojas pequeñas) primero, para equilibrar la carga
+            orden = sorted(tareas, key=lambda t: (t[1]['max_depth'] is None, t[1]['max_depth'] or 0,
+                                                  -t[1]['min_samples_leaf']), reverse=True)
+            resultados = pool.map(_evaluar, orden)
+        try:
+            for i, f, precision, tiempo in resultados:
+                precisiones[i, f] = precision
+                segundos[i, f] = tiempo
+        finally:
+            if n_procesos == 1:
+                _DATOS.clear()
+                for bloque in _BLOQUES:
+                    bloque.close()
+                _BLOQUES.clear()
+            else:
+                pool.shutdown()
+
+    tabla = [{'parametros': parametros, 'precision_media': precisiones[i].mean(),
+              'precision_std': precisiones[i].std(), 'segundos_ajuste': segundos[i].sum()}
+             for i, parametros in enumerate(candidatos)]
+    # A igual precisión se prefiere el árbol más simple (menos profundo, hojas más grandes)
+    tabla.sort(key=lambda r: (-round(r['precision_media'], 6), r['parametros']['max_depth'] or np.inf,
+                              -r['parametros']['min_samples_leaf']))
+    return tabla
+
+def seleccionar_modelo(X, y, columnas=None, **kwargs):
+    """Ejecuta la validación cruzada y reentrena la mejor combinación con todos los datos. Retorna (modelo, tabla)."""
+    import pandas as pd
+    from sklearn.tree import DecisionTreeClassifier
+    tabla = validacion_cruzada(X, y, **kwargs)
+    modelo = DecisionTreeClassifier(random_state=42, **tabla[0]['parametros'])
+    modelo.fit(pd.DataFrame(X, columns=columnas) if columnas is not None else X, y)
+    return modelo, tabla
+
+def cargar_datos(problema, n_muestras):
+    """Datos sintéticos del problema ('zapatas' o 'vigas'). Retorna (X, y, columnas)."""
+    if problema == 'zapatas':
+        from CombinedFootML import COLUMNAS, generar_datos_entrenamiento
+        X, y = generar_datos_entrenamiento(n_muestras, n_procesos=os.cpu_count())
+        return X[COLUMNAS].to_numpy(), y, COLUMNAS
+    from structural_damage_classifier_with_plot2 import FEATURES, generate_synthetic_data
+    data = generate_synthetic_data(n_muestras)
+    return data[FEATURES].to_numpy(), data['is_damaged'].to_numpy(), FEATURES
+
+def _texto_parametros(p):
+    return f"max_depth={p['max_depth']}, min_samples_leaf={p['min_samples_leaf']}, class_weight={p['class_weight']}"
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Selección de hiperparámetros por validación cruzada de los árboles de decisión.")
+    parser.add_argument('problema', choices=['zapatas', 'vigas'])
+    parser.add_argument('--n-muestras', type=int, default=100_000)
+    parser.add_argument('--pliegues', type=int, default=5)
+    parser.add_argument('--n-procesos', type=int, default=None, help="Procesos del pool (por defecto, todos los núcleos)")
+    parser.add_argument('--mostrar', type=int, default=10, help="Combinaciones a mostrar")
+    parser.add_argument('--escalamiento', action='store_true',
+                        help="Repite la selección con 1, 2, 4, ... procesos y reporta la aceleración")
+    args = parser.parse_args()
+
+    X, y, columnas = cargar_datos(args.problema, args.n_muestras)
+    print(f"{args.problema}: {len(y):,} muestras, {len(combinaciones())} combinaciones x {args.pliegues} pliegues")
+
+    if args.escalamiento:
+        procesos = [2 ** i for i in range(int(np.log2(os.cpu_count())) + 1)]
+        base = None
+        for n in procesos:
+            inicio = time.perf_counter()
+            validacion_cruzada(X, y, k=args.pliegues, n_procesos=n)
+            segundos = time.perf_counter() - inicio
+            base = base or segundos
+            print(f"  {n:>3} procesos: {segundos:8.2f} s  (aceleración {base / segundos:.2f}x)")
+    else:
+        inicio = time.perf_counter()
+        modelo, tabla = seleccionar_modelo(X, y, columnas, k=args.pliegues, n_procesos=args.n_procesos)
+        print(f"Tiempo total: {time.perf_counter() - inicio:.2f} s\n")
+        print(f"{'Precisión':>10} {'± std':>8} {'Ajuste (s)':>11}  Parámetros")
+        for r in tabla[:args.mostrar]:
+            print(f"{r['precision_media']:>10.2%} {r['precision_std']:>8.2%} {r['segundos_ajuste']:>11.2f}  "
+                  f"{_texto_parametros(r['parametros'])}")
+        print(f"\nModelo elegido: DecisionTreeClassifier({_texto_parametros(tabla[0]['parametros'])}), "
+              f"{modelo.get_n_leaves()} hojas, profundidad {modelo.get_depth()}")
@@ -0,0 +1,233 @@
+import argparse
+import asyncio
+import json
+import math
+import sys
+import time
+from collections import deque
+import numpy as np
+#
+#Autor: Oscar Calvo
+# Fecha: Octubre 18/2026
+# Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
+#
+# Servicio local (asyncio) de puntuación del clasificador de daños en vigas
+# (structural_damage_classifier_with_plot2.py). Las lecturas que llegan de forma continua
+# se agrupan en micro-lotes limitados por tamaño (`lote_max`) y por tiempo de espera
+# (`espera_max_ms`), y cada micro-lote se evalúa con una sola llamada vectorizada a
+# `dt_classifier.predict`. Subir `espera_max_ms` y `lote_max` aumenta el rendimiento
+# a costa de latencia; bajarlos hace lo contrario.
+#
+# Protocolo TCP: una línea JSON por solicitud, {"id": ..., "strain": ..., "vibration": ..., "load": ...},
+# y una línea JSON por respuesta, {"id": ..., "is_damaged": 0/1, "estado": "Dañada"/"No dañada"}.
+# La línea {"comando": "estadisticas"} retorna los contadores del servicio.
+
+FEATURES = ['strain', 'vibration', 'load']
+
+class ServicioPuntuacion:
+    """
+    Agrupa solicitudes en micro-lotes y las evalúa con un solo `predict` por lote.
+    - modelo: Clasificador entrenado con columnas FEATURES
+    - lote_max: Máximo de lecturas por micro-lote
+    - espera_max_ms: Tiempo máximo que la primera lectura de un lote espera a que se llene
+    """
+
+    def __init__(self, modelo, lote_max=256, espera_max_ms=2.0, max_latencias=100_000):
+        self.modelo = modelo
+        self.lote_max = lote_max
+        self.espera_max = espera_max_ms / 1000
+        self.cola = asyncio.Queue()
+        self.latencias = deque(maxlen=max_latencias)
+        self.n_solicitudes = 0
+        self.n_lotes = 0
+        self.inicio = time.perf_counter()
+        self._tarea = None
+
+    def iniciar(self):
+        """Arranca el bucle de micro-lotes en el event loop actual."""
+        if self._tarea is None:
+            self._tarea = asyncio.create_task(self._bucle())
+
+    async def detener(self):
+        if self._tarea is not None:
+            self._tarea.cancel()
+            try:
+                await self._tarea
+            except asyncio.CancelledError:
+                pass
+            self._tarea = None
+
+    async def puntuar(self, strain, vibration, load):
+        """
+        Encola una lectura y espera su predicción (0 = No dañada, 1 = Dañada).
+        Las lecturas no finitas (inf, NaN) se rechazan con ValueError antes de encolarse.
+        """
+        if not all(math.isfinite(v) for v in (strain, vibration, load)):
+            raise ValueError("las lecturas deben ser números finitos")
+        futuro = asyncio.get_running_loop().create_future()
+        self.cola.put_nowait(((strain, vibration, load), futuro, time.perf_counter()))
+        return await futuro
+
+    async def _bucle(self):
+        import pandas as pd
+        loop = asyncio.get_running_loop()
+        while True:
+            pendientes = [await self.cola.get()]
+            limite = loop.time() + self.espera_max
+            while len(pendientes) < self.lote_max:
+                # Primero lo que ya está en cola, sin ceder el control
+                while len(pendientes) < self.lote_max and not self.cola.empty():
+                    pendientes.append(self.cola.get_nowait())
+                restante = limite - loop.time()
+                if len(pendientes) >= self.lote_max or restante <= 0:
+                    break
+                try:
+                    pendientes.append(await asyncio.wait_for(self.cola.get(), restante))
+                except asyncio.TimeoutError:
+                    break
+
+            lecturas = pd.DataFrame([p[0] for p in pendientes], columns=FEATURES)
+            try:
+                predicciones = self.modelo.predict(lecturas)
+            except Exception:
+                # Se reintenta fila por fila para que solo fallen las lecturas culpables
+                predicciones = []
+                for i, (_, futuro, _) in enumerate(pendientes):
+                    try:
+                        predicciones.append(self.modelo.predict(lecturas.iloc[[i]])[0])
+                    except Exception as e:
+                        predicciones.append(None)
+                        if not futuro.done():
+                            futuro.set_exception(e)
+            ahora = time.perf_counter()
+            for (_, futuro, llegada), prediccion in zip(pendientes, predicciones):
+                if prediccion is not None and not futuro.done():
+                    futuro.set_result(int(prediccion))
+                self.latencias.append(ahora - llegada)
+            self.n_solicitudes += len(pendientes)
+            self.n_lotes += 1
+
+    def estadisticas(self):
+        """Rendimiento, profundidad de la cola, tamaño medio de lote y latencias p50/p99 (ms)."""
+        segundos = time.perf_counter() - self.inicio
+        resultado = {
+            'solicitudes': self.n_solicitudes,
+            'lotes': self.n_lotes,
+            'lote_medio': self.n_solicitudes / self.n_lotes if self.n_lotes else 0.0,
+            'en_cola': self.cola.qsize(),
+            'solicitudes_por_segundo': self.n_solicitudes / segundos if segundos > 0 else 0.0,
+            'lote_max': self.lote_max,
+            'espera_max_ms': self.espera_max * 1000,
+        }
+        if self.latencias:
+            p50, p99 = np.percentile(np.array(self.latencias) * 1e3, [50, 99])
+            resultado.update({'latencia_p50_ms': p50, 'latencia_p99_ms': p99})
+        return resultado
+
+    async def atender(self, reader, writer):
+        """Atiende una conexión TCP; las solicitudes de una misma conexión se procesan en paralelo."""
+        tareas = set()
+
+        async def responder(solicitud):
+            try:
+                if solicitud.get('comando') == 'estadisticas':
+                    respuesta = self.estadisticas()
+                else:
+                    prediccion = await self.puntuar(*(float(solicitud[c]) for c in FEATURES))
+                    respuesta = {'id': solicitud.get('id'), 'is_damaged': prediccion,
+                                 'estado': 'Dañada' if prediccion == 1 else 'No dañada'}
+            except (KeyError, TypeError, ValueError) as e:
+                respuesta = {'id': solicitud.get('id'), 'error': f"Solicitud inválida: {e}"}
+            except Exception as e:
+                respuesta = {'id': solicitud.get('id'), 'error': f"Error del modelo: {e}"}
+            writer.write((json.dumps(respuesta, ensure_ascii=False) + '\n').encode('utf-8'))
+
+        try:
+            while linea := await reader.readline():
+                try:
+                    solicitud = json.loads(linea)
+                except json.JSONDecodeError:
+                    writer.write(b'{"error": "JSON invalido"}\n')
+                    continue
+                if not isinstance(solicitud, dict):
+                    writer.write(b'{"error": "Se esperaba un objeto JSON"}\n')
+                    continue
+                tarea = asyncio.create_task(responder(solicitud))
+                tareas.add(tarea)
+                tarea.add_done_callback(tareas.discard)
+                if writer.transport.get_write_buffer_size() > 2**20:
+                    await writer.drain()
+            if tareas:
+                await asyncio.gather(*tareas)
+            await writer.drain()
+        except ConnectionResetError:
+            pass
+        finally:
+            writer.close()
+
+def _imprimir_estadisticas(e):
+    texto = (f"{e['solicitudes_por_segundo']:,.0f} solicitudes/s | {e['lotes']} lotes "
+             f"(medio {e['lote_medio']:.1f}) | en cola {e['en_cola']}")
+    if 'latencia_p50_ms' in e:
+        texto += f" | latencia p50 {e['latencia_p50_ms']:.2f} ms, p99 {e['latencia_p99_ms']:.2f} ms"
+    print(texto, file=sys.stderr)
+
+async def servir(servicio, host='127.0.0.1', puerto=8766, intervalo=5.0):
+    """Atiende conexiones TCP y reporta estadísticas cada `intervalo` s."""
+    servicio.iniciar()
+    servidor = await asyncio.start_server(servicio.atender, host, puerto)
+    print(f"Servicio de vigas escuchando en {host}:{puerto} "
+          f"(lote_max={servicio.lote_max}, espera_max={servicio.espera_max * 1000:.1f} ms)", file=sys.stderr)
+    async with servidor:
+        while True:
+            await asyncio.sleep(intervalo)
+            _imprimir_estadisticas(servicio.estadisticas())
+
+async def generar_carga(servicio, n_clientes=1000, solicitudes_por_cliente=50, semilla=0):
+    """
+    Simula `n_clientes` vigas que envían lecturas sin pausa (cada una espera su respuesta
+    antes de enviar la siguiente) y retorna las estadísticas del servicio.
+    """
+    rng = np.random.default_rng(semilla)
+    lecturas = np.column_stack((rng.uniform(0.0001, 0.01, n_clientes * solicitudes_por_cliente),
+                                rng.uniform(0.1, 10.0, n_clientes * solicitudes_por_cliente),
+                                rng.uniform(50, 500, n_clientes * solicitudes_por_cliente)))
+
+    async def cliente(i):
+        for fila in lecturas[i * solicitudes_por_cliente:(i + 1) * solicitudes_por_cliente]:
+            await servicio.puntuar(*fila)
+
+    servicio.iniciar()
+    servicio.inicio = time.perf_counter()
+    await asyncio.gather(*(cliente(i) for i in range(n_clientes)))
+    estadisticas = servicio.estadisticas()
+    await servicio.detener()
+    return estadisticas
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servicio de puntuación por micro-lotes del clasificador de vigas.")
+    parser.add_argument('--lote-max', type=int, default=256, help="Máximo de lecturas por micro-lote")
+    parser.add_argument('--espera-ms', type=float, default=2.0,
+                        help="Espera máxima para llenar un micro-lote (más espera = más rendimiento y más latencia)")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    p_servir = subparsers.add_parser('servir', help="Atiende solicitudes JSON por TCP")
+    p_servir.add_argument('--host', default='127.0.0.1')
+    p_servir.add_argument('--puerto', type=int, default=8766)
+    p_servir.add_argument('--intervalo', type=float, default=5.0, help="Segundos entre reportes de estadísticas")
+
+    p_carga = subparsers.add_parser('carga', help="Prueba de carga local, sin red")
+    p_carga.add_argument('--clientes', type=int, default=1000)
+    p_carga.add_argument('--solicitudes', type=int, default=50, help="Solicitudes por cliente")
+    args = parser.parse_args()
+
+    from structural_damage_classifier_with_plot2 import get_model
+    dt_classifier, _ = get_model()
+    servicio = ServicioPuntuacion(dt_classifier, lote_max=args.lote_max, espera_max_ms=args.espera_ms)
+    if args.comando == 'servir':
+        try:
+            asyncio.run(servir(servicio, args.host, args.puerto, args.intervalo))
+        except KeyboardInterrupt:
+            pass
+    else:
+        _imprimir_estadisticas(asyncio.run(generar_carga(servicio, args.clientes, args.solicitudes)))
\ No newline at end of file
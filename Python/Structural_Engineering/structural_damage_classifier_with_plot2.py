@@ -1,41 +1,33 @@
-import numpy as np
-import pandas as pd
-from sklearn.tree import DecisionTreeClassifier
-from sklearn.model_selection import train_test_split
-from sklearn.metrics import accuracy_score
-import matplotlib.pyplot as plt
+import argparse
+import sys
 import warnings
+import numpy as np
+from cache_modelos import obtener_o_entrenar
+from perfilador import etapa
 #
 #Autor: Oscar Calvo
 # Fecha: Junio 20/2025
 # Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
 #
-# Suprimir warnings de Matplotlib
-warnings.filterwarnings("ignore", category=UserWarning)
-
-# Instrucciones para el usuario
-print("""
-=== Clasificador de Daños Estructurales en Vigas ===
-Este programa usa un árbol de decisión para determinar si una viga de concreto está dañada
-basándose en datos de sensores: deformación (mm/mm), vibración (Hz) y carga (kN).
-Se generan datos sintéticos, pero puede adaptarse a datos reales (ver instrucciones finales).
-Ejecute el código y revise los resultados en la consola y la gráfica generada.
-""")
+# pandas, scikit-learn y matplotlib se importan solo en las funciones que los usan.
 
 # Función para generar datos sintéticos optimizada
-def generate_synthetic_data(n_samples=1000):
+def generate_synthetic_data(n_samples=1000, seed=42):
     """
     Genera datos simulados de sensores para vigas de concreto.
     - strain: Deformación en mm/mm (0.0001 a 0.01)
     - vibration: Frecuencia de vibración en Hz (0.1 a 10.0)
     - load: Carga aplicada en kN (50 a 500)
     - is_damaged: 1 si strain > 0.005 y load > 300, 0 si no (con ruido aleatorio)
+    La semilla fija los datos, lo que permite reutilizar el modelo guardado en la caché.
     """
-    strain = np.random.uniform(0.0001, 0.01, n_samples)
-    vibration = np.random.uniform(0.1, 10.0, n_samples)
-    load = np.random.uniform(50, 500, n_samples)
+    import pandas as pd
+    rng = np.random.default_rng(seed)
+    strain = rng.uniform(0.0001, 0.01, n_samples)
+    vibration = rng.uniform(0.1, 10.0, n_samples)
+    load = rng.uniform(50, 500, n_samples)
     is_damaged = ((strain > 0.005) & (load > 300)).astype(int)  # Regla base
-    is_damaged = np.where(np.random.random(n_samples) > 0.1, is_damaged, 1 - is_damaged)  # 10% de ruido
+    is_damaged = np.where(rng.random(n_samples) > 0.1, is_damaged, 1 - is_damaged)  # 10% de ruido
     return pd.DataFrame({
         'strain': strain,
         'vibration': vibration,
@@ -43,70 +35,140 @@ def generate_synthetic_data(n_samples=1000):
         'is_damaged': is_damaged
     })
 
-# Generar datos
-print("Generando datos sintéticos de sensores...")
-data = generate_synthetic_data()
-
-# Preparar datos para el modelo
-X_features = data[['strain', 'vibration', 'load']]  # Características
-y_labels = data['is_damaged']  # Etiquetas
-
-# Dividir datos en entrenamiento (80%) y prueba (20%)
-X_train, X_test, y_train, y_test = train_test_split(X_features, y_labels, test_size=0.2, random_state=42)
-
-# Entrenar el modelo de árbol de decisión
-print("Entrenando el modelo de árbol de decisión...")
-dt_classifier = DecisionTreeClassifier(max_depth=5, random_state=42)
-dt_classifier.fit(X_train, y_train)
-
-# Evaluar la precisión del modelo
-y_pred = dt_classifier.predict(X_test)
-accuracy = accuracy_score(y_test, y_pred)
-print(f"\nPrecisión del modelo en datos de prueba: {accuracy:.2%}")
-print("Esto indica qué tan bien el modelo clasifica vigas dañadas vs. no dañadas.\n")
-
-# Probar con ejemplos de vigas
-test_beams = pd.DataFrame([
-    [0.006, 5.0, 350],  # Alta deformación y carga
-    [0.002, 4.0, 200],  # Bajas deformación y carga
-    [0.007, 6.0, 250],  # Alta deformación, baja carga
-    [0.008, 3.0, 400],  # Alta deformación y carga
-], columns=['strain', 'vibration', 'load'])
-
-# Realizar predicciones
-print("Predicciones para vigas de prueba:")
-predictions = dt_classifier.predict(test_beams)
-results = test_beams.copy()
-results['Estado'] = ['Dañada' if pred == 1 else 'No dañada' for pred in predictions]
-results.columns = ['Deformación (mm/mm)', 'Vibración (Hz)', 'Carga (kN)', 'Estado']
-
-# Mostrar resultados
-print("\nResultados de las vigas de prueba:")
-print(results.to_string(index=False, formatters={
-    'Deformación (mm/mm)': '{:.4f}'.format,
-    'Vibración (Hz)': '{:.1f}'.format,
-    'Carga (kN)': '{:.0f}'.format
-}))
-
-# Visualización
-print("\nGenerando gráfica de dispersión...")
-plt.figure(figsize=(8, 6))
-colors = ['red' if pred == 1 else 'green' for pred in predictions]
-scatter = plt.scatter(test_beams['strain'], test_beams['load'], c=colors, s=100, alpha=0.7)
-plt.xlabel('Deformación (mm/mm)')
-plt.ylabel('Carga (kN)')
-plt.title('Clasificación de Vigas: Dañada (Rojo) vs. No Dañada (Verde)')
-plt.grid(True)
-# Ajuste para evitar warnings en la leyenda
-plt.legend(['Dañada', 'No dañada'], loc='best')
-plt.show()
-
-# Instrucciones finales
-print("""
+# Características y parámetros de los datos con los que se entrena el modelo
+FEATURES = ['strain', 'vibration', 'load']
+DATA_PARAMETERS = {'n_samples': 1000, 'seed': 42}
+
+# Entrenar el modelo de árbol de decisión (o cargarlo de la caché si ya se entrenó con los mismos datos)
+HYPERPARAMETERS = {'max_depth': 5, 'random_state': 42}
+
+def train_model(X_train, y_train):
+    """Entrena el árbol de decisión con los hiperparámetros de HYPERPARAMETERS."""
+    from sklearn.tree import DecisionTreeClassifier
+    print("Entrenando el modelo de árbol de decisión...")
+    dt_classifier = DecisionTreeClassifier(**HYPERPARAMETERS)
+    with etapa('vigas.fit', filas=len(X_train)):
+        dt_classifier.fit(X_train, y_train)
+    return dt_classifier
+
+def get_model(X_train=None, y_train=None, data_parameters=DATA_PARAMETERS):
+    """
+    Retorna (dt_classifier, from_cache). X_train, y_train deben ser el 80% de entrenamiento
+    de generate_synthetic_data(**data_parameters) (random_state=42); si se omiten, se generan aquí
+    y solo cuando el modelo no está en la caché.
+    """
+    def train():
+        if X_train is not None:
+            return train_model(X_train, y_train)
+        from sklearn.model_selection import train_test_split
+        data = generate_synthetic_data(**data_parameters)
+        X, _, y, _ = train_test_split(data[FEATURES], data['is_damaged'], test_size=0.2, random_state=42)
+        return train_model(X, y)
+    return obtener_o_entrenar(
+        'vigas', {**data_parameters, 'test_size': 0.2, 'hyperparameters': HYPERPARAMETERS},
+        train, funciones=(generate_synthetic_data, train_model))
+
+def plot_beams(test_beams, predictions, ruta='clasificacion_vigas.png', mostrar=False):
+    """Vigas de prueba coloreadas por estado. Sin `mostrar` solo se guarda en `ruta` (Agg)."""
+    from graficos import pyplot, finalizar
+    plt = pyplot(mostrar)
+    plt.figure(figsize=(8, 6))
+    colors = np.where(np.asarray(predictions) == 1, 'red', 'green')
+    plt.scatter(test_beams['strain'], test_beams['load'], c=colors, s=100, alpha=0.7)
+    plt.xlabel('Deformación (mm/mm)')
+    plt.ylabel('Carga (kN)')
+    plt.title('Clasificación de Vigas: Dañada (Rojo) vs. No Dañada (Verde)')
+    plt.grid(True)
+    # Ajuste para evitar warnings en la leyenda
+    plt.legend(['Dañada', 'No dañada'], loc='best')
+    finalizar(plt, ruta, mostrar)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clasificador de daños estructurales en vigas con árboles de decisión.")
+    parser.add_argument('--grafico', default='clasificacion_vigas.png',
+                        help="Archivo PNG de la gráfica ('' para no graficar)")
+    parser.add_argument('--mostrar', action='store_true', help="Abre además la ventana de la gráfica")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    from sklearn.model_selection import train_test_split
+    from sklearn.metrics import accuracy_score
+    # Suprimir warnings de Matplotlib
+    warnings.filterwarnings("ignore", category=UserWarning)
+
+    # Instrucciones para el usuario
+    print("""
+=== Clasificador de Daños Estructurales en Vigas ===
+Este programa usa un árbol de decisión para determinar si una viga de concreto está dañada
+basándose en datos de sensores: deformación (mm/mm), vibración (Hz) y carga (kN).
+Se generan datos sintéticos, pero puede adaptarse a datos reales (ver instrucciones finales).
+Ejecute el código y revise los resultados en la consola y la gráfica generada.
+""")
+
+    # Generar datos
+    print("Generando datos sintéticos de sensores...")
+    with etapa('vigas.generar_datos', filas=DATA_PARAMETERS['n_samples']):
+        data = generate_synthetic_data(**DATA_PARAMETERS)
+
+    # Preparar datos para el modelo
+    X_features = data[FEATURES]  # Características
+    y_labels = data['is_damaged']  # Etiquetas
+
+    # Dividir datos en entrenamiento (80%) y prueba (20%)
+    X_train, X_test, y_train, y_test = train_test_split(X_features, y_labels, test_size=0.2, random_state=42)
+
+    # Entrenar el modelo de árbol de decisión (o cargarlo de la caché)
+    with etapa('vigas.obtener_modelo'):
+        dt_classifier, from_cache = get_model(X_train, y_train)
+    if from_cache:
+        print("Modelo cargado desde la caché.")
+
+    # Evaluar la precisión del modelo
+    with etapa('vigas.predict', filas=len(X_test)):
+        y_pred = dt_classifier.predict(X_test)
+    accuracy = accuracy_score(y_test, y_pred)
+    print(f"\nPrecisión del modelo en datos de prueba: {accuracy:.2%}")
+    print("Esto indica qué tan bien el modelo clasifica vigas dañadas vs. no dañadas.\n")
+
+    # Probar con ejemplos de vigas
+    test_beams = pd.DataFrame([
+        [0.006, 5.0, 350],  # Alta deformación y carga
+        [0.002, 4.0, 200],  # Bajas deformación y carga
+        [0.007, 6.0, 250],  # Alta deformación, baja carga
+        [0.008, 3.0, 400],  # Alta deformación y carga
+    ], columns=['strain', 'vibration', 'load'])
+
+    # Realizar predicciones
+    print("Predicciones para vigas de prueba:")
+    predictions = dt_classifier.predict(test_beams)
+    results = test_beams.copy()
+    results['Estado'] = ['Dañada' if pred == 1 else 'No dañada' for pred in predictions]
+    results.columns = ['Deformación (mm/mm)', 'Vibración (Hz)', 'Carga (kN)', 'Estado']
+
+    # Mostrar resultados
+    print("\nResultados de las vigas de prueba:")
+    print(results.to_string(index=False, formatters={
+        'Deformación (mm/mm)': '{:.4f}'.format,
+        'Vibración (Hz)': '{:.1f}'.format,
+        'Carga (kN)': '{:.0f}'.format
+    }))
+
+    # Visualización
+    if args.grafico or args.mostrar:
+        print("\nGenerando gráfica de dispersión...")
+        with etapa('vigas.grafico', filas=len(test_beams)):
+            plot_beams(test_beams, predictions, args.grafico or None, args.mostrar)
+
+    # Instrucciones finales
+    print("""
 === Fin del programa ===
 Para usar datos reales, reemplace 'generate_synthetic_data' con un DataFrame de pandas
 conteniendo columnas 'strain', 'vibration', 'load' e 'is_damaged'.
 Instale las bibliotecas con: 'pip install numpy pandas scikit-learn matplotlib'
 Ejecute con Python 3.
 La gráfica muestra las vigas de prueba clasificadas por estado.
-""")
\ No newline at end of file
+""")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,261 @@
+import argparse
+import time
+import tracemalloc
+import numpy as np
+#
+#Autor: Oscar Calvo
+# Fecha: Octubre 18/2026
+# Licencia: Este archivo está bajo la licencia GPL-3.0. Ver LICENSE en el repositorio.
+#
+# Entrenamiento fuera de memoria del clasificador de daños en vigas para archivos históricos
+# de sensores (strain, vibration, load, is_damaged) más grandes que la RAM.
+# El archivo se lee por bloques con tipos compactos (float32 / int8) y la partición
+# entrenamiento/prueba se decide fila a fila con un generador por bloque, sin cargar todo.
+# El árbol se construye por niveles con divisiones sobre histogramas: las características
+# se discretizan en `n_bins` intervalos por cuantiles y, en cada nivel, una pasada por el
+# archivo acumula los conteos por nodo, característica, intervalo y clase. Con profundidad 5
+# son 7 pasadas (cuantiles, 5 niveles y evaluación) y la memoria depende solo del bloque.
+
+FEATURES = ['strain', 'vibration', 'load']
+TIPOS = {'strain': np.float32, 'vibration': np.float32, 'load': np.float32, 'is_damaged': np.int8}
+
+def leer_bloques(ruta, tamano_bloque=500_000):
+    """Lee un archivo CSV o Parquet por bloques con tipos compactos. Produce DataFrames."""
+    if ruta.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        for lote in pq.ParquetFile(ruta).iter_batches(batch_size=tamano_bloque, columns=list(TIPOS)):
+            yield lote.to_pandas().astype(TIPOS)
+    else:
+        import pandas as pd
+        yield from pd.read_csv(ruta, usecols=list(TIPOS), dtype=TIPOS, chunksize=tamano_bloque)
+
+def bloques_particion(ruta, conjunto='entrenamiento', tamano_bloque=500_000, test_size=0.2, semilla=42):
+    """
+    Produce (X, y) por bloque solo con las filas del `conjunto` ('entrenamiento' o 'prueba').
+    Cada bloque usa su propio generador (semilla, número de bloque), de modo que la
+    partición es la misma en todas las pasadas sin guardar índices.
+    """
+    for k, bloque in enumerate(leer_bloques(ruta, tamano_bloque)):
+        prueba = np.random.default_rng([semilla, k]).random(len(bloque)) < test_size
+        mascara = prueba if conjunto == 'prueba' else ~prueba
+        yield bloque[FEATURES].to_numpy()[mascara], bloque['is_damaged'].to_numpy()[mascara]
+
+class ArbolHistograma:
+    """
+    Árbol de decisión (Gini) construido por niveles a partir de histogramas, sin tener
+    los datos en memoria. `ajustar` recibe una función que retorna un iterador nuevo de
+    bloques (X, y) en cada llamada (una por pasada). `predict` acepta DataFrames con las
+    columnas FEATURES o arreglos, igual que DecisionTreeClassifier.
+    """
+
+    def __init__(self, max_depth=5, n_bins=256, min_samples_leaf=1, max_muestra=200_000, semilla=42):
+        self.max_depth = max_depth
+        self.n_bins = n_bins
+        self.min_samples_leaf = min_samples_leaf
+        self.max_muestra = max_muestra
+        self.semilla = semilla
+
+    def _muestra_uniforme(self, bloques):
+        """Muestra uniforme de hasta max_muestra filas (las de menor clave aleatoria) y número de clases."""
+        rng = np.random.default_rng(self.semilla)
+        claves = np.empty(0)
+        muestra = np.empty((0, 0), dtype=np.float32)
+        n_clases = 0
+        for X, y in bloques:
+            n_clases = max(n_clases, int(y.max()) + 1 if len(y) else 0)
+            claves = np.concatenate((claves, rng.random(len(X))))
+            muestra = np.concatenate((muestra.reshape(-1, X.shape[1]), X))
+            if len(claves) > self.max_muestra:
+                conservar = np.argpartition(claves, self.max_muestra)[:self.max_muestra]
+                claves, muestra = claves[conservar], muestra[conservar]
+        return muestra, n_clases
+
+    def _discretizar(self, X):
+        """Código de intervalo (uint8/uint16) de cada valor: número de bordes <= x."""
+        tipo = np.uint8 if self.n_bins <= 256 else np.uint16
+        return [np.searchsorted(bordes, X[:, j], side='right').astype(tipo) for j, bordes in enumerate(self.bordes_)]
+
+    def _nodos(self, X):
+        """Nodo (hoja actual) de cada fila recorriendo el árbol construido hasta ahora."""
+        nodo = np.zeros(len(X), dtype=np.int64)
+        caracteristica = np.asarray(self.caracteristica_)
+        umbral = np.asarray(self.umbral_)
+        izquierdo = np.asarray(self.izquierdo_)
+        derecho = np.asarray(self.derecho_)
+        filas = np.arange(len(X))
+        for _ in range(self.max_depth):
+            f = caracteristica[nodo]
+            interno = f >= 0
+            if not interno.any():
+                break
+            valor = X[filas, np.where(interno, f, 0)]
+            siguiente = np.where(valor < umbral[nodo], izquierdo[nodo], derecho[nodo])
+            nodo = np.where(interno, siguiente, nodo)
+        return nodo
+
+    def ajustar(self, fabrica_bloques):
+        """Construye el árbol. `fabrica_bloques()` debe retornar un iterador nuevo de (X, y) de entrenamiento."""
+        muestra, self.n_clases_ = self._muestra_uniforme(fabrica_bloques())
+        self.n_features_in_ = muestra.shape[1]
+        cuantiles = np.linspace(0, 1, self.n_bins + 1)[1:-1]
+        self.bordes_ = [np.unique(np.quantile(muestra[:, j], cuantiles)).astype(np.float32)
+                        for j in range(self.n_features_in_)]
+        self.classes_ = np.arange(self.n_clases_)
+
+        self.caracteristica_ = [-1]
+        self.umbral_ = [np.inf]
+        self.izquierdo_ = [-1]
+        self.derecho_ = [-1]
+        self.conteos_ = [np.zeros(self.n_clases_)]
+        activos = [0]
+        for _ in range(self.max_depth):
+            if not activos:
+                break
+            histogramas = self._histogramas(fabrica_bloques(), activos)
+            nuevos = []
+            for posicion, nodo in enumerate(activos):
+                nuevos.extend(self._dividir(nodo, histogramas[posicion]))
+            activos = nuevos
+        # Los conteos de las hojas del último nivel ya se guardaron en _dividir, sin otra pasada
+        self.conteos_ = np.array(self.conteos_)
+        return self
+
+    def _histogramas(self, bloques, activos):
+        """Una pasada: conteos (n_activos x n_features x n_bins x n_clases) de las filas en los nodos activos."""
+        indice_activo = np.full(len(self.caracteristica_), -1, dtype=np.int64)
+        indice_activo[activos] = np.arange(len(activos))
+        forma = (len(activos), self.n_features_in_, self.n_bins, self.n_clases_)
+        conteos = np.zeros(int(np.prod(forma)), dtype=np.int64)
+        for X, y in bloques:
+            if not len(X):
+                continue
+            activo = indice_activo[self._nodos(X)]
+            dentro = activo >= 0
+            activo, y_dentro = activo[dentro], y[dentro].astype(np.int64)
+            for j, codigo in enumerate(self._discretizar(X[dentro])):
+                indice = ((activo * self.n_features_in_ + j) * self.n_bins + codigo) * self.n_clases_ + y_dentro
+                conteos += np.bincount(indice, minlength=len(conteos))
+        return conteos.reshape(forma)
+
+    def _dividir(self, nodo, histograma):
+        """Elige la mejor división (Gini) del nodo a partir de su histograma; retorna los hijos creados."""
+        total = histograma[0].sum(axis=0)
+        self.conteos_[nodo] = total
+        n = total.sum()
+        if n < 2 * self.min_samples_leaf or np.count_nonzero(total) < 2:
+            return []
+        gini_padre = n - (total ** 2).sum() / n
+
+        mejor = (0.0, None, None)
+        for j in range(self.n_features_in_):
+            izquierda = np.cumsum(histograma[j], axis=0)[:-1]  # División entre el intervalo b y b + 1
+            derecha = total - izquierda
+            n_izq = izquierda.sum(axis=1)
+            n_der = n - n_izq
+            validos = (n_izq >= self.min_samples_leaf) & (n_der >= self.min_samples_leaf)
+            if not validos.any():
+                continue
+            with np.errstate(divide='ignore', invalid='ignore'):
+                impureza = (n_izq - (izquierda ** 2).sum(axis=1) / n_izq) + (n_der - (derecha ** 2).sum(axis=1) / n_der)
+            impureza = np.where(validos, impureza, np.inf)
+            b = int(np.argmin(impureza))
+            ganancia = gini_padre - impureza[b]
+            if ganancia > mejor[0] + 1e-12 and b < len(self.bordes_[j]):
+                mejor = (ganancia, j, b)
+        if mejor[1] is None:
+            return []
+
+        _, j, b = mejor
+        hijos = []
+        for _ in range(2):
+            self.caracteristica_.append(-1)
+            self.umbral_.append(np.inf)
+            self.izquierdo_.append(-1)
+            self.derecho_.append(-1)
+            self.conteos_.append(np.zeros(self.n_clases_))
+            hijos.append(len(self.caracteristica_) - 1)
+        self.caracteristica_[nodo] = j
+        self.umbral_[nodo] = float(self.bordes_[j][b])  # código <= b  equivale a  x < borde[b]
+        self.izquierdo_[nodo], self.derecho_[nodo] = hijos
+        izquierda = histograma[j][:b + 1].sum(axis=0)
+        self.conteos_[hijos[0]] = izquierda
+        self.conteos_[hijos[1]] = total - izquierda
+        return hijos
+
+    def predict(self, X):
+        X = X[FEATURES].to_numpy() if hasattr(X, 'columns') else np.asarray(X)  # DataFrame sin importar pandas
+        return self.classes_[np.argmax(self.conteos_[self._nodos(X)], axis=1)]
+
+def evaluar(modelo, bloques):
+    """Precisión de `modelo` sobre los bloques (X, y), acumulada sin juntar los datos."""
+    aciertos = total = 0
+    for X, y in bloques:
+        aciertos += int(np.sum(modelo.predict(X) == y))
+        total += len(y)
+    return aciertos / total if total else float('nan')
+
+def entrenar_fuera_de_memoria(ruta, tamano_bloque=500_000, max_depth=5, n_bins=256, test_size=0.2, semilla=42):
+    """Entrena un ArbolHistograma leyendo `ruta` por bloques. Retorna (modelo, precisión en prueba)."""
+    modelo = ArbolHistograma(max_depth=max_depth, n_bins=n_bins, semilla=semilla)
+    modelo.ajustar(lambda: bloques_particion(ruta, 'entrenamiento', tamano_bloque, test_size, semilla))
+    return modelo, evaluar(modelo, bloques_particion(ruta, 'prueba', tamano_bloque, test_size, semilla))
+
+def entrenar_en_memoria(ruta, max_depth=5, test_size=0.2):
+    """Ruta actual: carga todo el archivo, train_test_split y DecisionTreeClassifier. Retorna (modelo, precisión)."""
+    from sklearn.tree import DecisionTreeClassifier
+    from sklearn.model_selection import train_test_split
+    import pandas as pd
+    data = pd.read_parquet(ruta) if ruta.endswith('.parquet') else pd.read_csv(ruta)
+    X_train, X_test, y_train, y_test = train_test_split(data[FEATURES], data['is_damaged'],
+                                                        test_size=test_size, random_state=42)
+    modelo = DecisionTreeClassifier(max_depth=max_depth, random_state=42)
+    modelo.fit(X_train, y_train)
+    return modelo, float(np.mean(modelo.predict(X_test) == y_test))
+
+def medir(funcion, *args, **kwargs):
+    """Ejecuta `funcion` midiendo tiempo y pico de memoria (tracemalloc). Retorna (resultado, segundos, MB)."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    try:
+        resultado = funcion(*args, **kwargs)
+        segundos = time.perf_counter() - inicio
+        pico = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return resultado, segundos, pico / 1024 ** 2
+
+def escribir_archivo_sintetico(ruta, n_filas, tamano_bloque=1_000_000, semilla=42):
+    """Escribe un CSV de n_filas lecturas sintéticas por bloques (para probar con archivos grandes)."""
+    from structural_damage_classifier_with_plot2 import generate_synthetic_data
+    semillas = np.random.SeedSequence(semilla).spawn(-(-n_filas // tamano_bloque))
+    for k, inicio in enumerate(range(0, n_filas, tamano_bloque)):
+        bloque = generate_synthetic_data(min(tamano_bloque, n_filas - inicio), seed=semillas[k])
+        bloque.to_csv(ruta, mode='w' if k == 0 else 'a', header=k == 0, index=False, float_format='%.6g')
+    return ruta
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Entrenamiento fuera de memoria del clasificador de vigas.")
+    parser.add_argument('archivo', help="CSV o Parquet con columnas strain, vibration, load, is_damaged")
+    parser.add_argument('--generar', type=int, metavar='N_FILAS', help="Escribe primero un CSV sintético de N_FILAS")
+    parser.add_argument('--tamano-bloque', type=int, default=500_000)
+    parser.add_argument('--profundidad', type=int, default=5)
+    parser.add_argument('--bins', type=int, default=256)
+    parser.add_argument('--sin-comparar', action='store_true',
+                        help="No ejecuta la ruta en memoria (para archivos que no caben en RAM)")
+    args = parser.parse_args()
+
+    if args.generar:
+        print(f"Escribiendo {args.generar:,} lecturas sintéticas en {args.archivo}...")
+        escribir_archivo_sintetico(args.archivo, args.generar)
+
+    resultados = []
+    (_, precision), segundos, memoria = medir(entrenar_fuera_de_memoria, args.archivo, args.tamano_bloque,
+                                              args.profundidad, args.bins)
+    resultados.append(('Fuera de memoria (histogramas)', precision, segundos, memoria))
+    if not args.sin_comparar:
+        (_, precision), segundos, memoria = medir(entrenar_en_memoria, args.archivo, args.profundidad)
+        resultados.append(('En memoria (DecisionTreeClassifier)', precision, segundos, memoria))
+
+    print(f"\n{'Ruta':<38}{'Precisión':>10}{'Tiempo (s)':>12}{'Memoria pico (MB)':>20}")
+    for nombre, precision, segundos, memoria in resultados:
+        print(f"{nombre:<38}{precision:>10.2%}{segundos:>12.2f}{memoria:>20.1f}")